@@ -0,0 +1,321 @@
+"""
+Admission control for the views app: per-route-class concurrency limits,
+bounded wait queues, request deadlines and load shedding.
+
+Every request is put in a class by its route:
+
+    cheap    /{table}/{id}, /{table}/{id}/field/…, /{table}/{id}/thumb/…
+    pages    /, /{table} (first DEEP_PAGE pages, no filters; ?format and ?fields allowed)
+    heavy    /{table} with filters or sorting (search), or past DEEP_PAGE
+    export   /{table}/export, /{table}/import
+
+/_metrics, /css and the /{table}/events streams are not limited.
+
+Each class runs at most `limit` requests at once and queues up to `queue`
+more. A request that finds the queue full, or whose expected wait already
+exceeds its deadline, is answered at once with 503 and a Retry-After
+estimated from the class's recent service time. Heavy classes saturating
+therefore never hold up cheap ones behind them.
+
+A request's deadline is its class timeout, shortened by an X-Request-Timeout
+header (seconds) from the client or proxy. It is carried in a context
+variable into SQLite worker threads, where a progress handler interrupts
+any query still running once it passes; the request then ends with 504.
+"""
+import asyncio
+import math
+import time
+from collections import deque
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, Optional, Tuple
+from urllib.parse import parse_qsl
+
+from loguru import logger as log
+
+DEEP_PAGE = 10
+PAGING_PARAMS = ("page", "size", "format", "fields")
+UNLIMITED = ("_metrics", "css", "favicon.ico")
+
+
+class DeadlineExceeded(TimeoutError):
+    """The request's deadline passed before its backend work finished."""
+
+
+@dataclass(frozen=True)
+class Deadline:
+    at: float
+
+    @classmethod
+    def after(cls, seconds: float) -> "Deadline":
+        return cls(time.monotonic() + seconds)
+
+    @property
+    def remaining(self) -> float:
+        return self.at - time.monotonic()
+
+    def expired(self) -> bool:
+        return time.monotonic() >= self.at
+
+    def check(self) -> None:
+        if self.expired():
+            raise DeadlineExceeded("Request deadline exceeded")
+
+
+class SharedDeadline:
+    """
+    Deadline of a call shared by several requests (see singleflight.py): the
+    latest of its waiters' deadlines, unbounded while any waiter has none.
+    Once the last waiter has left it is expired, so the call is interrupted.
+    Read from worker threads, so `at` is kept as a plain float.
+    """
+
+    def __init__(self):
+        self._waiters: Dict[int, float] = {}
+        self._tokens = 0
+        self.at = math.inf
+
+    def join(self, deadline: Optional[Deadline]) -> int:
+        self._tokens += 1
+        self._waiters[self._tokens] = deadline.at if deadline is not None else math.inf
+        self.at = max(self._waiters.values())
+        return self._tokens
+
+    def leave(self, token: int) -> None:
+        self._waiters.pop(token, None)
+        self.at = max(self._waiters.values(), default=-math.inf)
+
+    @property
+    def waiters(self) -> int:
+        return len(self._waiters)
+
+    @property
+    def remaining(self) -> float:
+        return self.at - time.monotonic()
+
+    def expired(self) -> bool:
+        return time.monotonic() >= self.at
+
+    def check(self) -> None:
+        if self.expired():
+            raise DeadlineExceeded("Request deadline exceeded")
+
+
+DEADLINE: ContextVar[Optional[Deadline]] = ContextVar("pygosqlviews_deadline", default=None)
+
+
+@dataclass
+class RouteClass:
+    """
+    Limits and counters of one route class.
+    """
+    name: str
+    limit: int
+    queue: int
+    timeout: Optional[float]
+    active: int = 0
+    admitted: int = 0
+    shed: int = 0
+    expired: int = 0
+    deadline_exceeded: int = 0
+    max_queued: int = 0
+    wait_seconds: float = 0.0
+    service: float = 0.05    # moving average of seconds per request
+    waiters: Deque[asyncio.Future] = field(default_factory=deque, repr=False)
+
+    @property
+    def queued(self) -> int:
+        return len(self.waiters)
+
+    def retry_after(self) -> int:
+        """Seconds until the current backlog should have drained."""
+        return max(1, math.ceil(self.service * (self.queued + 1) / self.limit))
+
+    def expected_wait(self) -> float:
+        return 0.0 if self.active < self.limit else self.service * (self.queued + 1) / self.limit
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "limit": self.limit, "queue": self.queue, "timeout": self.timeout,
+            "active": self.active, "queued": self.queued, "max_queued": self.max_queued,
+            "admitted": self.admitted, "shed": self.shed, "expired": self.expired,
+            "deadline_exceeded": self.deadline_exceeded,
+            "avg_wait_ms": round(self.wait_seconds / self.admitted * 1000, 2) if self.admitted else 0.0,
+            "avg_service_ms": round(self.service * 1000, 2),
+        }
+
+
+class Shed(Exception):
+    def __init__(self, route_class: RouteClass):
+        self.route_class = route_class
+        self.retry_after = route_class.retry_after()
+
+
+class Admission:
+    """
+    Route classes of one PyGoSQLViews app and the slots they hand out.
+
+    Args:
+        limits: Overrides of LIMITS, {class: (limit, queue, timeout seconds or None)}.
+    """
+    LIMITS: Dict[str, Tuple[int, int, Optional[float]]] = {
+        "cheap": (64, 512, 10.0),
+        "pages": (16, 64, 15.0),
+        "heavy": (4, 16, 30.0),
+        "export": (2, 4, None),
+    }
+    SMOOTHING = 0.2
+
+    def __init__(self, pygosqlviews, limits: Optional[Dict[str, Tuple[int, int, Optional[float]]]] = None):
+        self.pygosqlviews = pygosqlviews
+        self.verbose = pygosqlviews.verbose
+        self.classes = {
+            name: RouteClass(name, limit, queue, timeout)
+            for name, (limit, queue, timeout) in {**self.LIMITS, **(limits or {})}.items()
+        }
+
+    def __repr__(self):
+        return "PyGoSQL.Views.Admission"
+
+    def classify(self, path: str, query: bytes) -> Optional[str]:
+        """
+        Route class of a request, or None if it is not limited.
+        """
+        parts = [p for p in path.split("/") if p]
+        if not parts:
+            return "pages"
+        if parts[0] in UNLIMITED or parts[-1] == "events":
+            return None
+        if len(parts) == 1:
+            params = parse_qsl(query.decode("latin-1"), keep_blank_values=True)
+            if any(k not in PAGING_PARAMS for k, _ in params):
+                return "heavy"
+            page = next((v for k, v in params if k == "page"), "1")
+            return "heavy" if page.isdigit() and int(page) > DEEP_PAGE else "pages"
+        if len(parts) == 2 and parts[1] in ("export", "import"):
+            return "export"
+        return "cheap"
+
+    def deadline(self, route_class: RouteClass, headers: Dict[bytes, bytes]) -> Optional[Deadline]:
+        seconds = route_class.timeout
+        requested = headers.get(b"x-request-timeout")
+        if requested is not None:
+            try:
+                client = float(requested)
+            except ValueError:
+                client = None
+            if client is not None and client > 0:
+                seconds = client if seconds is None else min(seconds, client)
+        return None if seconds is None else Deadline.after(seconds)
+
+    async def acquire(self, route_class: RouteClass, deadline: Optional[Deadline]) -> float:
+        """
+        Take a slot in route_class, waiting in its queue if needed.
+        Raises Shed when the queue is full or the wait would outlast the deadline.
+        Returns the seconds spent waiting.
+        """
+        c = route_class
+        if c.active < c.limit and not c.waiters:
+            c.active += 1
+            c.admitted += 1
+            return 0.0
+        if c.queued >= c.queue or (deadline is not None and c.expected_wait() >= deadline.remaining):
+            c.shed += 1
+            raise Shed(c)
+        started = time.monotonic()
+        waiter = asyncio.get_running_loop().create_future()
+        c.waiters.append(waiter)
+        c.max_queued = max(c.max_queued, c.queued)
+        try:
+            await asyncio.wait_for(waiter, None if deadline is None else max(deadline.remaining, 0))
+        except BaseException as e:
+            if waiter.done() and not waiter.cancelled():
+                self.release(c, None)    # the slot was handed over as we gave up
+            if isinstance(e, asyncio.TimeoutError):
+                c.expired += 1
+                raise Shed(c)
+            raise
+        finally:
+            if waiter in c.waiters:
+                c.waiters.remove(waiter)
+        waited = time.monotonic() - started
+        c.admitted += 1
+        c.wait_seconds += waited
+        return waited
+
+    def release(self, route_class: RouteClass, service: Optional[float]) -> None:
+        """
+        Give a slot back, handing it straight to the oldest live waiter.
+        """
+        c = route_class
+        if service is not None:
+            c.service += self.SMOOTHING * (service - c.service)
+        while c.waiters:
+            waiter = c.waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        c.active -= 1
+
+    def metrics(self) -> Dict[str, Any]:
+        return {name: c.as_dict() for name, c in self.classes.items()}
+
+
+class AdmissionMiddleware:
+    """
+    ASGI middleware applying an Admission to every HTTP request.
+    The slot is held until the response body has been sent, so streamed
+    exports count against their class for as long as they run.
+    """
+
+    def __init__(self, app, admission: Admission):
+        self.app = app
+        self.admission = admission
+        self.verbose = admission.verbose
+
+    def __repr__(self):
+        return "PyGoSQL.Views.AdmissionMiddleware"
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        root = scope.get("root_path", "")
+        path = scope["path"][len(root):] if root and scope["path"].startswith(root) else scope["path"]
+        name = self.admission.classify(path, scope.get("query_string", b""))
+        if name is None:
+            return await self.app(scope, receive, send)
+        route_class = self.admission.classes[name]
+        deadline = self.admission.deadline(route_class, dict(scope.get("headers") or []))
+        try:
+            await self.admission.acquire(route_class, deadline)
+        except Shed as e:
+            if self.verbose: log.warning(f"[{self}]: Shedding {scope['method']} {path} ({name}, {route_class.queued} queued)")
+            return await self._respond(send, 503, "Overloaded, retry later", e.retry_after)
+        started = [False]
+
+        async def tracking_send(message) -> None:
+            if message["type"] == "http.response.start":
+                started[0] = True
+            await send(message)
+
+        token = DEADLINE.set(deadline)
+        began = time.monotonic()
+        try:
+            await self.app(scope, receive, tracking_send)
+        except DeadlineExceeded:
+            route_class.deadline_exceeded += 1
+            if self.verbose: log.warning(f"[{self}]: Deadline exceeded for {scope['method']} {path} ({name})")
+            if not started[0]:
+                await self._respond(send, 504, "Request deadline exceeded", route_class.retry_after())
+        finally:
+            DEADLINE.reset(token)
+            self.admission.release(route_class, time.monotonic() - began)
+
+    @staticmethod
+    async def _respond(send, status: int, detail: str, retry_after: int) -> None:
+        body = f'{{"detail": "{detail}"}}'.encode("utf-8")
+        await send({"type": "http.response.start", "status": status, "headers": [
+            (b"content-type", b"application/json"), (b"content-length", str(len(body)).encode()),
+            (b"retry-after", str(retry_after).encode()),
+        ]})
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,231 @@
+"""
+Index advisor for the access paths the views generate.
+
+Each table is read by id lookups, id-ordered pagination, and the filter and
+sort columns listed in its config.json (`filter_columns`, `sort_columns`).
+The advisor runs `EXPLAIN QUERY PLAN` on exactly those statements, flags full
+scans and temp B-tree sorts, and suggests (or applies) `CREATE INDEX` DDL.
+
+    python -m pygosqlviews.advisor sql/app.db --sql-root sql [--apply] [--json]
+
+The command exits non-zero while any access path is unindexed, so it can gate CI
+against a production-shaped copy of the database.
+"""
+import argparse
+import json
+import sqlite3
+import sys
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Dict, Iterable, List, Optional
+
+from loguru import logger as log
+
+from .filters import QueryFilter
+from .statements import StatementCache, quote
+
+FULL_SCAN = "full scan"
+TEMP_SORT = "temp b-tree sort"
+
+
+@dataclass(frozen=True)
+class AccessPath:
+    """
+    One statement the views run, and the index that would serve it.
+    """
+    table: str
+    purpose: str
+    sql: str
+    index: tuple[str, ...]
+    filtered: bool = True
+
+    @property
+    def ddl(self) -> str:
+        name = "ix_" + "_".join([self.table, *self.index])
+        cols = ", ".join(quote(c) for c in self.index)
+        return f"CREATE INDEX IF NOT EXISTS {quote(name)} ON {quote(self.table)} ({cols})"
+
+
+@dataclass
+class Advice:
+    """
+    The query plan for one access path and what is wrong with it.
+    """
+    table: str
+    purpose: str
+    sql: str
+    plan: List[str]
+    issues: List[str] = field(default_factory=list)
+    ddl: Optional[str] = None
+    applied: bool = False
+
+    def __bool__(self) -> bool:
+        return bool(self.issues)
+
+
+def access_paths(table: str, key: str, columns: Iterable[str], filter_columns: Iterable[str] = (),
+                 sort_columns: Iterable[str] = (), rowid: Optional[str] = None,
+                 statements: Optional[StatementCache] = None) -> List[AccessPath]:
+    """
+    Build the statements the views issue for one table.
+
+    Args:
+        table: Table name.
+        key: The configured id column.
+        columns: Projected columns of the card view.
+        filter_columns: Columns filtered with `?col=value`.
+        sort_columns: Columns sorted with `?sort=col`.
+        rowid: The INTEGER PRIMARY KEY column, which never needs its own index.
+        statements: Statement cache used to compile the SQL, as the views do.
+    """
+    statements = statements or StatementCache(SimpleNamespace(verbose=False))
+    ns = SimpleNamespace(name=table)
+    columns = list(columns) or None
+    tail = () if key == rowid else (key,)
+    paths = [
+        AccessPath(table, f"lookup by {key}", statements.select(ns, None, where=f"{quote(key)} IN (?)", paged=False).sql, (key,)),
+        AccessPath(table, f"page by {key}", statements.select(ns, columns, order_by=[quote(key)]).sql, (key,), filtered=False),
+    ]
+    for col in dict.fromkeys(filter_columns):
+        query = QueryFilter(filters=((col, "eq", None),))
+        where, _ = query.where()
+        sql = statements.select(ns, columns, where=where, order_by=query.order_by(key)).sql
+        paths.append(AccessPath(table, f"filter by {col}", sql, (col, *tail)))
+    for col in dict.fromkeys(sort_columns):
+        query = QueryFilter(sort=((col, False),))
+        sql = statements.select(ns, columns, order_by=query.order_by(key)).sql
+        paths.append(AccessPath(table, f"sort by {col}", sql, (col, *tail), filtered=False))
+    return paths
+
+
+def explain(conn: sqlite3.Connection, path: AccessPath) -> Advice:
+    """
+    Run EXPLAIN QUERY PLAN for an access path and flag scans and temp sorts.
+    Scans are only flagged for filtered paths; an ordered scan under LIMIT stops early.
+    """
+    binds = (None,) * path.sql.count("?")
+    plan = [row[-1] for row in conn.execute(f"EXPLAIN QUERY PLAN {path.sql}", binds)]
+    issues = []
+    if path.filtered and any(d.startswith("SCAN ") and "USING" not in d for d in plan):
+        issues.append(FULL_SCAN)
+    if any("USE TEMP B-TREE" in d for d in plan):
+        issues.append(TEMP_SORT)
+    return Advice(path.table, path.purpose, path.sql, plan, issues, path.ddl if issues else None)
+
+
+def advise(conn: sqlite3.Connection, paths: Iterable[AccessPath], apply: bool = False) -> List[Advice]:
+    """
+    Explain every access path; with apply, create the suggested indexes and re-check.
+    """
+    advice = []
+    for path in paths:
+        result = explain(conn, path)
+        if result and apply:
+            with conn:
+                conn.execute(result.ddl)
+            after = explain(conn, path)
+            after.ddl, after.applied = result.ddl, True
+            result = after
+        advice.append(result)
+    return advice
+
+
+def table_info(conn: sqlite3.Connection, table: str) -> tuple[List[str], Optional[str]]:
+    """
+    A table's columns and its INTEGER PRIMARY KEY (rowid alias) column, if any.
+    """
+    rows = conn.execute(f"PRAGMA table_info({quote(table)})").fetchall()
+    pks = [r for r in rows if r[5]]
+    rowid = pks[0][1] if len(pks) == 1 and (pks[0][2] or "").upper() == "INTEGER" else None
+    return [r[1] for r in rows], rowid
+
+
+def config_paths(conn: sqlite3.Connection, table: str, config: Dict) -> List[AccessPath]:
+    """
+    Access paths for a table from its config.json, falling back the way
+    Table config auto-population does when fields are empty.
+    """
+    cols, rowid = table_info(conn, table)
+    if not cols:
+        return []
+    key = config.get("id") or cols[0]
+    card = [config.get("id") or key, config.get("card_title") or (cols[1] if len(cols) > 1 else cols[0]),
+            config.get("card_subtitle") or (cols[2] if len(cols) > 2 else ""), config.get("card_image") or ""]
+    return access_paths(
+        table, key, [c for c in dict.fromkeys(card) if c in cols],
+        config.get("filter_columns", []), config.get("sort_columns", []), rowid
+    )
+
+
+class IndexAdvisor:
+    """
+    Index advice for the tables of a PyGoSQLViews instance, over its SQLite connection.
+    """
+
+    def __init__(self, pygosqlviews):
+        self.pygosqlviews = pygosqlviews
+        self.verbose = pygosqlviews.verbose
+        if self.verbose: log.success(f"{self}: Successfully initialized!")
+
+    def __repr__(self):
+        return "PyGoSQL.Views.IndexAdvisor"
+
+    async def paths(self, table) -> List[AccessPath]:
+        cfg = await table.config
+        sqlite = self.pygosqlviews.sqlite
+        _, rowid = await sqlite.run(lambda: table_info(sqlite.connect(), table.name))
+        return access_paths(
+            table.name, cfg.id, await table.card_columns(),
+            getattr(cfg, "filter_columns", []), getattr(cfg, "sort_columns", []),
+            rowid, self.pygosqlviews.statements
+        )
+
+    async def report(self, apply: bool = False) -> List[Advice]:
+        """
+        Advice for every table's access paths, optionally creating missing indexes.
+        """
+        paths = []
+        for table in vars(self.pygosqlviews.tables).values():
+            if hasattr(table, "card_columns"):
+                paths += await self.paths(table)
+        sqlite = self.pygosqlviews.sqlite
+        advice = await sqlite.run(lambda: advise(sqlite.connect(), paths, apply))
+        for a in advice:
+            if a and self.verbose: log.warning(f"[{self}]: {a.table} {a.purpose}: {', '.join(a.issues)} → {a.ddl}")
+            elif a.applied and self.verbose: log.info(f"[{self}]: Applied {a.ddl}")
+        return advice
+
+
+def _format(advice: List[Advice]) -> str:
+    lines = []
+    for a in advice:
+        status = "FAIL" if a else ("FIXED" if a.applied else "ok")
+        lines.append(f"[{status:>5}] {a.table}: {a.purpose}")
+        lines += [f"          plan: {d}" for d in a.plan]
+        if a.ddl:
+            lines.append(f"          {a.ddl};")
+    return "\n".join(lines)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Check the views' access paths against EXPLAIN QUERY PLAN")
+    parser.add_argument("database", type=Path, help="SQLite database to analyse")
+    parser.add_argument("--sql-root", type=Path, default=Path("sql"), help="PyGoSQL sql root with Tables/<name>/config.json")
+    parser.add_argument("--apply", action="store_true", help="Create the suggested indexes")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args(argv)
+    if not args.database.exists():
+        parser.error(f"{args.database} does not exist")
+    conn = sqlite3.connect(str(args.database))
+    paths = []
+    for cfg_path in sorted((args.sql_root / "Tables").glob("*/config.json")):
+        paths += config_paths(conn, cfg_path.parent.name, json.loads(cfg_path.read_text(encoding="utf-8")))
+    advice = advise(conn, paths, apply=args.apply)
+    conn.close()
+    print(json.dumps([asdict(a) for a in advice], indent=2) if args.json else _format(advice))
+    return 1 if any(advice) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
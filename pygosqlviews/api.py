@@ -0,0 +1,146 @@
+"""
+Machine-readable responses for the table and detail routes.
+
+The HTML routes also answer with JSON or MessagePack when the client asks
+for it, through the Accept header or `?format=json|msgpack|html`:
+
+    GET /{table}?status=open&sort=-id&page=2     Accept: application/json
+    GET /{table}/{id}?fields=id,title            Accept: application/msgpack
+
+Rows are read by the same Table.page / rows_by_id calls, so pagination,
+filters, sorting, the shared read path and statement cache are the HTML
+path's. `fields` projects columns. Pages default to the card columns, as
+the HTML cards do, and `fields=*` selects all columns. Details default to
+every column, unabridged.
+
+JSON is written with orjson when it is installed, else the standard library.
+MessagePack needs the msgpack package. A small page is encoded in one call,
+as is a detail row. A page whose estimated size passes STREAM_BYTES (wide
+rows under `fields=*`) is streamed in chunks of rows, encoded in Starlette's
+threadpool, so it is never held encoded in one buffer nor encoded on the
+event loop. Blobs are base64 strings in JSON and native bytes in MessagePack.
+"""
+import json
+from typing import Any, Dict, Iterator, List, Optional
+
+from .filters import FilterError
+from .transfer import _default
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+MEDIA_TYPES = {"json": "application/json", "msgpack": "application/msgpack"}
+ACCEPTED = {
+    "text/html": "html", "application/xhtml+xml": "html",
+    "application/json": "json",
+    "application/msgpack": "msgpack", "application/x-msgpack": "msgpack", "application/vnd.msgpack": "msgpack",
+}
+
+
+def available() -> List[str]:
+    return ["html", "json"] + (["msgpack"] if msgpack is not None else [])
+
+
+def negotiate(accept: Optional[str], format: Optional[str] = None) -> Optional[str]:
+    """
+    The response format for a request: an explicit ?format= wins, then the
+    Accept entry with the highest q. Browsers and htmx (text/html, */*) get HTML.
+    None means nothing acceptable can be produced (406).
+    """
+    offered = available()
+    if format:
+        return format if format in offered else None
+    if not accept:
+        return "html"
+    best, best_q = None, 0.0
+    for i, part in enumerate(accept.split(",")):
+        media, *params = [p.strip() for p in part.split(";")]
+        q = 1.0
+        for param in params:
+            if param.startswith("q="):
+                try:
+                    q = float(param[2:])
+                except ValueError:
+                    q = 0.0
+        if media in ("*/*", "text/*"):
+            name = "html"
+        elif media == "application/*":
+            name = "json"
+        else:
+            name = ACCEPTED.get(media)
+        if name in offered and q > best_q:
+            best, best_q = name, q
+    return best
+
+
+async def projection(table, fields: Optional[str], default: Optional[List[str]]) -> Optional[List[str]]:
+    """
+    Columns named by ?fields= (comma-separated, `*` for all), checked against the table.
+    """
+    if fields is None:
+        return default
+    if fields.strip() == "*":
+        return None
+    columns = await table.columns
+    names = [f.strip() for f in fields.split(",") if f.strip()]
+    unknown = [n for n in names if n not in columns]
+    if unknown:
+        raise FilterError(f"Unknown field(s) {unknown}")
+    key = (await table.config).id
+    return list(dict.fromkeys([key, *names]))
+
+
+def estimate(rows: List[Dict[str, Any]]) -> int:
+    """
+    Rough encoded size of `rows` in bytes: text and blob lengths, 8 bytes for anything else.
+    """
+    return sum(len(v) if isinstance(v, (str, bytes)) else 8 for row in rows for v in row.values())
+
+
+class Serializer:
+    """
+    Encodes documents and streamed pages for one format.
+    """
+    CHUNK_ROWS = 100
+    STREAM_BYTES = 1 << 20
+
+    def __init__(self, format: str):
+        if format not in MEDIA_TYPES or format not in available():
+            raise ValueError(f"Unsupported format '{format}', expected one of {available()}")
+        self.format = format
+        self.media_type = MEDIA_TYPES[format]
+
+    def __repr__(self):
+        return f"PyGoSQL.Views.Serializer({self.format})"
+
+    def dumps(self, obj: Any) -> bytes:
+        if self.format == "msgpack":
+            return msgpack.packb(obj, default=str, use_bin_type=True)
+        if orjson is not None:
+            return orjson.dumps(obj, default=_default, option=orjson.OPT_NON_STR_KEYS)
+        return json.dumps(obj, default=_default, separators=(",", ":")).encode("utf-8")
+
+    def page(self, meta: Dict[str, Any], rows: List[Dict[str, Any]]) -> Iterator[bytes]:
+        """
+        `{**meta, "rows": [...]}` as a stream of chunks, CHUNK_ROWS rows at a time.
+        """
+        n = self.CHUNK_ROWS
+        if self.format == "msgpack":
+            packer = msgpack.Packer(default=str, use_bin_type=True)
+            yield packer.pack_map_header(len(meta) + 1) + b"".join(
+                packer.pack(k) + packer.pack(v) for k, v in meta.items()
+            ) + packer.pack("rows") + packer.pack_array_header(len(rows))
+            for i in range(0, len(rows), n):
+                yield b"".join(packer.pack(r) for r in rows[i:i + n])
+            return
+        yield self.dumps(meta)[:-1] + (b',"rows":[' if meta else b'"rows":[')
+        for i in range(0, len(rows), n):
+            yield (b"," if i else b"") + b",".join(self.dumps(r) for r in rows[i:i + n])
+        yield b"]}"
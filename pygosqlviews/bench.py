@@ -0,0 +1,161 @@
+"""
+Benchmarks for the views read paths that run against a scratch SQLite file,
+without a Go backend.
+
+    python -m pygosqlviews.bench projection --rows 2000 --payload-kb 64
+    python -m pygosqlviews.bench imports --budget-ms 400
+"""
+import argparse
+import inspect
+import json
+import os
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Dict
+
+from .statements import StatementCache, quote
+
+
+def _size(value: Any) -> int:
+    if value is None:
+        return 0
+    if isinstance(value, (bytes, str)):
+        return len(value)
+    return 8
+
+
+def _wide_table(path: Path, rows: int, payload_kb: int) -> None:
+    conn = sqlite3.connect(str(path))
+    conn.executescript("""
+        PRAGMA journal_mode = WAL;
+        CREATE TABLE wide (
+            id INTEGER PRIMARY KEY,
+            title TEXT, subtitle TEXT, img TEXT,
+            body TEXT, payload BLOB, notes TEXT
+        );
+    """)
+    body = "x" * (payload_kb * 1024)
+    blob = os.urandom(payload_kb * 1024)
+    with conn:
+        conn.executemany(
+            "INSERT INTO wide (title, subtitle, img, body, payload, notes) VALUES (?, ?, ?, ?, ?, ?)",
+            ((f"title {i}", f"subtitle {i}", f"/img/{i}.png", body, blob, body) for i in range(rows))
+        )
+    conn.close()
+
+
+def _scan(conn: sqlite3.Connection, sql: str, page_size: int, pages: int) -> Dict[str, float]:
+    transferred, started = 0, time.perf_counter()
+    for page in range(pages):
+        for row in conn.execute(sql, (page_size, page * page_size)):
+            transferred += sum(_size(v) for v in row)
+    elapsed = time.perf_counter() - started
+    return {
+        "bytes": transferred,
+        "ms_total": round(elapsed * 1000, 2),
+        "ms_per_page": round(elapsed * 1000 / pages, 3),
+    }
+
+
+def projection(rows: int = 2000, payload_kb: int = 64, page_size: int = 50, pages: int = 20) -> Dict[str, Any]:
+    """
+    Compare card-page reads with SELECT * against the projected card SELECT.
+    """
+    statements = StatementCache(SimpleNamespace(verbose=False))
+    table = SimpleNamespace(name="wide")
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Path(tmp) / "bench.db"
+        _wide_table(db, rows, payload_kb)
+        conn = sqlite3.connect(str(db))
+        full = statements.select(table, None, order_by=[quote("id")]).sql
+        cards = statements.select(table, ["id", "title", "subtitle", "img"], order_by=[quote("id")]).sql
+        _scan(conn, full, page_size, 1)
+        result = {
+            "rows": rows,
+            "payload_kb": payload_kb,
+            "page_size": page_size,
+            "pages": pages,
+            "select_star": _scan(conn, full, page_size, pages),
+            "projection": _scan(conn, cards, page_size, pages),
+        }
+        conn.close()
+    result["bytes_ratio"] = round(result["projection"]["bytes"] / max(result["select_star"]["bytes"], 1), 5)
+    result["speedup"] = round(result["select_star"]["ms_total"] / max(result["projection"]["ms_total"], 1e-6), 1)
+    return result
+
+
+IMPORT_MODULES = ("pygosqlviews", "toomanyproxies.proxy", "toomanytemplates")
+LAZY_MODULES = ("fastapi", "starlette", "jinja2", "sqlite3")
+
+
+def _import_times(module: str) -> Dict[str, Any]:
+    """
+    Cumulative import time in microseconds of every module loaded by importing module,
+    from a fresh interpreter's -X importtime report.
+    """
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, cwd=Path(__file__).resolve().parent.parent
+    )
+    if proc.returncode:
+        raise ImportError(proc.stderr.strip().splitlines()[-1])
+    times = {}
+    for line in proc.stderr.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            _, cumulative, name = line[len("import time:"):].split("|")
+            if cumulative.strip().isdigit():
+                times[name.strip()] = int(cumulative)
+    return times
+
+
+def imports(modules=IMPORT_MODULES, budget_ms: float = 400.0, repeat: int = 3) -> Dict[str, Any]:
+    """
+    Time a cold import of each module (best of repeat) against budget_ms, and check
+    that none of them pulls in the heavy dependencies that are meant to load lazily.
+    """
+    result = {"budget_ms": budget_ms, "modules": {}, "ok": True}
+    for module in modules:
+        try:
+            runs = [_import_times(module) for _ in range(repeat)]
+        except ImportError as e:
+            result["modules"][module] = {"error": str(e), "ok": False}
+            result["ok"] = False
+            continue
+        best = min(runs, key=lambda t: t.get(module, 0))
+        ms = round(best.get(module, 0) / 1000, 2)
+        eager = sorted(m for m in LAZY_MODULES if m in best)
+        ok = ms <= budget_ms and not eager
+        result["modules"][module] = {"ms": ms, "eager": eager, "ok": ok}
+        result["ok"] = result["ok"] and ok
+    return result
+
+
+BENCHMARKS = {
+    "projection": projection,
+    "imports": imports,
+}
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="PyGoSQL Views benchmarks")
+    parser.add_argument("benchmark", choices=sorted(BENCHMARKS))
+    parser.add_argument("--rows", type=int, default=2000)
+    parser.add_argument("--payload-kb", type=int, default=64)
+    parser.add_argument("--page-size", type=int, default=50)
+    parser.add_argument("--pages", type=int, default=20)
+    parser.add_argument("--budget-ms", type=float, default=400.0)
+    args = parser.parse_args(argv)
+    benchmark = BENCHMARKS[args.benchmark]
+    params = inspect.signature(benchmark).parameters
+    result = benchmark(**{k: v for k, v in vars(args).items() if k in params})
+    print(json.dumps(result, indent=2))
+    return 0 if result.get("ok", True) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
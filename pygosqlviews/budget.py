@@ -0,0 +1,165 @@
+"""
+Memory budget for per-Table cached state.
+
+Tables cache their columns, config, column types, template environment,
+facet counts and compiled statements for as long as the process runs.
+TableBudget records when each table was last used, measures the approximate
+size of what it holds, and when the total passes max_bytes drops the state
+of the least recently used tables. Everything dropped is rebuilt on next
+access, so eviction only costs a reload.
+"""
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from types import SimpleNamespace
+from typing import Any, Dict, Optional, Set
+
+from loguru import logger as log
+
+EVICTABLE = ("columns", "config", "column_types", "templates", "facets", "paths")
+TEMPLATE_BYTES = 48 * 1024   # rough resident cost of one compiled, loaded Jinja template
+
+
+def approx_size(obj: Any, seen: Optional[Set[int]] = None, depth: int = 6) -> int:
+    """
+    Recursive sys.getsizeof over containers, namespaces and plain objects,
+    counting shared objects once and stopping at depth.
+    """
+    seen = set() if seen is None else seen
+    if id(obj) in seen or depth < 0:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj, 64)
+    if isinstance(obj, (str, bytes, bytearray, int, float, bool, type(None))):
+        return size
+    if isinstance(obj, dict):
+        return size + sum(approx_size(k, seen, depth - 1) + approx_size(v, seen, depth - 1) for k, v in obj.items())
+    if isinstance(obj, (list, tuple, set, frozenset)):
+        return size + sum(approx_size(v, seen, depth - 1) for v in obj)
+    if isinstance(obj, SimpleNamespace) or hasattr(obj, "__dict__"):
+        return size + approx_size(vars(obj), seen, depth - 1)
+    return size
+
+
+class TableBudget:
+    """
+    LRU of tables by last use, evicting cached state past max_bytes.
+
+    Args:
+        max_bytes: Budget for all tables' cached state together; defaults to
+            PYGOSQLVIEWS_TABLE_CACHE_MB (64 MB when unset).
+    """
+    MAX_BYTES = 64 * 1024 * 1024
+    MEASURE_INTERVAL = 1.0
+
+    def __init__(self, pygosqlviews, max_bytes: Optional[int] = None):
+        self.pygosqlviews = pygosqlviews
+        self.verbose = pygosqlviews.verbose
+        env = os.environ.get("PYGOSQLVIEWS_TABLE_CACHE_MB")
+        self.max_bytes = max_bytes or (int(float(env) * 1024 * 1024) if env else self.MAX_BYTES)
+        self._lru: "OrderedDict[str, Any]" = OrderedDict()
+        self._sizes: Dict[str, int] = {}
+        self._dirty: Set[str] = set()
+        self._measured: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def __repr__(self):
+        return "PyGoSQL.Views.TableBudget"
+
+    def touch(self, table) -> None:
+        """
+        Mark a table as just used, then evict cold tables if over budget.
+        Its size is re-measured at the next check, after this use has filled its caches.
+        """
+        with self._lock:
+            self._lru[table.name] = table
+            self._lru.move_to_end(table.name)
+            self._dirty.add(table.name)
+        self.enforce(keep=table.name)
+
+    def measure(self, table) -> int:
+        """
+        Approximate bytes of a table's evictable state.
+        """
+        state = table.__dict__
+        size = 0
+        for name in ("columns", "config", "column_types", "paths"):
+            if name in state:
+                size += approx_size(state[name])
+        cache = state.get("__async_property__")
+        if cache is not None:
+            size += sum(approx_size(v) for k, v in cache.cache.items() if k in EVICTABLE)
+        env = state.get("templates")
+        if env is not None:
+            size += TEMPLATE_BYTES * len(env.cache or ())
+        facets = state.get("facets")
+        if facets is not None:
+            size += approx_size(facets.columns, depth=8)
+        statements = self.pygosqlviews.statements
+        size += sum(len(s.sql) + 200 for k, s in statements._statements.items() if k[0] == table.name)
+        return size
+
+    def _measure_dirty(self, force: bool = False) -> None:
+        """
+        Re-measure tables used since their last measurement, at most once per
+        MEASURE_INTERVAL each so that hot tables are not walked on every request.
+        """
+        now = time.monotonic()
+        for name in list(self._dirty):
+            if name not in self._lru:
+                self._dirty.discard(name)
+            elif force or now - self._measured.get(name, 0.0) >= self.MEASURE_INTERVAL:
+                self._sizes[name] = self.measure(self._lru[name])
+                self._measured[name] = now
+                self._dirty.discard(name)
+
+    @property
+    def used(self) -> int:
+        return sum(self._sizes.values())
+
+    def enforce(self, keep: Optional[str] = None) -> int:
+        """
+        Evict least recently used tables until under max_bytes. Returns bytes freed.
+        """
+        with self._lock:
+            self._measure_dirty()
+            freed = 0
+            for name in list(self._lru):
+                if self.used <= self.max_bytes:
+                    break
+                if name == keep:
+                    continue
+                freed += self._evict(name)
+        return freed
+
+    def _evict(self, name: str) -> int:
+        table = self._lru.pop(name)
+        size = self._sizes.pop(name, 0)
+        self._measured.pop(name, None)
+        self._dirty.discard(name)
+        table.invalidate(*EVICTABLE)
+        self.pygosqlviews.statements.clear(table)
+        self.pygosqlviews.thumbnails.forget(table.name)
+        self.evictions += 1
+        if self.verbose: log.debug(f"[{self}]: Evicted {name} (~{size} bytes)")
+        return size
+
+    def evict(self, table) -> int:
+        """
+        Drop one table's cached state now.
+        """
+        with self._lock:
+            if table.name not in self._lru:
+                self._lru[table.name] = table
+            return self._evict(table.name)
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            self._measure_dirty(force=True)
+            return {
+                "max_bytes": self.max_bytes, "bytes": self.used, "evictions": self.evictions,
+                "tables": dict(self._sizes),
+            }
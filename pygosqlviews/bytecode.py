@@ -0,0 +1,109 @@
+"""
+Jinja bytecode cache keyed by template source rather than template path.
+Generated templates are often byte-identical across tables and databases, so
+environments sharing one cache compile each distinct source only once.
+
+Given a directory (the views use sql_root/.cache/jinja) compiled code is also
+written to disk, so restarts and other worker processes load it instead of
+compiling. File names carry the Jinja version besides the source digest, and
+Jinja's own bucket header rejects code from another Python version.
+"""
+import threading
+from pathlib import Path
+from typing import Dict, Optional
+
+import jinja2
+from jinja2.bccache import Bucket
+
+from .files import atomic_write, digest
+
+
+class SourceBytecodeCache(jinja2.BytecodeCache):
+    """
+    Bytecode shared by every environment it is passed to, in memory and
+    optionally in a directory shared between processes.
+    Keys combine the source digest with the environment's autoescape setting,
+    the only option the generated templates vary that changes compiled code.
+
+    Args:
+        directory: Where to persist compiled templates; in memory only when None.
+        max_files: Oldest files beyond this many are removed on startup.
+    """
+    MAX_FILES = 2000
+
+    def __init__(self, directory: Optional[Path] = None, max_files: int = MAX_FILES):
+        self._code: Dict[str, object] = {}
+        self._lock = threading.Lock()
+        self.directory = Path(directory) if directory is not None else None
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        self.disk_writes = 0
+        if self.directory is not None:
+            self.prune(max_files)
+
+    def __repr__(self):
+        return "PyGoSQL.Views.BytecodeCache"
+
+    def key(self, environment: jinja2.Environment, source: str) -> str:
+        return digest(f"{environment.autoescape!r}\0{source}")
+
+    def path(self, key: str) -> Path:
+        return self.directory / f"{key}-jinja{jinja2.__version__}.bc"
+
+    def get_bucket(self, environment, name, filename, source) -> Bucket:
+        key = self.key(environment, source)
+        bucket = Bucket(environment, key, key)
+        self.load_bytecode(bucket)
+        return bucket
+
+    def load_bytecode(self, bucket: Bucket) -> None:
+        with self._lock:
+            code = self._code.get(bucket.key)
+            if code is not None:
+                self.hits += 1
+                bucket.code = code
+                return
+        if self.directory is not None:
+            try:
+                with open(self.path(bucket.key), "rb") as f:
+                    bucket.load_bytecode(f)
+            except (OSError, EOFError, ValueError, TypeError):
+                bucket.reset()
+            if bucket.code is not None:
+                with self._lock:
+                    self._code[bucket.key] = bucket.code
+                    self.disk_hits += 1
+                return
+        with self._lock:
+            self.misses += 1
+
+    def dump_bytecode(self, bucket: Bucket) -> None:
+        with self._lock:
+            self._code[bucket.key] = bucket.code
+        if self.directory is not None:
+            try:
+                atomic_write(self.path(bucket.key), bucket.bytecode_to_string())
+            except OSError:
+                return
+            with self._lock:
+                self.disk_writes += 1
+
+    def prune(self, max_files: int) -> None:
+        try:
+            files = sorted(self.directory.glob("*.bc"), key=lambda p: p.stat().st_mtime)
+        except OSError:
+            return
+        for path in files[:-max_files] if max_files else files:
+            path.unlink(missing_ok=True)
+
+    def clear(self) -> None:
+        """
+        Drop the in-memory code; persisted files stay valid since they are keyed by source.
+        """
+        with self._lock:
+            self._code.clear()
+
+    def metrics(self) -> Dict[str, int]:
+        return {"templates": len(self._code), "hits": self.hits, "misses": self.misses,
+                "disk_hits": self.disk_hits, "disk_writes": self.disk_writes}
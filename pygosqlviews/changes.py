@@ -0,0 +1,87 @@
+"""
+Per-table change feed for the write paths.
+Writes publish the affected row ids; open card pages subscribe over SSE and
+receive only the re-rendered fragments for those rows.
+"""
+import asyncio
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Awaitable, Callable, Optional, Set
+
+from loguru import logger as log
+
+OPERATIONS = ("insert", "update", "delete", "refresh")
+
+
+@dataclass(eq=False)
+class Change:
+    """
+    One write against a table. The rendered payload is computed once and
+    shared by every subscriber that receives this change.
+    """
+    table: str
+    op: str
+    ids: tuple
+    seq: int
+    _payload: Optional[asyncio.Future] = field(default=None, repr=False)
+
+    def payload(self, render: Callable[["Change"], Awaitable[Any]]) -> Awaitable[Any]:
+        if self._payload is None:
+            self._payload = asyncio.ensure_future(render(self))
+        return asyncio.shield(self._payload)
+
+
+class ChangeFeed:
+    """
+    Fan-out of a Table's changes to bounded subscriber queues.
+
+    Publishing with no subscribers is a no-op. A subscriber that falls
+    behind has its backlog replaced by a single `refresh` change.
+    """
+    QUEUE_SIZE = 256
+
+    def __init__(self, table):
+        self.table = table
+        self.verbose = table.verbose
+        self.seq = 0
+        self._subscribers: Set[asyncio.Queue] = set()
+
+    def __repr__(self):
+        return f"{self.table}.Changes"
+
+    @property
+    def subscribers(self) -> int:
+        return len(self._subscribers)
+
+    def publish(self, op: str, ids=()) -> Optional[Change]:
+        """
+        Record a write and hand it to every subscriber.
+        """
+        if op not in OPERATIONS:
+            raise ValueError(f"Unknown change operation '{op}', expected one of {OPERATIONS}")
+        self.seq += 1
+        if not self._subscribers:
+            return None
+        change = Change(table=self.table.name, op=op, ids=tuple(ids), seq=self.seq)
+        for queue in self._subscribers:
+            try:
+                queue.put_nowait(change)
+            except asyncio.QueueFull:
+                self._resync(queue)
+        if self.verbose: log.debug(f"[{self}]: Published {change} to {len(self._subscribers)} subscriber(s)")
+        return change
+
+    def _resync(self, queue: asyncio.Queue) -> None:
+        while not queue.empty():
+            queue.get_nowait()
+        queue.put_nowait(Change(table=self.table.name, op="refresh", ids=(), seq=self.seq))
+        if self.verbose: log.warning(f"[{self}]: Subscriber fell behind, sending refresh")
+
+    @asynccontextmanager
+    async def subscribe(self) -> AsyncIterator[asyncio.Queue]:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.QUEUE_SIZE)
+        self._subscribers.add(queue)
+        try:
+            yield queue
+        finally:
+            self._subscribers.discard(queue)
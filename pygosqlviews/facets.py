@@ -0,0 +1,368 @@
+"""
+Facet counts for low-cardinality columns, kept in memory and updated on writes.
+
+Candidate columns are picked from the table's declared SQLite types (or the
+`facet_columns` list in config.json), then screened on the first SAMPLE_ROWS
+rows: columns whose values run longer than VALUE_CHARS or are nearly all
+distinct (bodies, notes, emails) are dropped before any full scan. Text is
+read as its first VALUE_CHARS characters, so a stray long value costs no more
+than a short one. One scan builds the counts; after that
+the views' own write paths add and subtract the affected rows, so rendering
+the sidebar only reads a few in-memory counters whatever the table size.
+
+Counts are built and rebuilt in a background task, outside any request
+deadline; until the first build finishes the sidebar is simply left out.
+Writes made around the views (straight to the Go backend or SQLite) are not
+seen by the incremental updates, so a table whose counts are older than
+RECONCILE_SECONDS is rescanned in the background on its next view, the old
+counts staying on show until the new ones replace them.
+
+Columns start with exact counts. Once a column has more than EXACT_LIMIT
+distinct values it switches to a Space-Saving heavy-hitters sketch for its
+top values and a HyperLogLog for its distinct count, both in fixed memory.
+"""
+import asyncio
+import contextvars
+import hashlib
+import math
+import time
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlencode
+
+from loguru import logger as log
+
+from .admission import DEADLINE
+from .statements import quote
+
+SKIP_TYPES = ("BLOB", "REAL", "FLOA", "DOUB", "DATE", "TIME")
+
+
+def candidate(declared: str) -> bool:
+    """Whether a declared SQLite type can hold a facet (text, integer, boolean or untyped)."""
+    return not any(t in declared.upper() for t in SKIP_TYPES)
+
+
+def _hash(value: Any) -> int:
+    return int.from_bytes(hashlib.blake2b(repr(value).encode("utf-8"), digest_size=8).digest(), "big")
+
+
+class HyperLogLog:
+    """
+    Distinct-count estimate in 2**p one-byte registers (about 1.6% error at p=12).
+    Insert-only: removals are not reflected until the next rebuild.
+    """
+
+    def __init__(self, p: int = 12):
+        self.p = p
+        self.m = 1 << p
+        self.registers = bytearray(self.m)
+
+    def add(self, value: Any) -> None:
+        h = _hash(value)
+        index = h >> (64 - self.p)
+        rest = (h << self.p) & ((1 << 64) - 1)
+        rank = 64 - self.p + 1 if rest == 0 else (64 - rest.bit_length()) + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def estimate(self) -> int:
+        m = self.m
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / sum(2.0 ** -r for r in self.registers)
+        zeros = self.registers.count(0)
+        if raw <= 2.5 * m and zeros:
+            return round(m * math.log(m / zeros))
+        return round(raw)
+
+
+class SpaceSaving:
+    """
+    Top-k heavy hitters: counts are over-estimates by at most their recorded error.
+    """
+
+    def __init__(self, k: int = 64):
+        self.k = k
+        self.counts: Dict[Any, List[int]] = {}
+
+    def add(self, value: Any, n: int = 1) -> None:
+        entry = self.counts.get(value)
+        if entry is not None:
+            entry[0] += n
+        elif len(self.counts) < self.k:
+            self.counts[value] = [n, 0]
+        else:
+            victim = min(self.counts, key=lambda v: self.counts[v][0])
+            floor = self.counts.pop(victim)[0]
+            self.counts[value] = [floor + n, floor]
+
+    def remove(self, value: Any) -> None:
+        entry = self.counts.get(value)
+        if entry is not None and entry[0] > 0:
+            entry[0] -= 1
+
+    def top(self, n: int) -> List[Tuple[Any, int]]:
+        return sorted(((v, c) for v, (c, _) in self.counts.items() if c > 0), key=lambda e: -e[1])[:n]
+
+
+class FacetColumn:
+    """
+    Value counts for one column: exact until EXACT_LIMIT distinct values, then sketched.
+    """
+    EXACT_LIMIT = 1000
+    HEAVY_HITTERS = 64
+
+    def __init__(self, name: str):
+        self.name = name
+        self.counts: Optional[Counter] = Counter()
+        self.sketch: Optional[SpaceSaving] = None
+        self.hll: Optional[HyperLogLog] = None
+
+    def __repr__(self):
+        return f"PyGoSQL.Views.Facet({self.name})"
+
+    @property
+    def exact(self) -> bool:
+        return self.counts is not None
+
+    @property
+    def distinct(self) -> int:
+        return len(self.counts) if self.exact else self.hll.estimate()
+
+    def add(self, value: Any) -> None:
+        if self.exact:
+            self.counts[value] += 1
+            if len(self.counts) > self.EXACT_LIMIT:
+                self._overflow()
+        else:
+            self.sketch.add(value)
+            self.hll.add(value)
+
+    def remove(self, value: Any) -> None:
+        if self.exact:
+            self.counts[value] -= 1
+            if self.counts[value] <= 0:
+                del self.counts[value]
+        else:
+            self.sketch.remove(value)
+
+    def _overflow(self) -> None:
+        self.sketch, self.hll = SpaceSaving(self.HEAVY_HITTERS), HyperLogLog()
+        for value, count in self.counts.most_common():
+            self.sketch.add(value, count)
+            self.hll.add(value)
+        self.counts = None
+
+    def top(self, n: int) -> List[Tuple[Any, int]]:
+        return self.counts.most_common(n) if self.exact else self.sketch.top(n)
+
+
+class Facets:
+    """
+    Facet columns of one Table.
+
+    Built with a single scan, shared by concurrent callers through the views'
+    single-flight table. Writes made through the Table update the counts in
+    place; a `refresh` write (ids unknown) marks them for rebuild.
+    """
+    SIDEBAR_VALUES = 8
+    UNIQUE_RATIO = 0.5
+    SCAN_CHUNK = 5000
+    SAMPLE_ROWS = 1000
+    VALUE_CHARS = 64
+    RECONCILE_SECONDS = 600.0
+
+    def __init__(self, table):
+        self.table = table
+        self.verbose = table.verbose
+        self.columns: Dict[str, FacetColumn] = {}
+        self.rows = 0
+        self.ready = False
+        self.builds = 0
+        self.built_at: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def __repr__(self):
+        return f"{self.table}.Facets"
+
+    async def candidates(self) -> List[str]:
+        """
+        Columns to count: config's facet_columns if set, else the non-id
+        columns whose declared type is text, integer, boolean or untyped and
+        whose sampled values are short and not nearly unique.
+        """
+        cfg = await self.table.config
+        types = await self.table.column_types
+        explicit = getattr(cfg, "facet_columns", None)
+        if explicit:
+            return [c for c in explicit if c in types]
+        names = [c for c, t in types.items() if c != cfg.id and candidate(t)]
+        if not names:
+            return []
+        parts = ["count(*) AS n"]
+        for i, c in enumerate(names):
+            parts += [f"count(DISTINCT {quote(c)}) AS d{i}", f"max(length({quote(c)})) AS l{i}"]
+        sample = await self.table.pygosqlviews.sqlite.fetchone(
+            f"SELECT {', '.join(parts)} FROM (SELECT {', '.join(quote(c) for c in names)} "
+            f"FROM {quote(self.table.name)} LIMIT {self.SAMPLE_ROWS})"
+        )
+        unique = max(self.SIDEBAR_VALUES, sample["n"] * self.UNIQUE_RATIO)
+        return [c for i, c in enumerate(names)
+                if (sample[f"l{i}"] or 0) <= self.VALUE_CHARS and sample[f"d{i}"] <= unique]
+
+    def projection(self, names: Iterable[str]) -> str:
+        """
+        SELECT list reading each column with text cut to VALUE_CHARS characters.
+        """
+        n = self.VALUE_CHARS
+        return ", ".join(
+            f"CASE WHEN typeof({q}) = 'text' THEN substr({q}, 1, {n}) ELSE {q} END AS {q}"
+            for q in map(quote, names)
+        )
+
+    async def build(self) -> "Facets":
+        if not self.ready:
+            await self.table.pygosqlviews.flights.do(
+                ("facets", self.table.name), self._build, label=f"facets {self.table.name}"
+            )
+        return self
+
+    def schedule(self) -> None:
+        """
+        (Re)build in a background task, unless one is already running.
+        The task gets a context without the request's deadline.
+        """
+        if self._task is not None and not self._task.done():
+            return
+        context = contextvars.copy_context()
+        context.run(DEADLINE.set, None)
+        self._task = context.run(asyncio.get_running_loop().create_task, self._rebuild())
+
+    async def _rebuild(self) -> None:
+        try:
+            await self.table.pygosqlviews.flights.do(
+                ("facets", self.table.name), self._build, label=f"facets {self.table.name}"
+            )
+        except Exception as e:
+            log.warning(f"[{self}]: Facet build failed: {e}")
+
+    async def _build(self) -> None:
+        names = await self.candidates()
+        sqlite = self.table.pygosqlviews.sqlite
+        columns = {c: FacetColumn(c) for c in names}
+        rows = 0
+        if names:
+            sql = f"SELECT {self.projection(names)} FROM {quote(self.table.name)}"
+            rows = await sqlite.run(self._scan, sqlite, sql, list(columns.values()))
+        self.columns, self.rows = columns, rows
+        self.ready = True
+        self.builds += 1
+        self.built_at = time.monotonic()
+        if self.verbose:
+            log.info(f"[{self}]: Built {len(names)} facet(s) over {self.rows} rows "
+                     f"({[c.name for c in self.columns.values() if not c.exact]} approximate)")
+
+    def _scan(self, sqlite, sql: str, columns: List[FacetColumn]) -> int:
+        cursor = sqlite.connect().execute(sql)
+        rows = 0
+        while True:
+            chunk = cursor.fetchmany(self.SCAN_CHUNK)
+            if not chunk:
+                return rows
+            rows += len(chunk)
+            for i, column in enumerate(columns):
+                for row in chunk:
+                    column.add(row[i])
+
+    def stale(self) -> None:
+        self.ready = False
+
+    async def _values(self, ids: Iterable[Any]) -> List[Dict[str, Any]]:
+        ids = list(ids)
+        if not ids or not self.columns:
+            return []
+        key = (await self.table.config).id
+        cols = self.projection(self.columns)
+        rows = []
+        for i in range(0, len(ids), 500):
+            chunk = ids[i:i + 500]
+            where = f"{quote(key)} IN ({', '.join('?' for _ in chunk)})"
+            rows += await self.table.pygosqlviews.sqlite.fetchall(
+                f"SELECT {cols} FROM {quote(self.table.name)} WHERE {where}", chunk
+            )
+        return rows
+
+    async def removing(self, ids: Optional[Iterable[Any]]) -> None:
+        """
+        Subtract rows about to be updated or deleted. Call before the write.
+        """
+        if not self.ready:
+            return
+        if ids is None:
+            return self.stale()
+        for row in await self._values(ids):
+            self.rows -= 1
+            for name, column in self.columns.items():
+                column.remove(row[name])
+
+    async def adding(self, ids: Optional[Iterable[Any]]) -> None:
+        """
+        Add rows just inserted or updated. Call after the write.
+        """
+        if not self.ready:
+            return
+        if ids is None:
+            return self.stale()
+        for row in await self._values(ids):
+            self.rows += 1
+            for name, column in self.columns.items():
+                column.add(row[name])
+
+    def shown(self, column: FacetColumn) -> bool:
+        """
+        Whether a column is worth a sidebar section: more than one value and not near-unique.
+        """
+        return 1 < column.distinct <= max(self.SIDEBAR_VALUES, self.rows * self.UNIQUE_RATIO)
+
+    async def sidebar(self, query) -> List[Dict[str, Any]]:
+        """
+        Sidebar sections for the table view: each shown column's most common
+        values with their counts and a link that toggles the value as a filter.
+        Counts cover the whole table, not the current filter. Never scans:
+        missing or old counts are (re)built in the background, and the
+        sidebar is empty until the first build is done.
+        """
+        if not self.ready or time.monotonic() - self.built_at >= self.RECONCILE_SECONDS:
+            self.schedule()
+        if not self.ready:
+            return []
+        prefix = self.table.pygosqlviews.prefix
+        params = [(k, v) for k, v in query.params if k != "page"]
+        active = {(c, v) for c, op, v in query.filters if op in ("eq", "null")}
+        sections = []
+        for column in self.columns.values():
+            if not self.shown(column):
+                continue
+            values = []
+            others = [p for p in params if p[0] not in (column.name, f"{column.name}__null")]
+            for value, count in column.top(self.SIDEBAR_VALUES):
+                param = (f"{column.name}__null", "1") if value is None else (column.name, str(value))
+                on = (column.name, "1" if value is None else str(value)) in active
+                link = others if on else [*others, param]
+                values.append({
+                    "label": "—" if value is None else value, "count": count, "active": on,
+                    "url": f"{prefix}/{self.table.name}" + (f"?{urlencode(link)}" if link else ""),
+                })
+            sections.append({
+                "column": column.name, "title": column.name.replace("_", " ").title(),
+                "exact": column.exact, "distinct": column.distinct, "values": values,
+            })
+        return sections
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "ready": self.ready, "rows": self.rows, "builds": self.builds,
+            "building": self._task is not None and not self._task.done(),
+            "age": round(time.monotonic() - self.built_at, 1) if self.built_at is not None else None,
+            "columns": {c.name: {"exact": c.exact, "distinct": c.distinct} for c in self.columns.values()},
+        }
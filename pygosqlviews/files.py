@@ -0,0 +1,42 @@
+"""
+Small file helpers shared by the generators: content hashing and atomic writes.
+"""
+import hashlib
+import os
+import tempfile
+from pathlib import Path
+from typing import Optional, Union
+
+
+def digest(data: Union[str, bytes]) -> str:
+    """SHA-256 hex digest of text (UTF-8) or bytes."""
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    return hashlib.sha256(data).hexdigest()
+
+
+def file_digest(path: Path) -> Optional[str]:
+    """Digest of a file's bytes, or None if it does not exist."""
+    try:
+        return digest(Path(path).read_bytes())
+    except FileNotFoundError:
+        return None
+
+
+def atomic_write(path: Path, data: Union[str, bytes]) -> None:
+    """
+    Write to a temporary file in the same directory and rename it into place,
+    so readers never observe a partially written file.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
@@ -0,0 +1,141 @@
+"""
+Query-string filter and sort language for table views, compiled to SQL.
+
+    ?status=active&age__gte=18&name__like=jo&sort=-created_at,name
+    ?deleted_at__null=1    (IS NULL; 0/false/no for IS NOT NULL, notnull the reverse)
+
+Every column is checked against the table's columns and every value is
+bound as a parameter, so the filtering and ordering run inside SQLite.
+Besides sort, the view's own parameters (page, size, format, fields) are
+reserved; any other parameter must name a column, or the request is
+rejected with FilterError.
+"""
+from dataclasses import dataclass, field
+from typing import Any, Iterable, List, Mapping, Tuple
+from urllib.parse import urlencode
+
+from .statements import quote
+
+RESERVED = frozenset({"page", "size", "sort", "format", "fields"})
+TRUE = ("1", "true", "yes")
+FALSE = ("0", "false", "no")
+
+OPERATORS = {
+    "eq": "{col} = ?",
+    "ne": "{col} != ?",
+    "lt": "{col} < ?",
+    "lte": "{col} <= ?",
+    "gt": "{col} > ?",
+    "gte": "{col} >= ?",
+    "like": "{col} LIKE ? ESCAPE '\\'",
+    "in": "{col} IN ({marks})",
+    "null": "{col} IS NULL",
+    "notnull": "{col} IS NOT NULL",
+}
+
+
+class FilterError(ValueError):
+    """Raised for unknown columns, operators or malformed values."""
+
+
+def _like(value: str) -> str:
+    escaped = value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+@dataclass(frozen=True)
+class QueryFilter:
+    """
+    Parsed filters and sort order for one table view request.
+    """
+    filters: Tuple[Tuple[str, str, Any], ...] = ()
+    sort: Tuple[Tuple[str, bool], ...] = ()
+    params: Tuple[Tuple[str, str], ...] = field(default=(), compare=False)
+
+    @classmethod
+    def parse(cls, params: Mapping[str, str] | Iterable[Tuple[str, str]], columns: Iterable[str]) -> "QueryFilter":
+        """
+        Parse query parameters, rejecting anything that is not a known column.
+
+        Args:
+            params: Query parameters (a mapping or a list of key/value pairs).
+            columns: The table's columns.
+        """
+        columns = set(columns)
+        items = list(params.items() if hasattr(params, "items") else params)
+        filters, sort, kept = [], [], []
+        for key, value in items:
+            if key == "sort":
+                for term in filter(None, (t.strip() for t in value.split(","))):
+                    desc = term.startswith("-")
+                    col = term.lstrip("+-")
+                    if col not in columns:
+                        raise FilterError(f"Cannot sort by unknown column '{col}'")
+                    sort.append((col, desc))
+                kept.append((key, value))
+                continue
+            if key in RESERVED:
+                if key == "size":
+                    kept.append((key, value))
+                continue
+            col, _, op = key.rpartition("__") if "__" in key and key not in columns else (key, "", "eq")
+            if col not in columns:
+                raise FilterError(f"Cannot filter by unknown column '{col}'")
+            if op not in OPERATORS:
+                raise FilterError(f"Unknown operator '{op}', expected one of {sorted(OPERATORS)}")
+            if op == "in":
+                value = tuple(v for v in value.split(",") if v != "")
+                if not value:
+                    raise FilterError(f"'{key}' needs at least one value")
+            if op in ("null", "notnull"):
+                flag = value.lower()
+                if flag not in TRUE + FALSE:
+                    raise FilterError(f"'{key}' takes one of {list(TRUE + FALSE)}, not '{value}'")
+                if flag in FALSE:
+                    op = "notnull" if op == "null" else "null"
+                filters.append((col, op, "1"))
+                kept.append((key, value))
+                continue
+            filters.append((col, op, value))
+            kept.append((key, value if isinstance(value, str) else ",".join(value)))
+        return cls(filters=tuple(filters), sort=tuple(sort), params=tuple(kept))
+
+    def __bool__(self) -> bool:
+        return bool(self.filters or self.sort)
+
+    @property
+    def columns(self) -> List[str]:
+        """Columns this filter reads, for index advice."""
+        return list(dict.fromkeys([c for c, _, _ in self.filters] + [c for c, _ in self.sort]))
+
+    def where(self) -> Tuple[str, List[Any]]:
+        """
+        Compile the filters into a WHERE body and its bound parameters.
+        """
+        clauses, binds = [], []
+        for col, op, value in self.filters:
+            q = quote(col)
+            if op == "in":
+                clauses.append(OPERATORS[op].format(col=q, marks=", ".join("?" for _ in value)))
+                binds += list(value)
+            elif op in ("null", "notnull"):
+                clauses.append(OPERATORS[op].format(col=q))
+            else:
+                clauses.append(OPERATORS[op].format(col=q))
+                binds.append(_like(value) if op == "like" else value)
+        return " AND ".join(clauses), binds
+
+    def order_by(self, key: str) -> List[str]:
+        """
+        ORDER BY terms, always ending with the id column so pages are stable.
+        """
+        terms = [f"{quote(c)} {'DESC' if desc else 'ASC'}" for c, desc in self.sort]
+        if key not in (c for c, _ in self.sort):
+            terms.append(quote(key))
+        return terms
+
+    def query_string(self) -> str:
+        """
+        The filter/sort parameters re-encoded, for pagination links.
+        """
+        return urlencode(self.params)
@@ -0,0 +1,234 @@
+"""
+Host several PyGoSQL databases behind one ASGI app.
+
+Each sql root is mounted at `/{name}/` with its own PyGoSQLViews: its own
+statement cache, single-flight table, thumbnails and SQLite connection budget.
+Compiled Jinja code is shared across all of them by template source. Databases
+are loaded on their first request and unloaded after sitting idle.
+
+    host = ViewsHost({"app": Path("sql"), "demo": Path("pygosqlviews/sql")})
+    uvicorn.run(host, ...)
+"""
+import asyncio
+import inspect
+import json
+import time
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from loguru import logger as log
+
+from .bytecode import SourceBytecodeCache
+from .pygosqlviews import PyGoSQLViews
+
+
+class Mount:
+    """
+    One database root and, while loaded, its views.
+    """
+
+    def __init__(self, name: str, root: Path):
+        self.name = name
+        self.root = Path(root)
+        self.views: Optional[PyGoSQLViews] = None
+        self.launched = False
+        self.last_used = 0.0
+        self.active = 0
+        self.loads = 0
+        self.lock = asyncio.Lock()
+
+    def __repr__(self):
+        return f"PyGoSQL.Views.Mount({self.name})"
+
+    @property
+    def idle(self) -> float:
+        return time.monotonic() - self.last_used
+
+
+class ViewsHost:
+    """
+    ASGI app that routes `/{name}/...` to the views of one of several databases.
+
+    Args:
+        roots: Mount name → sql root directory.
+        factory: Builds the PyGoSQL for a root (sync or async); defaults to
+            PyGoSQL(sql_root=root, db_path=root / "app.db").
+        launch: Start each database's Go backend on load (via the cached launcher).
+        connections: Concurrent SQLite worker calls allowed per database.
+        idle_seconds: Unload a database after this long without requests.
+        max_loaded: Keep at most this many databases loaded, unloading the least recently used.
+        bytecode_dir: Where the shared compiled templates are persisted; defaults to
+            the first root's .cache/jinja.
+    """
+    IDLE_SECONDS = 600.0
+    REAP_INTERVAL = 30.0
+
+    def __init__(self, roots: Dict[str, Path], factory: Optional[Callable[[str, Path], Any]] = None,
+                 launch: bool = False, connections: int = 4, idle_seconds: Optional[float] = None,
+                 max_loaded: Optional[int] = None, verbose: bool = False,
+                 bytecode_dir: Optional[Path] = None):
+        self.mounts = {name: Mount(name, root) for name, root in roots.items()}
+        self.factory = factory or self._pygosql
+        self.launch = launch
+        self.connections = connections
+        self.idle_seconds = self.IDLE_SECONDS if idle_seconds is None else idle_seconds
+        self.max_loaded = max_loaded
+        self.verbose = verbose
+        if bytecode_dir is None and self.mounts:
+            bytecode_dir = next(iter(self.mounts.values())).root / ".cache" / "jinja"
+        self.bytecode_cache = SourceBytecodeCache(bytecode_dir)
+        self._pages = None
+        self._reaper: Optional[asyncio.Task] = None
+        if self.verbose: log.success(f"{self}: Hosting {list(self.mounts)}")
+
+    def __repr__(self):
+        return "PyGoSQL.Views.Host"
+
+    @classmethod
+    def discover(cls, parent: Path, **kwargs) -> "ViewsHost":
+        """
+        Mount every directory under parent that holds an app.db.
+        """
+        roots = {p.parent.name: p.parent for p in sorted(Path(parent).glob("*/app.db"))}
+        return cls(roots, **kwargs)
+
+    def _pygosql(self, name: str, root: Path):
+        from pygosql import PyGoSQL
+        return PyGoSQL(sql_root=root, db_path=root / "app.db", verbose=self.verbose)
+
+    @property
+    def loaded(self) -> List[Mount]:
+        return [m for m in self.mounts.values() if m.views is not None]
+
+    async def views(self, name: str) -> PyGoSQLViews:
+        """
+        The views for a mount, loading them on first use.
+        """
+        mount = self.mounts[name]
+        mount.last_used = time.monotonic()
+        if mount.views is not None:
+            return mount.views
+        async with mount.lock:
+            if mount.views is None:
+                await self._load(mount)
+        await self._enforce_limit(keep=mount)
+        return mount.views
+
+    async def _load(self, mount: Mount) -> None:
+        started = time.perf_counter()
+        pygosql = self.factory(mount.name, mount.root)
+        if inspect.isawaitable(pygosql):
+            pygosql = await pygosql
+        if self.launch:
+            from .launcher import launch
+            await launch(pygosql)
+            mount.launched = True
+        views = await asyncio.to_thread(
+            PyGoSQLViews, pygosql, mount.root, self.verbose,
+            prefix=f"/{mount.name}", bytecode_cache=self.bytecode_cache
+        )
+        views.sqlite.budget = self.connections
+        if self._pages is None:
+            self._pages = views.pages
+        else:
+            views.pages = self._pages
+        mount.views = views
+        mount.loads += 1
+        views.maintenance.start()
+        await views.warmer.start()
+        if self.verbose: log.info(f"[{self}]: Loaded {mount.name} in {time.perf_counter() - started:.3f}s")
+
+    async def unload(self, name: str) -> bool:
+        """
+        Drop a mount's views, closing its connections and stopping its backend.
+        """
+        mount = self.mounts[name]
+        async with mount.lock:
+            if mount.views is None or mount.active:
+                return False
+            views, mount.views = mount.views, None
+            await views.shutdown()
+            views.sqlite.close()
+            if mount.launched:
+                await views.pygosql.stop()
+                mount.launched = False
+        if self.verbose: log.info(f"[{self}]: Unloaded {name}")
+        return True
+
+    async def _enforce_limit(self, keep: Optional[Mount] = None) -> None:
+        if self.max_loaded is None:
+            return
+        for mount in sorted(self.loaded, key=lambda m: m.last_used):
+            if len(self.loaded) <= self.max_loaded:
+                break
+            if mount is not keep:
+                await self.unload(mount.name)
+
+    async def reap(self) -> List[str]:
+        """
+        Unload every mount idle for longer than idle_seconds.
+        """
+        return [m.name for m in self.loaded if m.idle > self.idle_seconds and await self.unload(m.name)]
+
+    async def _reap_forever(self) -> None:
+        while True:
+            await asyncio.sleep(min(self.REAP_INTERVAL, self.idle_seconds))
+            await self.reap()
+
+    async def close(self) -> None:
+        if self._reaper is not None:
+            self._reaper.cancel()
+            self._reaper = None
+        for mount in self.loaded:
+            mount.active = 0
+            await self.unload(mount.name)
+
+    @asynccontextmanager
+    async def _using(self, mount: Mount):
+        mount.active += 1
+        try:
+            yield
+        finally:
+            mount.active -= 1
+            mount.last_used = time.monotonic()
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "templates": self.bytecode_cache.metrics(),
+            "mounts": {
+                m.name: {
+                    "loaded": m.views is not None, "loads": m.loads, "active": m.active,
+                    "idle_seconds": round(m.idle, 1) if m.last_used else None,
+                }
+                for m in self.mounts.values()
+            },
+        }
+
+    async def _json(self, send, status: int, body: Any) -> None:
+        data = json.dumps(body).encode("utf-8")
+        await send({"type": "http.response.start", "status": status,
+                    "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(data)).encode())]})
+        await send({"type": "http.response.body", "body": data})
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] == "lifespan":
+            while True:
+                message = await receive()
+                if message["type"] == "lifespan.startup":
+                    self._reaper = asyncio.ensure_future(self._reap_forever())
+                    await send({"type": "lifespan.startup.complete"})
+                elif message["type"] == "lifespan.shutdown":
+                    await self.close()
+                    await send({"type": "lifespan.shutdown.complete"})
+                    return
+        path = scope.get("path", "/")
+        name, _, rest = path.lstrip("/").partition("/")
+        if not name or name == "_metrics":
+            return await self._json(send, 200, self.metrics() if name else sorted(self.mounts))
+        if name not in self.mounts:
+            return await self._json(send, 404, {"detail": f"Unknown database '{name}'"})
+        mount = self.mounts[name]
+        async with self._using(mount):
+            views = await self.views(name)
+            await views.app(dict(scope, root_path=scope.get("root_path", "") + f"/{name}"), receive, send)
@@ -0,0 +1,355 @@
+"""
+Cached build and warm launch of the GoSQL backend, without PowerShell.
+
+The backend is compiled once with `go build` into a cache directory keyed by a
+hash of its Go sources, the Go version and the build arguments; later starts
+exec the cached binary directly. Readiness is polled on /health with backoff,
+and a pre-warmed standby process can be kept for near-instant restarts.
+
+    python -m pygosqlviews.launcher build      # compile (or reuse) and print the binary path
+"""
+import argparse
+import asyncio
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from functools import cached_property
+from pathlib import Path
+from typing import List, Optional, Sequence
+
+from loguru import logger as log
+
+from .files import digest
+
+SOURCE_SUFFIXES = (".go", ".mod", ".sum")
+
+
+def cache_root() -> Path:
+    return Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache") / "pygosqlviews" / "go"
+
+
+class GoBuild:
+    """
+    One cached `go build` of a Go module directory.
+    """
+
+    def __init__(self, module_dir: Path, build_args: Sequence[str] = ("-trimpath",),
+                 cache_dir: Optional[Path] = None, go: Optional[str] = None, verbose: bool = False):
+        self.module_dir = Path(module_dir)
+        self.build_args = tuple(build_args)
+        self.cache_dir = Path(cache_dir or cache_root())
+        self.go = go or shutil.which("go") or "go"
+        self.verbose = verbose
+
+    def __repr__(self):
+        return "PyGoSQL.Views.GoBuild"
+
+    @cached_property
+    def go_version(self) -> str:
+        """
+        The toolchain version, read from GOROOT/VERSION when present so that
+        no `go` process is spawned on warm starts.
+        """
+        go = Path(self.go).resolve()
+        version = go.parent.parent / "VERSION"
+        if version.is_file():
+            return version.read_text(encoding="utf-8").splitlines()[0].strip()
+        return subprocess.run([self.go, "env", "GOVERSION"], capture_output=True, text=True, check=True).stdout.strip()
+
+    @property
+    def key(self) -> str:
+        """
+        Hash of every Go source in the module, the Go version, target platform and build args.
+        """
+        parts = [self.go_version, sys.platform, os.environ.get("GOARCH", ""), *self.build_args]
+        for path in sorted(self.module_dir.rglob("*")):
+            if path.suffix in SOURCE_SUFFIXES and path.is_file():
+                parts.append(f"{path.relative_to(self.module_dir).as_posix()}:{digest(path.read_bytes())}")
+        return digest("\n".join(parts))[:20]
+
+    @property
+    def binary(self) -> Path:
+        name = "gosql.exe" if os.name == "nt" else "gosql"
+        return self.cache_dir / self.key / name
+
+    def build(self, force: bool = False) -> Path:
+        """
+        Return the cached binary, compiling it first if this key has none.
+        Concurrent builders each write a temporary file and rename it into place.
+        """
+        binary = self.binary
+        if binary.exists() and not force:
+            os.utime(binary.parent)
+            if self.verbose: log.debug(f"[{self}]: Reusing {binary}")
+            return binary
+        binary.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=binary.parent, prefix=".build.")
+        os.close(fd)
+        started = time.perf_counter()
+        try:
+            proc = subprocess.run(
+                [self.go, "build", *self.build_args, "-o", tmp, "."],
+                cwd=self.module_dir, capture_output=True, text=True
+            )
+            if proc.returncode:
+                raise RuntimeError(f"[{self}]: go build failed:\n{proc.stderr}")
+            os.replace(tmp, binary)
+        finally:
+            Path(tmp).unlink(missing_ok=True)
+        if self.verbose: log.success(f"[{self}]: Built {binary} in {time.perf_counter() - started:.1f}s")
+        return binary
+
+    def prune(self, keep: int = 3) -> int:
+        """
+        Remove all but the most recently used `keep` builds.
+        """
+        builds = sorted((p for p in self.cache_dir.glob("*") if p.is_dir()),
+                        key=lambda p: p.stat().st_mtime, reverse=True)
+        for stale in builds[keep:]:
+            shutil.rmtree(stale, ignore_errors=True)
+        return max(len(builds) - keep, 0)
+
+
+def _with_port(args: Sequence[str], port: int) -> List[str]:
+    args = list(args)
+    for flag in ("-port", "-p"):
+        if flag in args:
+            args[args.index(flag) + 1] = str(port)
+            return args
+    return [*args, "-port", str(port)]
+
+
+async def wait_ready(url: str, timeout: float = 30.0, first: float = 0.005, ceiling: float = 0.25,
+                     process: Optional[asyncio.subprocess.Process] = None) -> float:
+    """
+    Poll url until it answers below 500, doubling the delay from first up to ceiling.
+    Returns the seconds waited; raises if the process exits or timeout passes.
+    """
+    import aiohttp
+    started = time.perf_counter()
+    delay = first
+    async with aiohttp.ClientSession() as session:
+        while True:
+            if process is not None and process.returncode is not None:
+                raise RuntimeError(f"Backend exited with code {process.returncode} before becoming ready")
+            try:
+                async with session.get(url, timeout=aiohttp.ClientTimeout(total=1)) as r:
+                    if r.status < 500:
+                        return time.perf_counter() - started
+            except (aiohttp.ClientError, asyncio.TimeoutError, OSError):
+                pass
+            if time.perf_counter() - started > timeout:
+                raise TimeoutError(f"{url} not ready after {timeout}s")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, ceiling)
+
+
+class Backend:
+    """
+    One running backend process on one port.
+    """
+
+    def __init__(self, process: asyncio.subprocess.Process, port: int):
+        self.process = process
+        self.port = port
+
+    def __repr__(self):
+        return f"PyGoSQL.Views.Backend(:{self.port})"
+
+    @property
+    def url(self) -> str:
+        return f"http://localhost:{self.port}"
+
+    @property
+    def alive(self) -> bool:
+        return self.process.returncode is None
+
+    async def stop(self, grace: float = 5.0) -> None:
+        if not self.alive:
+            return
+        self.process.terminate()
+        try:
+            await asyncio.wait_for(self.process.wait(), grace)
+        except asyncio.TimeoutError:
+            self.process.kill()
+            await self.process.wait()
+
+
+class Launcher:
+    """
+    Drop-in replacement for pygops' GoServer (start/stop/is_running/url)
+    that runs the cached binary and can keep a warm standby.
+    """
+    READY_TIMEOUT = 30.0
+
+    def __init__(self, build: GoBuild, go_args: Sequence[str], port: int, standby: bool = False,
+                 verbose: bool = False):
+        self.build = build
+        self.go_args = list(go_args)
+        self.port = port
+        self.keep_standby = standby
+        self.verbose = verbose
+        self.active: Optional[Backend] = None
+        self._standby_task: Optional[asyncio.Task] = None
+        self.timings = {}
+
+    def __repr__(self):
+        return "PyGoSQL.Views.Launcher"
+
+    @classmethod
+    def for_pygosql(cls, pygosql, **kwargs) -> "Launcher":
+        """
+        A launcher for a PyGoSQL instance, reusing its Go module and command-line flags.
+        """
+        server = pygosql.server
+        go_args = server.kwargs.get("go_args", []) if hasattr(server, "kwargs") else server.go_args
+        build = GoBuild(Path(pygosql._go_file).parent, verbose=pygosql._verbose)
+        return cls(build, go_args, pygosql._port, verbose=pygosql._verbose, **kwargs)
+
+    @property
+    def url(self) -> str:
+        return f"http://localhost:{self.port}"
+
+    async def spawn(self, port: int) -> Backend:
+        """
+        Start the cached binary on port and wait until it is ready.
+        """
+        started = time.perf_counter()
+        binary = await asyncio.to_thread(self.build.build)
+        self.timings["build"] = time.perf_counter() - started
+        out = None if self.verbose else asyncio.subprocess.DEVNULL
+        process = await asyncio.create_subprocess_exec(
+            str(binary), *_with_port(self.go_args, port),
+            cwd=self.build.module_dir, stdout=out, stderr=out
+        )
+        backend = Backend(process, port)
+        try:
+            self.timings["ready"] = await wait_ready(f"{backend.url}/health", self.READY_TIMEOUT, process=process)
+        except BaseException:
+            await backend.stop()
+            raise
+        if self.verbose: log.success(f"[{self}]: {backend} ready in {time.perf_counter() - started:.3f}s")
+        return backend
+
+    async def start(self) -> None:
+        if self.active is not None and self.active.alive:
+            return
+        self.active = await self.spawn(self.port)
+        if self.keep_standby:
+            self.warm()
+
+    def warm(self) -> asyncio.Task:
+        """
+        Start a standby process on a free port in the background.
+        """
+        if self._standby_task is None or self._standby_task.done():
+            from toomanyports import PortManager
+            self._standby_task = asyncio.ensure_future(self.spawn(PortManager.random_port()))
+        return self._standby_task
+
+    async def restart(self) -> int:
+        """
+        Replace the active process, promoting the warm standby when there is one.
+        Returns the port now serving requests.
+        """
+        old = self.active
+        if self.keep_standby:
+            try:
+                self.active = await self.warm()
+            except Exception as e:
+                log.warning(f"[{self}]: Standby failed ({e}), starting cold")
+                self.active = await self.spawn(self.port)
+            self._standby_task = None
+        else:
+            if old is not None:
+                await old.stop()
+                old = None
+            self.active = await self.spawn(self.port)
+        self.port = self.active.port
+        if old is not None:
+            await old.stop()
+        if self.keep_standby:
+            self.warm()
+        return self.port
+
+    async def is_running(self) -> bool:
+        return self.active is not None and self.active.alive
+
+    async def stop(self) -> None:
+        task, self._standby_task = self._standby_task, None
+        if task is not None:
+            if task.done() and not task.cancelled() and task.exception() is None:
+                await task.result().stop()
+            else:
+                task.cancel()
+        if self.active is not None:
+            await self.active.stop()
+            self.active = None
+
+    def get_status(self) -> dict:
+        return {
+            "url": self.url,
+            "running": self.active is not None and self.active.alive,
+            "binary": str(self.build.binary),
+            "standby": self._standby_task is not None and self._standby_task.done(),
+            "timings": self.timings,
+        }
+
+
+async def launch(pygosql, standby: bool = False) -> Launcher:
+    """
+    Launch a PyGoSQL instance on the cached binary instead of its PowerShell
+    launcher, then discover routes as PyGoSQL.launch() does, minus its fixed sleeps.
+    """
+    import aiohttp
+    from pygosql.pygosql import APIRequester
+    launcher = pygosql.server if isinstance(pygosql.server, Launcher) else Launcher.for_pygosql(pygosql, standby=standby)
+    pygosql.server = launcher
+    await launcher.start()
+    pygosql._session = aiohttp.ClientSession()
+    await pygosql._discover_routes()
+    pygosql._requester = APIRequester(
+        base_url=pygosql.base_url, session=pygosql._session, routes=pygosql._routes, verbose=pygosql._verbose
+    )
+    pygosql._setup_hardcoded_functions()
+    return launcher
+
+
+async def restart(pygosql) -> int:
+    """
+    Restart a launched PyGoSQL backend and point the client at the serving port.
+    """
+    port = await pygosql.server.restart()
+    pygosql._port = port
+    pygosql.__dict__["port"] = port
+    pygosql.__dict__["base_url"] = f"http://localhost:{port}"
+    if pygosql._requester is not None:
+        pygosql._requester.base_url = pygosql.base_url
+    return port
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Build and cache the GoSQL backend binary")
+    parser.add_argument("command", choices=["build", "key", "prune"])
+    parser.add_argument("--module", type=Path, default=None, help="Go module directory (default: pygosql's gosql/)")
+    parser.add_argument("--force", action="store_true")
+    args = parser.parse_args(argv)
+    module = args.module
+    if module is None:
+        import pygosql
+        module = Path(pygosql.__file__).parent / "gosql"
+    build = GoBuild(module, verbose=True)
+    if args.command == "key":
+        print(build.key)
+    elif args.command == "prune":
+        print(build.prune())
+    else:
+        print(build.build(force=args.force))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,339 @@
+"""
+In-process load test of the views app against a seeded scratch database.
+
+The app is driven through httpx's ASGI transport, so no server or Go backend
+is started: LocalPyGoSQL stands in for PyGoSQL with direct SQLite writes.
+Virtual users replay a weighted mix of overview, card page, detail, search
+and write requests, and the report gives throughput, p50/p95/p99 latency and
+error and shed rate per route as JSON, for comparing runs before and after a change.
+
+    python -m pygosqlviews.loadtest --concurrency 200 --duration 10 --rows 5000
+    python -m pygosqlviews.loadtest --mix cards=5,detail=5,write=1 --out after.json
+"""
+import argparse
+import asyncio
+import json
+import math
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from .statements import quote
+
+TABLE = "items"
+SCHEMA = f"""
+    PRAGMA journal_mode = WAL;
+    CREATE TABLE {TABLE} (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        title TEXT NOT NULL,
+        status TEXT,
+        owner TEXT,
+        body TEXT,
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+    );
+"""
+ROUTES = {
+    "GET/select.sql": f"SELECT * FROM {TABLE};",
+    "POST/insert.sql": f"INSERT INTO {TABLE} ({{{{columns}}}}) VALUES ({{{{values}}}});",
+    "PUT/update.sql": f"UPDATE {TABLE} SET {{{{updates}}}} WHERE id = ?;",
+    "DELETE/delete.sql": f"DELETE FROM {TABLE} WHERE id = ?;",
+}
+STATUSES = ("active", "pending", "archived", "draft")
+MIX = {"overview": 1, "cards": 5, "detail": 5, "search": 2, "write": 1}
+
+
+class LocalTable:
+    """
+    insert/update/delete/select for one table, run directly on the SQLite file.
+    """
+
+    def __init__(self, pygosql: "LocalPyGoSQL", name: str):
+        self.pygosql = pygosql
+        self.name = name
+
+    def _execute(self, sql: str, params=()) -> sqlite3.Cursor:
+        conn = sqlite3.connect(str(self.pygosql._db_path), timeout=5)
+        try:
+            with conn:
+                return conn.execute(sql, tuple(params))
+        finally:
+            conn.close()
+
+    async def insert(self, **row) -> Dict[str, Any]:
+        sql = (f"INSERT INTO {quote(self.name)} ({', '.join(map(quote, row))}) "
+               f"VALUES ({', '.join('?' for _ in row)})")
+        cursor = await asyncio.to_thread(self._execute, sql, row.values())
+        return {"success": True, "last_insert_id": cursor.lastrowid}
+
+    async def update(self, id, **row) -> Dict[str, Any]:
+        sql = f"UPDATE {quote(self.name)} SET {', '.join(f'{quote(c)} = ?' for c in row)} WHERE id = ?"
+        await asyncio.to_thread(self._execute, sql, [*row.values(), id])
+        return {"success": True}
+
+    async def delete(self, id) -> Dict[str, Any]:
+        await asyncio.to_thread(self._execute, f"DELETE FROM {quote(self.name)} WHERE id = ?", [id])
+        return {"success": True}
+
+
+class LocalPyGoSQL:
+    """
+    The parts of PyGoSQL the views use, backed directly by a SQLite file.
+    """
+
+    def __init__(self, sql_root: Path, db_path: Path, tables: List[str], verbose: bool = False):
+        self._sql_root = Path(sql_root)
+        self._db_path = Path(db_path)
+        self._verbose = verbose
+        self.tables = list(tables)
+        self.table_dirs = [str(self._sql_root / "Tables" / t) for t in self.tables]
+        for t in self.tables:
+            setattr(self, t, LocalTable(self, t))
+
+    def __repr__(self):
+        return "PyGoSQL.Local"
+
+    async def refresh_schema(self) -> Dict[str, List[str]]:
+        def read():
+            conn = sqlite3.connect(str(self._db_path))
+            try:
+                return {t: [r[1] for r in conn.execute(f"PRAGMA table_info({quote(t)})")] for t in self.tables}
+            finally:
+                conn.close()
+        return await asyncio.to_thread(read)
+
+    @property
+    def schema(self):
+        return self.refresh_schema()
+
+    async def stop(self) -> None:
+        pass
+
+
+def seed(root: Path, rows: int, body_chars: int = 2000) -> LocalPyGoSQL:
+    """
+    Create a scratch sql root with one items table of `rows` rows.
+    """
+    db = root / "app.db"
+    table_dir = root / "Tables" / TABLE
+    for name, sql in ROUTES.items():
+        (table_dir / name).parent.mkdir(parents=True, exist_ok=True)
+        (table_dir / name).write_text(sql, encoding="utf-8")
+    (table_dir / "config.json").write_text(json.dumps(
+        {"id": "id", "card_title": "title", "card_subtitle": "owner", "card_image": ""}
+    ), encoding="utf-8")
+    conn = sqlite3.connect(str(db))
+    conn.executescript(SCHEMA)
+    rng = random.Random(0)
+    with conn:
+        conn.executemany(
+            f"INSERT INTO {TABLE} (title, status, owner, body) VALUES (?, ?, ?, ?)",
+            ((f"item {i}", rng.choice(STATUSES), f"owner{int(rng.paretovariate(1.2))}", "x" * body_chars)
+             for i in range(rows))
+        )
+    conn.close()
+    return LocalPyGoSQL(root, db, [TABLE])
+
+
+def percentile(ordered: List[float], p: float) -> float:
+    """Nearest-rank percentile of an ascending list."""
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, max(0, math.ceil(p / 100 * len(ordered)) - 1))]
+
+
+class Recorder:
+    """
+    Latencies and failures per route. 503s from admission control are
+    counted as shed, not as errors.
+    """
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = {}
+        self.errors: Dict[str, int] = {}
+        self.shed: Dict[str, int] = {}
+        self.statuses: Dict[str, Dict[int, int]] = {}
+
+    def add(self, route: str, seconds: float, status: Optional[int]) -> None:
+        self.latencies.setdefault(route, []).append(seconds)
+        codes = self.statuses.setdefault(route, {})
+        codes[status or 0] = codes.get(status or 0, 0) + 1
+        if status == 503:
+            self.shed[route] = self.shed.get(route, 0) + 1
+        elif status is None or status >= 400:
+            self.errors[route] = self.errors.get(route, 0) + 1
+
+    def report(self, elapsed: float) -> Dict[str, Any]:
+        routes = {}
+        for route, samples in sorted(self.latencies.items()):
+            ordered = sorted(samples)
+            errors = self.errors.get(route, 0)
+            routes[route] = {
+                "requests": len(ordered),
+                "rps": round(len(ordered) / elapsed, 1),
+                "errors": errors,
+                "error_rate": round(errors / len(ordered), 4),
+                "shed": self.shed.get(route, 0),
+                "p50_ms": round(percentile(ordered, 50) * 1000, 2),
+                "p95_ms": round(percentile(ordered, 95) * 1000, 2),
+                "p99_ms": round(percentile(ordered, 99) * 1000, 2),
+                "max_ms": round(ordered[-1] * 1000, 2),
+                "statuses": {str(k): v for k, v in sorted(self.statuses[route].items())},
+            }
+        total = sum(r["requests"] for r in routes.values())
+        errors = sum(r["errors"] for r in routes.values())
+        shed = sum(r["shed"] for r in routes.values())
+        everything = sorted(s for samples in self.latencies.values() for s in samples)
+        return {
+            "requests": total,
+            "seconds": round(elapsed, 3),
+            "rps": round(total / elapsed, 1) if elapsed else 0.0,
+            "error_rate": round(errors / total, 4) if total else 0.0,
+            "shed_rate": round(shed / total, 4) if total else 0.0,
+            "p50_ms": round(percentile(everything, 50) * 1000, 2),
+            "p95_ms": round(percentile(everything, 95) * 1000, 2),
+            "p99_ms": round(percentile(everything, 99) * 1000, 2),
+            "routes": routes,
+        }
+
+
+def parse_mix(text: str) -> Dict[str, int]:
+    mix = {}
+    for part in filter(None, (p.strip() for p in text.split(","))):
+        name, _, weight = part.partition("=")
+        if name not in MIX:
+            raise ValueError(f"Unknown route '{name}', expected one of {sorted(MIX)}")
+        mix[name] = int(weight or 1)
+    return mix
+
+
+class LoadTest:
+    """
+    Virtual users replaying a weighted request mix against an ASGI app.
+
+    Args:
+        app: The ASGI app under test.
+        rows: Rows in the seeded table, to pick detail ids and pages from.
+        concurrency: Virtual users running at once.
+        duration: Seconds to run (after warmup), unless requests is reached first.
+        requests: Stop after this many requests in total.
+        mix: Route → relative weight.
+        page_size: Cards per page requested.
+    """
+
+    def __init__(self, app, rows: int, concurrency: int = 50, duration: float = 10.0,
+                 requests: Optional[int] = None, mix: Optional[Dict[str, int]] = None,
+                 page_size: int = 50, seed: int = 0):
+        self.app = app
+        self.rows = rows
+        self.concurrency = concurrency
+        self.duration = duration
+        self.requests = requests
+        self.mix = mix or dict(MIX)
+        self.page_size = page_size
+        self.rng = random.Random(seed)
+        self.recorder = Recorder()
+        self._sent = 0
+
+    def __repr__(self):
+        return "PyGoSQL.Views.LoadTest"
+
+    def request(self, route: str) -> tuple[str, str, Optional[bytes]]:
+        """
+        (method, path, body) for one request of the given route kind.
+        """
+        rng = self.rng
+        pages = max(1, self.rows // self.page_size)
+        if route == "overview":
+            return "GET", "/", None
+        if route == "cards":
+            return "GET", f"/{TABLE}?page={rng.randint(1, min(pages, 20))}&size={self.page_size}", None
+        if route == "detail":
+            return "GET", f"/{TABLE}/{rng.randint(1, max(self.rows, 1))}", None
+        if route == "search":
+            return "GET", f"/{TABLE}?status={rng.choice(STATUSES)}&title__like={rng.randint(1, 99)}&sort=-id", None
+        row = {"title": f"load {rng.random():.6f}", "status": rng.choice(STATUSES), "owner": "loadtest"}
+        return "POST", f"/{TABLE}/import", (json.dumps(row) + "\n").encode()
+
+    async def user(self, client, deadline: float) -> None:
+        routes, weights = list(self.mix), list(self.mix.values())
+        while time.perf_counter() < deadline and (self.requests is None or self._sent < self.requests):
+            self._sent += 1
+            route = self.rng.choices(routes, weights)[0]
+            method, path, body = self.request(route)
+            started = time.perf_counter()
+            try:
+                response = await client.request(method, path, content=body)
+                await response.aread()
+                status = response.status_code
+            except Exception:
+                status = None
+            self.recorder.add(route, time.perf_counter() - started, status)
+
+    async def run(self) -> Dict[str, Any]:
+        import httpx
+        transport = httpx.ASGITransport(app=self.app)
+        limits = httpx.Limits(max_connections=self.concurrency)
+        async with httpx.AsyncClient(transport=transport, base_url="http://loadtest", limits=limits,
+                                     timeout=60) as client:
+            for route in self.mix:
+                method, path, body = self.request(route)
+                await client.request(method, path, content=body)
+            started = time.perf_counter()
+            deadline = started + self.duration
+            await asyncio.gather(*(self.user(client, deadline) for _ in range(self.concurrency)))
+            elapsed = time.perf_counter() - started
+        report = self.recorder.report(elapsed)
+        report["config"] = {
+            "concurrency": self.concurrency, "duration": self.duration, "requests": self.requests,
+            "rows": self.rows, "mix": self.mix, "page_size": self.page_size,
+        }
+        return report
+
+
+async def run(rows: int = 5000, concurrency: int = 50, duration: float = 10.0, requests: Optional[int] = None,
+              mix: Optional[Dict[str, int]] = None, page_size: int = 50, connections: Optional[int] = None,
+              root: Optional[Path] = None) -> Dict[str, Any]:
+    """
+    Seed a scratch database, build the views app over it and load test it.
+    """
+    from .pygosqlviews import PyGoSQLViews
+    with tempfile.TemporaryDirectory() as tmp:
+        base = Path(root or tmp)
+        pygosql = await asyncio.to_thread(seed, base, rows)
+        views = PyGoSQLViews(pygosql, cwd=base, verbose=False)
+        views.sqlite.budget = connections
+        try:
+            return await LoadTest(views.app, rows, concurrency, duration, requests, mix, page_size).run()
+        finally:
+            views.sqlite.close()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Load test the views app in-process")
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--requests", type=int, default=None, help="Stop after this many requests")
+    parser.add_argument("--mix", type=parse_mix, default=dict(MIX),
+                        help="Weighted routes, e.g. overview=1,cards=5,detail=5,search=2,write=1")
+    parser.add_argument("--page-size", type=int, default=50)
+    parser.add_argument("--connections", type=int, default=None, help="SQLite worker calls allowed at once")
+    parser.add_argument("--max-error-rate", type=float, default=0.01)
+    parser.add_argument("--out", type=Path, default=None, help="Also write the JSON report here")
+    args = parser.parse_args(argv)
+    report = asyncio.run(run(
+        args.rows, args.concurrency, args.duration, args.requests, args.mix, args.page_size, args.connections
+    ))
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.out:
+        args.out.write_text(text, encoding="utf-8")
+    return 0 if report["error_rate"] <= args.max_error_rate else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
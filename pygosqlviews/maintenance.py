@@ -0,0 +1,205 @@
+"""
+Background SQLite maintenance for the views database.
+
+Nothing else checkpoints the WAL, refreshes planner statistics or reclaims
+free pages, so the views process schedules it:
+
+    checkpoint   every CHECKPOINT_INTERVAL: PASSIVE, or TRUNCATE once the WAL
+                 passes TRUNCATE_BYTES, so the -wal file stops growing
+    optimize     every OPTIMIZE_INTERVAL: PRAGMA optimize with an analysis_limit,
+                 which re-runs ANALYZE only where the statistics have gone stale
+    vacuum       every VACUUM_INTERVAL: PRAGMA incremental_vacuum in steps, when
+                 the database uses auto_vacuum=INCREMENTAL (switching modes needs
+                 a full VACUUM, which is never run here)
+
+Tasks wait for a quiet moment, meaning no request active or queued in any
+admission class. After MAX_DEFER they run anyway, a checkpoint then only in
+PASSIVE mode. Every task runs in a worker thread under a deadline, so SQLite
+interrupts it once its budget is spent. It uses a zero busy timeout, so a
+lock held by a request or the Go backend skips the run instead of waiting.
+The event loop never blocks on it. Set PYGOSQLVIEWS_MAINTENANCE=0 to turn it off.
+"""
+import asyncio
+import os
+import sqlite3
+import time
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Optional
+
+from loguru import logger as log
+
+from .admission import DEADLINE, Deadline, DeadlineExceeded
+
+
+@dataclass
+class TaskStats:
+    """
+    Runs and outcomes of one maintenance task.
+    """
+    runs: int = 0
+    busy: int = 0
+    interrupted: int = 0
+    failed: int = 0
+    deferred: int = 0
+    seconds: float = 0.0
+    last_run: Optional[float] = None
+    last_seconds: float = 0.0
+    last_result: Optional[Dict[str, Any]] = None
+
+    def as_dict(self) -> Dict[str, Any]:
+        d = asdict(self)
+        d["seconds"] = round(self.seconds, 3)
+        d["last_seconds"] = round(self.last_seconds, 3)
+        return d
+
+
+class Maintenance:
+    """
+    Scheduler of checkpoint, optimize and incremental vacuum runs on the views' SQLite.
+
+    Args:
+        budget: Seconds each run may take before it is interrupted.
+    """
+    TICK = 5.0
+    CHECKPOINT_INTERVAL = 60.0
+    OPTIMIZE_INTERVAL = 3600.0
+    VACUUM_INTERVAL = 3600.0
+    MAX_DEFER = 600.0
+    BUDGET = 2.0
+    TRUNCATE_BYTES = 64 * 1024 * 1024
+    ANALYSIS_LIMIT = 400
+    VACUUM_STEP = 256
+
+    def __init__(self, pygosqlviews, budget: float = BUDGET):
+        self.pygosqlviews = pygosqlviews
+        self.verbose = pygosqlviews.verbose
+        self.budget = budget
+        self.enabled = os.environ.get("PYGOSQLVIEWS_MAINTENANCE", "1") not in ("", "0")
+        self.intervals = {
+            "checkpoint": self.CHECKPOINT_INTERVAL,
+            "optimize": self.OPTIMIZE_INTERVAL,
+            "vacuum": self.VACUUM_INTERVAL,
+        }
+        self.stats = {name: TaskStats() for name in self.intervals}
+        started = time.monotonic()
+        self._due = {name: started + interval for name, interval in self.intervals.items()}
+        self._task: Optional[asyncio.Task] = None
+
+    def __repr__(self):
+        return "PyGoSQL.Views.Maintenance"
+
+    @property
+    def idle(self) -> bool:
+        """No request running or queued in any admission class."""
+        if "admission" not in self.pygosqlviews.__dict__:
+            return True
+        return not any(c.active or c.queued for c in self.pygosqlviews.admission.classes.values())
+
+    def start(self) -> None:
+        if self.enabled and self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run_forever())
+
+    def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _run_forever(self) -> None:
+        while True:
+            await asyncio.sleep(self.TICK)
+            await self.tick()
+
+    async def tick(self) -> None:
+        """
+        Run every task that is due, if the views are idle or it has waited MAX_DEFER.
+        """
+        for name, interval in self.intervals.items():
+            now = time.monotonic()
+            if now < self._due[name]:
+                continue
+            overdue = now - self._due[name] >= self.MAX_DEFER
+            if not self.idle and not overdue:
+                self.stats[name].deferred += 1
+                continue
+            await self.run(name, forced=not self.idle)
+            self._due[name] = time.monotonic() + interval
+
+    async def run(self, name: str, forced: bool = False) -> Optional[Dict[str, Any]]:
+        """
+        Run one task now within the budget, recording its outcome.
+        """
+        stats = self.stats[name]
+        sqlite = self.pygosqlviews.sqlite
+        started = time.monotonic()
+        token = DEADLINE.set(Deadline.after(self.budget))
+        result = None
+        try:
+            result = await sqlite.run(getattr(self, f"_{name}"), sqlite, forced)
+            stats.runs += 1
+        except DeadlineExceeded:
+            stats.interrupted += 1
+        except sqlite3.OperationalError as e:
+            if "locked" in str(e) or "busy" in str(e):
+                stats.busy += 1
+            else:
+                stats.failed += 1
+                log.warning(f"[{self}]: {name} failed: {e}")
+        finally:
+            DEADLINE.reset(token)
+        stats.last_seconds = time.monotonic() - started
+        stats.seconds += stats.last_seconds
+        stats.last_run = time.time()
+        stats.last_result = result
+        if self.verbose: log.debug(f"[{self}]: {name} in {stats.last_seconds:.3f}s: {result}")
+        return result
+
+    def _quietly(self, sqlite, fn):
+        """Run fn on this thread's connection with a zero busy timeout, restoring it after."""
+        conn = sqlite.connect()
+        conn.execute("PRAGMA busy_timeout = 0")
+        try:
+            return fn(conn)
+        finally:
+            conn.set_progress_handler(None, 0)    # so an expired budget cannot interrupt the restore
+            conn.execute(f"PRAGMA busy_timeout = {sqlite.BUSY_TIMEOUT_MS}")
+
+    def _checkpoint(self, sqlite, forced: bool) -> Dict[str, Any]:
+        wal = sqlite.path.with_name(sqlite.path.name + "-wal")
+        size = wal.stat().st_size if wal.exists() else 0
+        mode = "TRUNCATE" if size >= self.TRUNCATE_BYTES and not forced else "PASSIVE"
+        busy, frames, done = self._quietly(
+            sqlite, lambda conn: conn.execute(f"PRAGMA wal_checkpoint({mode})").fetchone()
+        )
+        if busy:
+            raise sqlite3.OperationalError("database is busy")
+        return {"mode": mode, "wal_bytes": size, "frames": frames, "checkpointed": done}
+
+    def _optimize(self, sqlite, forced: bool) -> Dict[str, Any]:
+        def optimize(conn):
+            conn.execute(f"PRAGMA analysis_limit = {self.ANALYSIS_LIMIT}")
+            conn.execute("PRAGMA optimize")
+        self._quietly(sqlite, optimize)
+        return {"analysis_limit": self.ANALYSIS_LIMIT}
+
+    def _vacuum(self, sqlite, forced: bool) -> Dict[str, Any]:
+        def vacuum(conn):
+            if conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+                return {"skipped": "auto_vacuum is not INCREMENTAL"}
+            before = conn.execute("PRAGMA freelist_count").fetchone()[0]
+            free = before
+            while free:
+                conn.execute(f"PRAGMA incremental_vacuum({self.VACUUM_STEP})").fetchall()
+                left = conn.execute("PRAGMA freelist_count").fetchone()[0]
+                if left >= free:
+                    break
+                free = left
+            return {"freed_pages": before - free}
+        return self._quietly(sqlite, vacuum)
+
+    def metrics(self) -> Dict[str, Any]:
+        wal = self.pygosqlviews.sqlite.path.with_name(self.pygosqlviews.sqlite.path.name + "-wal")
+        return {
+            "enabled": self.enabled, "idle": self.idle, "budget": self.budget,
+            "wal_bytes": wal.stat().st_size if wal.exists() else 0,
+            "tasks": {name: s.as_dict() for name, s in self.stats.items()},
+        }
@@ -0,0 +1,87 @@
+"""
+Manifest of generated files and the hashes they were generated from.
+Each entry records the meta-template hash, the render-inputs hash and the
+output hash, so only stale files are regenerated and hand-edited ones are
+left alone. The css and meta-template copies taken from the packaged src/
+are recorded the same way, with the src digest as their meta hash.
+"""
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from loguru import logger as log
+
+from .files import atomic_write, digest, file_digest
+
+MISSING = "missing"      # no file on disk
+UNTRACKED = "untracked"  # file exists but was never recorded
+EDITED = "edited"        # file differs from what was generated
+FRESH = "fresh"          # generated from the current meta-template and inputs
+STALE = "stale"          # generated, untouched, but meta-template or inputs changed
+
+
+class Manifest:
+    """
+    JSON manifest keyed by paths relative to the sql root.
+    Safe to update from the render thread pool; saved atomically.
+    """
+
+    def __init__(self, path: Path, root: Path, verbose: bool = False):
+        self.path = Path(path)
+        self.root = Path(root)
+        self.verbose = verbose
+        self._lock = threading.Lock()
+        self._dirty = False
+        try:
+            self.entries: Dict[str, Dict[str, Any]] = json.loads(self.path.read_text(encoding="utf-8"))
+        except (FileNotFoundError, json.JSONDecodeError):
+            self.entries = {}
+
+    def __repr__(self):
+        return "PyGoSQL.Views.Manifest"
+
+    def key(self, path: Path) -> str:
+        return Path(path).resolve().relative_to(self.root.resolve()).as_posix()
+
+    def get(self, path: Path) -> Optional[Dict[str, Any]]:
+        return self.entries.get(self.key(path))
+
+    def status(self, path: Path, meta: str, inputs: str) -> str:
+        """
+        Classify a generated file against the current meta-template and inputs hashes.
+        """
+        entry = self.get(path)
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return MISSING
+        if entry is None:
+            return UNTRACKED
+        if (st.st_mtime_ns, st.st_size) != tuple(entry.get("stat", ())):
+            if file_digest(path) != entry["output"]:
+                return EDITED
+        if entry["meta"] == meta and entry["inputs"] == inputs:
+            return FRESH
+        return STALE
+
+    def record(self, path: Path, output: str, meta: str, inputs: str, **extra) -> None:
+        st = os.stat(path)
+        with self._lock:
+            self.entries[self.key(path)] = {
+                "meta": meta,
+                "inputs": inputs,
+                "output": digest(output),
+                "stat": [st.st_mtime_ns, st.st_size],
+                **extra,
+            }
+            self._dirty = True
+
+    def save(self) -> None:
+        with self._lock:
+            if not self._dirty:
+                return
+            atomic_write(self.path, json.dumps(self.entries, indent=2, sort_keys=True))
+            self._dirty = False
+        if self.verbose: log.debug(f"[{self}]: Saved {len(self.entries)} entries to {self.path}")
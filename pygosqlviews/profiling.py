@@ -0,0 +1,228 @@
+"""
+On-demand profiling of single requests, written as collapsed stacks or speedscope JSON.
+
+Enabled only when the views have a profile token (PYGOSQLVIEWS_PROFILE_TOKEN
+or PyGoSQLViews.profile_token); without one the middleware is never installed.
+A caller holding the token profiles one request with either of
+
+    X-Profile: <token>            (X-Profile-Format: speedscope)
+    ?_profile=<token>             (&_profile_format=speedscope)
+
+The sampler walks the request task's coroutine chain, so it records the
+async stack of that request only (Table.columns, Table.config, the page
+query, card rendering, Jinja) including the time it spends suspended on
+SQLite worker threads, and not other requests sharing the event loop.
+The file name is returned in the X-Profile-File response header.
+"""
+import asyncio
+import hmac
+import json
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode
+
+from loguru import logger as log
+
+from .files import atomic_write
+
+FORMATS = {"collapsed": "txt", "speedscope": "speedscope.json"}
+
+
+def _label(frame) -> str:
+    code = frame.f_code
+    name = getattr(code, "co_qualname", code.co_name)
+    return f"{name} ({Path(code.co_filename).name}:{code.co_firstlineno})".replace(";", ":")
+
+
+class TaskSampler:
+    """
+    Samples one asyncio task's logical stack from a background thread.
+    Each sample is weighted by the wall time since the previous one, so
+    stretches where the sampler waited for the GIL are still attributed.
+
+    When the task is running, the event loop thread's frames above its
+    innermost coroutine are appended; when it is suspended, the leaf is the
+    awaitable it waits on.
+    """
+    _lock = threading.Lock()
+    _active = 0
+    _switch = 0.005
+
+    def __init__(self, task: asyncio.Task, thread_id: int, interval: float = 0.001):
+        self.task = task
+        self.thread_id = thread_id
+        self.interval = interval
+        self.samples: Counter = Counter()  # stack → seconds attributed to it
+        self.count = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.started = self.finished = 0.0
+
+    def __repr__(self):
+        return "PyGoSQL.Views.TaskSampler"
+
+    def stack(self) -> Tuple[str, ...]:
+        stack: List[str] = []
+        coro, leaf = self.task.get_coro(), None
+        while coro is not None:
+            frame = getattr(coro, "cr_frame", None) or getattr(coro, "gi_frame", None) or getattr(coro, "ag_frame", None)
+            if frame is None:
+                stack.append(f"<await {type(coro).__name__.replace('FutureIter', 'Future')}>")
+                break
+            stack.append(_label(frame))
+            awaited = getattr(coro, "cr_await", None) or getattr(coro, "gi_yieldfrom", None) or getattr(coro, "ag_await", None)
+            if awaited is None:
+                leaf = frame
+                break
+            coro = awaited
+        if leaf is not None:
+            running, frame = [], sys._current_frames().get(self.thread_id)
+            while frame is not None and frame is not leaf:
+                running.append(_label(frame))
+                frame = frame.f_back
+            if frame is leaf:
+                stack += reversed(running)
+        return tuple(stack)
+
+    def _run(self) -> None:
+        last = self.started
+        while not self._stop.wait(self.interval):
+            if self.task.done():
+                break
+            stack = self.stack()
+            now = time.perf_counter()
+            if stack:
+                self.samples[stack] += now - last
+                self.count += 1
+            last = now
+
+    def start(self) -> "TaskSampler":
+        """
+        Start sampling. The interpreter's thread switch interval is lowered to
+        the sampling interval while any sampler runs, or CPU-bound stretches on
+        the event loop (Jinja rendering) would hold the GIL past many samples.
+        """
+        with TaskSampler._lock:
+            if not TaskSampler._active:
+                TaskSampler._switch = sys.getswitchinterval()
+                sys.setswitchinterval(min(TaskSampler._switch, self.interval))
+            TaskSampler._active += 1
+        self.started = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+            with TaskSampler._lock:
+                TaskSampler._active -= 1
+                if not TaskSampler._active:
+                    sys.setswitchinterval(TaskSampler._switch)
+        self.finished = time.perf_counter()
+
+    def collapsed(self) -> str:
+        """Brendan Gregg's folded format: `outer;inner microseconds` per line."""
+        return "".join(f"{';'.join(stack)} {round(s * 1e6)}\n" for stack, s in self.samples.most_common())
+
+    def speedscope(self, name: str) -> Dict[str, Any]:
+        frames: Dict[str, int] = {}
+        samples, weights = [], []
+        for stack, seconds in self.samples.items():
+            samples.append([frames.setdefault(f, len(frames)) for f in stack])
+            weights.append(round(seconds * 1000, 3))
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "shared": {"frames": [{"name": f} for f in frames]},
+            "profiles": [{
+                "type": "sampled", "name": name, "unit": "milliseconds",
+                "startValue": 0, "endValue": round((self.finished - self.started) * 1000, 3),
+                "samples": samples, "weights": weights,
+            }],
+            "name": name,
+            "exporter": "pygosqlviews",
+        }
+
+
+class ProfileMiddleware:
+    """
+    ASGI middleware that profiles requests carrying the profile token.
+    """
+    HEADER = b"x-profile"
+    FORMAT_HEADER = b"x-profile-format"
+    PARAM = "_profile"
+    FORMAT_PARAM = "_profile_format"
+    KEEP = 100
+
+    def __init__(self, app, token: str, path: Path, interval: float = 0.001, verbose: bool = False):
+        self.app = app
+        self.token = token.encode("utf-8")
+        self.path = Path(path)
+        self.interval = interval
+        self.verbose = verbose
+
+    def __repr__(self):
+        return "PyGoSQL.Views.Profiler"
+
+    def _requested(self, scope) -> Tuple[Optional[str], Dict[str, Any]]:
+        """
+        The profile format if this request may be profiled, and the scope
+        with the profiling query parameters removed.
+        """
+        headers = dict(scope.get("headers") or [])
+        token, fmt = headers.get(self.HEADER), headers.get(self.FORMAT_HEADER, b"collapsed").decode("latin-1")
+        query = scope.get("query_string", b"")
+        if token is None and self.PARAM.encode() not in query:
+            return None, scope
+        params = parse_qsl(query.decode("latin-1"), keep_blank_values=True)
+        kept = [(k, v) for k, v in params if k not in (self.PARAM, self.FORMAT_PARAM)]
+        for k, v in params:
+            if k == self.PARAM and token is None:
+                token = v.encode("utf-8")
+            elif k == self.FORMAT_PARAM:
+                fmt = v
+        scope = dict(scope, query_string=urlencode(kept).encode("latin-1"))
+        if token is None or not hmac.compare_digest(token, self.token):
+            if self.verbose: log.warning(f"[{self}]: Ignoring profile request with a bad token")
+            return None, scope
+        return (fmt if fmt in FORMATS else "collapsed"), scope
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        fmt, scope = self._requested(scope)
+        if fmt is None:
+            return await self.app(scope, receive, send)
+        slug = re.sub(r"[^A-Za-z0-9]+", "-", scope["path"]).strip("-") or "root"
+        name = f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{id(scope) & 0xffff:04x}-{slug}.{FORMATS[fmt]}"
+
+        async def send_with_header(message) -> None:
+            if message["type"] == "http.response.start":
+                message = dict(message, headers=[*message.get("headers", []), (b"x-profile-file", name.encode())])
+            await send(message)
+
+        sampler = TaskSampler(asyncio.current_task(), threading.get_ident(), self.interval).start()
+        try:
+            await self.app(scope, receive, send_with_header)
+        finally:
+            sampler.stop()
+            await asyncio.to_thread(self.save, sampler, fmt, name, f"{scope['method']} {scope['path']}")
+
+    def save(self, sampler: TaskSampler, fmt: str, name: str, title: str) -> Path:
+        path = self.path / name
+        data = sampler.collapsed() if fmt == "collapsed" else json.dumps(sampler.speedscope(title))
+        atomic_write(path, data)
+        for stale in sorted(self.path.glob("*"), key=lambda p: p.stat().st_mtime)[:-self.KEEP]:
+            stale.unlink(missing_ok=True)
+        if self.verbose:
+            log.info(f"[{self}]: {title} → {path} ({sampler.count} samples, "
+                     f"{(sampler.finished - sampler.started) * 1000:.1f}ms)")
+        return path
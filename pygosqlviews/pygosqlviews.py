@@ -4,30 +4,48 @@ Simple card/detail navigation: database → table → row
 """
 import json
 import asyncio
-import shutil
-import sqlite3
+import os
 import time
+from contextlib import asynccontextmanager
 from functools import cached_property
-from json import JSONDecodeError
 from pathlib import Path
 from types import SimpleNamespace
-from typing import Dict, List, Optional, Any, Union
-from datetime import datetime
+from typing import TYPE_CHECKING, Dict, List, Optional, Any, AsyncIterator, Callable, Union
+from concurrent.futures import ThreadPoolExecutor
 
-import async_property
-import jinja2
 from async_property import AwaitLoader, async_cached_property
-from fastapi import FastAPI, Request, HTTPException, Query
-from fastapi.responses import HTMLResponse
-from fastapi.staticfiles import StaticFiles
-from fastapi.templating import Jinja2Templates
-from jinja2 import Template
-from pygosql import PyGoSQL
+from markupsafe import Markup, escape
 from loguru import logger as log
 from toomanyplugins import plugin
 
 from pygosql import PyGoSQL
 
+from .admission import Admission, AdmissionMiddleware
+from .budget import TableBudget
+from .singleflight import SingleFlight
+from .thumbnails import TOKEN, ThumbnailCache, card_expressions, is_remote
+from .statements import StatementCache, quote
+from .files import atomic_write, digest, file_digest
+from .manifest import EDITED, FRESH, MISSING, STALE, UNTRACKED, Manifest
+from .facets import Facets
+from .changes import Change, ChangeFeed
+from .filters import QueryFilter
+from .transfer import Encoder, TransferStats, check_format, decode_blobs, records
+
+# FastAPI, Jinja2 and sqlite3 are imported where they are first needed, so that
+# importing the plugin stays cheap; see `python -m pygosqlviews.bench imports`.
+if TYPE_CHECKING:
+    import jinja2
+    from fastapi import FastAPI
+    from .advisor import IndexAdvisor
+    from .bytecode import SourceBytecodeCache
+    from .maintenance import Maintenance
+    from .readpool import ReadPool
+    from .routes import Routes
+    from .sqlite import SQLite
+    from .static import ExportStats
+    from .warmup import AccessLog, Warmer
+
 @plugin(PyGoSQL, cached_property)
 def views(self):
     """Add views property to PyGoSQL instances"""
@@ -35,10 +53,16 @@ def views(self):
     return PyGoSQLViews(self, cwd=self._sql_root, verbose=self._verbose)
 
 class PyGoSQLViews(AwaitLoader):
-    def __init__(self, pygosql: PyGoSQL, cwd: Path, verbose:bool = True):
+    def __init__(self, pygosql: PyGoSQL, cwd: Path, verbose:bool = True, prefix: str = "",
+                 bytecode_cache: Optional["SourceBytecodeCache"] = None,
+                 readers: Optional[List[Union[PyGoSQL, Path]]] = None):
         self.pygosql = pygosql
         self.cwd = cwd
         self.verbose = verbose
+        self.prefix = prefix.rstrip("/")
+        self.readers = list(readers or ())
+        if bytecode_cache is not None:
+            self.bytecode_cache = bytecode_cache
         _ = self.dir
         _ = self.tables
         if self.verbose: log.success(f"[{self}]: Successfully initialized!")
@@ -54,10 +78,74 @@ class PyGoSQLViews(AwaitLoader):
     def template_manager(self):
         return TemplateManager(self)
 
+    @cached_property
+    def bytecode_cache(self) -> "SourceBytecodeCache":
+        """
+        Compiled Jinja code shared by every environment of these views,
+        or of every database in a ViewsHost when one is passed in.
+        Persisted under sql_root/.cache/jinja for restarts and other workers.
+        """
+        from .bytecode import SourceBytecodeCache
+        return SourceBytecodeCache(Path(self.pygosql._sql_root) / ".cache" / "jinja")
+
+    @cached_property
+    def sqlite(self) -> "SQLite":
+        from .sqlite import SQLite
+        return SQLite(self)
+
+    @cached_property
+    def reads(self) -> "ReadPool":
+        """
+        Where Table reads go: the primary SQLite, plus any readers passed in (see readpool.py).
+        """
+        from .readpool import ReadPool
+        return ReadPool(self, self.readers)
+
+    @cached_property
+    def statements(self) -> StatementCache:
+        return StatementCache(self)
+
+    @cached_property
+    def flights(self) -> SingleFlight:
+        return SingleFlight(self.verbose)
+
+    @cached_property
+    def thumbnails(self) -> ThumbnailCache:
+        return ThumbnailCache(self)
+
+    @cached_property
+    def budget(self) -> TableBudget:
+        return TableBudget(self)
+
+    @cached_property
+    def admission(self) -> Admission:
+        return Admission(self)
+
+    @cached_property
+    def access(self) -> "AccessLog":
+        from .warmup import AccessLog
+        return AccessLog(self)
+
+    @cached_property
+    def warmer(self) -> "Warmer":
+        from .warmup import Warmer
+        return Warmer(self)
+
+    @cached_property
+    def maintenance(self) -> "Maintenance":
+        from .maintenance import Maintenance
+        return Maintenance(self)
+
+    @cached_property
+    def advisor(self) -> "IndexAdvisor":
+        from .advisor import IndexAdvisor
+        return IndexAdvisor(self)
+
     @cached_property
     def tables(self) -> SimpleNamespace:
         tables = {}
         if self.verbose: log.debug(f"{self}: Attempting to construct table classes...")
+        self.template_manager.render_tables(self.pygosql.table_dirs)
         for table in self.pygosql.table_dirs:
             table = Path(table)
             tables[table.name] = Table(self, table)
@@ -72,15 +160,148 @@ class PyGoSQLViews(AwaitLoader):
     async def database(self):
         return await self.pygosql.database
 
+    async def regenerate(self, force: bool = False) -> Dict[str, int]:
+        """
+        Regenerate stale table templates/configs using each table's current columns.
+        """
+        tables = [t for t in vars(self.tables).values() if isinstance(t, Table)]
+        for t in tables:
+            t.invalidate("columns")
+        columns = {t.name: list(await t.columns) for t in tables}
+        stats = await asyncio.to_thread(
+            self.template_manager.render_tables, [t.path for t in tables], columns, force
+        )
+        for t in tables:
+            t.invalidate("config")
+        return stats
+
+    @cached_property
+    def routes(self) -> "Routes":
+        from .routes import Routes
+        return Routes(self)
+
+    @cached_property
+    def app(self) -> "FastAPI":
+        from fastapi import FastAPI
+        app = FastAPI(
+            title="PyGoSQL Views",
+            description="HTML admin interface for PyGoSQL APIs",
+            lifespan=self.lifespan
+        )
+        self.routes.setup(app)
+        app.add_middleware(AdmissionMiddleware, admission=self.admission)
+        if self.profile_token:
+            from .profiling import ProfileMiddleware
+            app.add_middleware(
+                ProfileMiddleware, token=self.profile_token,
+                path=Path(self.pygosql._sql_root) / ".cache" / "profiles", verbose=self.verbose
+            )
+        if self.verbose: log.success(f"{self}: FastAPI app ready with {len(app.routes)} routes")
+        return app
+
+    @asynccontextmanager
+    async def lifespan(self, app: "FastAPI") -> AsyncIterator[None]:
+        """
+        Warm caches from the access histogram and start SQLite maintenance on
+        startup; stop both and persist the histogram on shutdown.
+        """
+        self.maintenance.start()
+        await self.warmer.start()
+        try:
+            yield
+        finally:
+            await self.shutdown()
+
+    async def shutdown(self) -> None:
+        """
+        Stop warming, maintenance and read backend probes, and persist the
+        access histogram for the next start.
+        """
+        if "reads" in self.__dict__:
+            self.reads.close()
+        if "thumbnails" in self.__dict__:
+            self.thumbnails.close()
+        if "maintenance" in self.__dict__:
+            self.maintenance.stop()
+        if "warmer" in self.__dict__:
+            self.warmer.stop()
+        if "access" in self.__dict__:
+            await asyncio.to_thread(self.access.save)
+
+    @cached_property
+    def profile_token(self) -> Optional[str]:
+        """
+        Secret that lets a caller profile a single request (see profiling.py).
+        Read from PYGOSQLVIEWS_PROFILE_TOKEN; set it before the app is built.
+        Without one no profiling code is installed.
+        """
+        return os.environ.get("PYGOSQLVIEWS_PROFILE_TOKEN") or None
+
+    @cached_property
+    def pages(self) -> "jinja2.Environment":
+        """
+        Jinja environment for the app's own page templates in src/.
+        """
+        import jinja2
+        return jinja2.Environment(
+            loader=jinja2.FileSystemLoader(str(Path(__file__).parent / "src")),
+            autoescape=True,
+            bytecode_cache=self.bytecode_cache
+        )
+
+    def render_page(self, title: str, template: Optional[str] = None, content: str = "", **context) -> str:
+        """
+        Render a full page: a src/ template with context (or ready-made content) inside page.j2.
+        """
+        if template is not None:
+            content = self.pages.get_template(template).render(prefix=self.prefix, **context)
+        return self.pages.get_template("page.j2").render(title=title, content=Markup(content), prefix=self.prefix)
+
+    async def overview(self) -> List[Dict[str, Any]]:
+        """
+        Name, title and row count of every table, for the database overview page.
+        """
+        tables = [t for t in vars(self.tables).values() if isinstance(t, Table)]
+        counts = await asyncio.gather(*(t.count() for t in tables))
+        return [{"name": t.name, "title": t.name.replace("_", " ").title(), "rows": n} for t, n in zip(tables, counts)]
+
+    async def export_static(self, out_dir: Path, **kwargs) -> "ExportStats":
+        """
+        Pre-render the overview, every card page and every detail page to out_dir.
+        See StaticExport for the layout and options; re-runs only rewrite changed rows.
+        """
+        from .static import StaticExport
+        return await StaticExport(self, out_dir, **kwargs).run()
+
 class Directories:
-    """Manages directory structure and file creation for PyGoSQLViews"""
+    """
+    Manages directory structure and file creation for PyGoSQLViews.
+
+    The css and meta-templates are copied from the packaged src/ into the sql
+    root, where they may be customised. The manifest records the src digest
+    each copy was taken from, so untouched copies are refreshed when the
+    package ships new versions and copies edited by hand are kept.
+    """
+    # src digests shipped before copies were recorded in the manifest
+    EARLIER_SOURCES = {
+        "card.j2": (
+            "67c7a8dac0ee1daa603a59e4aac39d3671a884a26b576ccbe5c65fe1515c2661",
+            "6ea0593ec87a8d0c6101d428b7ff7e491bfb4e97a32d5e3ad48b68316c6bc6a5",
+        ),
+        "detail.j2": ("84dbd39f4765b3bfe10cd538af47bc48729e8aede38f7b58d451898f954a2355",),
+        "default.css": (
+            "653cb1fff96f6545e49aebe667e5f818d8e13220ad7492afdabaffb7b07d3d83",
+            "884130e7743594c4de9d9f1357a74b1bad5da6f7ef4e9fdcd7b106ebf93f8472",
+        ),
+    }
 
     def __init__(self, pygosqlviews: PyGoSQLViews):
         self.pygosqlviews = pygosqlviews
         self.pygosql = pygosqlviews.pygosql
         self.dir = self.pygosqlviews.cwd
         self.verbose = self.pygosqlviews.verbose
-        self.src = Path(__file__).parent / "default"
+        self.src = Path(__file__).parent / "src"
+        self.replaced: Dict[str, str] = {}
         _ = self.paths
         if self.verbose: log.success(f"{self}: Successfully Initialized!")
 
@@ -95,22 +316,16 @@ class Directories:
         css_dir.mkdir(exist_ok=True)
         if self.verbose: log.debug(f"{self}: created css_dir at {css_dir}")
 
-        css_src = self.src / 'default.css'
-        css_dest = css_dir / 'default.css'
-        if not css_dest.exists():
-            shutil.copy(css_src, css_dir)
-            if self.verbose: log.debug(f"{self}: copied {css_src.name} to {css_dest}")
-
         templates_dir = self.dir / "templates"
         templates_dir.mkdir(exist_ok=True)
         if self.verbose: log.debug(f"{self}: created templates_dir at {templates_dir}")
 
+        self.manifest = Manifest(templates_dir / "manifest.json", self.dir, verbose=self.verbose)
+        css_dest = css_dir / 'default.css'
+        self.copy('default.css', css_dest)
         for src in ('card.j2', 'detail.j2'):
-            src_path = self.src / src
-            dest = templates_dir / src
-            if not dest.exists():
-                shutil.copy(src_path, templates_dir)
-                if self.verbose: log.debug(f"{self}: copied {src} to {dest}")
+            self.copy(src, templates_dir / src)
+        self.manifest.save()
 
         tables = []
         for tbl in self.pygosql.tables:
@@ -128,24 +343,98 @@ class Directories:
         if self.verbose: log.debug(f"{self}: paths namespace ready {ns}")
         return ns
 
+    def copy(self, name: str, dest: Path) -> None:
+        """
+        Copy a src file into the sql root, or refresh an untouched earlier copy of it.
+        The replaced text of refreshed copies is kept in `replaced`.
+        """
+        source = (self.src / name).read_bytes()
+        shipped = digest(source)
+        status = self.manifest.status(dest, shipped, "")
+        if status == UNTRACKED:
+            current = file_digest(dest)
+            if current == shipped:
+                status = FRESH
+            elif current in self.EARLIER_SOURCES.get(name, ()):
+                status = STALE
+            else:
+                if self.verbose: log.warning(f"{self}: {dest} differs from every shipped {name}, leaving it alone")
+                return
+        if status == EDITED:
+            if self.verbose: log.warning(f"{self}: {dest} was edited by hand, leaving it alone")
+            return
+        if status in (MISSING, STALE):
+            if status == STALE:
+                self.replaced[name] = dest.read_text(encoding="utf-8")
+            atomic_write(dest, source)
+            if self.verbose: log.debug(f"{self}: copied {name} to {dest}")
+        if status != FRESH or self.manifest.get(dest) is None:
+            self.manifest.record(dest, source, shipped, "")
+
 class TemplateManager:
     """
-    Manages Jinja2 template rendering for default templates.
+    Manages Jinja2 rendering of the meta-templates into per-table templates.
+    Meta-templates are compiled once; per-table outputs are rendered on a thread pool.
     """
-    instance=None
-    src_env = {
-    }
-    envs = {
-    }
-    def __init__(self, pygosqlviews: PyGoSQLViews):
+    META_TEMPLATES = ("card.j2", "detail.j2")
+
+    def __init__(self, pygosqlviews: PyGoSQLViews, workers: Optional[int] = None):
         self.pygosqlviews = pygosqlviews
         self.verbose = pygosqlviews.verbose
-        tmpl_dir = self.pygosqlviews.dir.src
+        self.dir = self.pygosqlviews.dir.paths.card.parent
+        self.workers = workers or min(32, (os.cpu_count() or 1) + 4)
+
+    def __repr__(self):
+        return "PyGoSQL.Views.TemplateManager"
 
     @cached_property
-    def src(self):
+    def src(self) -> "jinja2.Environment":
+        """
+        Environment over the meta-templates directory.
+        """
+        import jinja2
+        return jinja2.Environment(
+            loader=jinja2.FileSystemLoader(str(self.dir)),
+            autoescape=False,
+            bytecode_cache=self.pygosqlviews.bytecode_cache
+        )
 
-    def render_meta_template(self, target_dir: Path, **kwargs) -> None:
+    @cached_property
+    def meta_templates(self) -> Dict[str, "jinja2.Template"]:
+        """
+        Each meta-template compiled exactly once.
+        """
+        return {name: self.src.get_template(name) for name in self.META_TEMPLATES}
+
+    @cached_property
+    def manifest(self) -> Manifest:
+        """
+        Shared with Directories, which records the src copies in the same file.
+        """
+        return self.pygosqlviews.dir.manifest
+
+    @cached_property
+    def meta_hashes(self) -> Dict[str, str]:
+        """
+        Hash of each meta-template's source, plus the default config.
+        """
+        hashes = {name: digest((self.dir / name).read_text(encoding="utf-8")) for name in self.META_TEMPLATES}
+        hashes["config.json"] = digest(json.dumps(Table.DEFAULT_CONFIG, sort_keys=True))
+        return hashes
+
+    @staticmethod
+    def context(table_dir: Path) -> Dict[str, Any]:
+        """
+        Render inputs for one table's meta-templates.
+        """
+        name = Path(table_dir).name
+        return {
+            "table_name": name,
+            "detail_route": f"/{name}/{{id}}",
+            "detail_config": {},
+        }
+
+    def render_meta_template(self, default_path: Path, target_dir: Path, **kwargs) -> bool:
         """
         Render a Jinja2 template from default_path into target_dir using provided context.
 
@@ -153,22 +442,104 @@ class TemplateManager:
             default_path: Path to the source .j2 file.
             target_dir: Directory where rendered file will be written.
             **kwargs: Context parameters for Jinja2 rendering.
+
+        Returns:
+            True if the file was written, False if its content was already up to date.
         """
-        env = self._env_cache.get(tmpl_dir)
-        if not env:
-            env = jinja2.Environment(
-                loader=jinja2.FileSystemLoader(str(tmpl_dir)),
-                autoescape=False
-            )
-            self._env_cache[tmpl_dir] = env
-        template = env.get_template(default_path.name)
-        rendered = template.render(**kwargs)
-        out_path = target_dir / default_path.name
-        out_path.write_text(rendered, encoding="utf-8")
+        return self._render(default_path.name, Path(target_dir), kwargs)[1]
+
+    def _render(self, name: str, target_dir: Path, context: Dict[str, Any], adopt_only: bool = False) -> tuple[str, bool]:
+        if name == "config.json":
+            rendered = json.dumps(Table.DEFAULT_CONFIG, indent=2)
+        else:
+            template = self.meta_templates.get(name) or self.src.get_template(name)
+            rendered = template.render(**context)
+        out_path = target_dir / name
+        current = file_digest(out_path)
+        if current == digest(rendered) or adopt_only:
+            return rendered, False
+        atomic_write(out_path, rendered)
+        if self.verbose:
+            log.info(f"[{self}]: Rendered {name} to {out_path}.")
+        return rendered, True
+
+    def render_tables(self, table_dirs: List[Path], columns: Optional[Dict[str, List[str]]] = None,
+                      force: bool = False) -> Dict[str, int]:
+        """
+        Regenerate stale per-table files (card.j2, detail.j2, config.json) concurrently.
+
+        Each output is checked against the manifest: missing and stale files
+        are rendered, fresh ones are skipped without rendering, and files
+        edited by hand (or never generated by us) are left alone.
+
+        Args:
+            table_dirs: Table directories to check.
+            columns: Current columns per table name; tables without an entry
+                reuse the columns recorded at their last generation.
+            force: Re-render fresh files too (hand-edited files are still kept).
+        """
+        columns = columns or {}
+        stats = {MISSING: 0, STALE: 0, FRESH: 0, EDITED: 0, UNTRACKED: 0, "written": 0}
+        jobs = []
+        for table_dir in map(Path, table_dirs):
+            context = self.context(table_dir)
+            for name in (*self.META_TEMPLATES, "config.json"):
+                out_path = table_dir / name
+                entry = self.manifest.get(out_path) or {}
+                cols = columns.get(table_dir.name, entry.get("columns", []))
+                inputs = digest(json.dumps({**context, "columns": cols}, sort_keys=True))
+                status = self.manifest.status(out_path, self.meta_hashes[name], inputs)
+                if status == UNTRACKED and self.rendered_before(name, out_path, context):
+                    status = STALE
+                stats[status] += 1
+                if status == EDITED:
+                    if self.verbose: log.warning(f"[{self}]: {out_path} was edited by hand, leaving it alone.")
+                    continue
+                if status == FRESH and not force:
+                    continue
+                jobs.append((name, table_dir, context, status, inputs, cols))
+        if not jobs:
+            return stats
+        started = time.perf_counter()
+
+        def run(job) -> bool:
+            name, table_dir, context, status, inputs, cols = job
+            rendered, wrote = self._render(name, table_dir, context, adopt_only=status == UNTRACKED)
+            if status == UNTRACKED and file_digest(table_dir / name) != digest(rendered):
+                if self.verbose: log.warning(f"[{self}]: {table_dir / name} was not generated by us, leaving it alone.")
+                return False
+            self.manifest.record(table_dir / name, rendered, self.meta_hashes[name], inputs, columns=cols)
+            return wrote
+
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="meta-render") as pool:
+            stats["written"] = sum(pool.map(run, jobs))
+        self.manifest.save()
         if self.verbose:
-            log.info(f"[TemplateManager]: Rendered {default_path.name} to {out_path}.")
+            log.success(f"[{self}]: Regenerated {stats} in {time.perf_counter() - started:.3f}s.")
+        return stats
+
+    def rendered_before(self, name: str, out_path: Path, context: Dict[str, Any]) -> bool:
+        """
+        Whether an untracked output is exactly what the meta-template copy
+        refreshed on this start rendered, so it can be regenerated.
+        """
+        previous = self.pygosqlviews.dir.replaced.get(name)
+        if previous is None:
+            return False
+        return file_digest(out_path) == digest(self.src.from_string(previous).render(**context))
+
+    def record_config(self, config_path: Path, text: str) -> None:
+        """
+        Keep the manifest in step after the views themselves rewrite a config.json.
+        """
+        entry = self.manifest.get(config_path)
+        if entry is None:
+            return
+        self.manifest.record(config_path, text, entry["meta"], entry["inputs"], columns=entry.get("columns", []))
+        self.manifest.save()
 
 class Table(AwaitLoader):
+    PREVIEW_CHARS = 500
     DEFAULT_CONFIG = {
         "id": "", #This is your id column specified from the SQL Table
         "card_title": "", #This is your column specified as the card title
@@ -212,6 +583,24 @@ class Table(AwaitLoader):
             config.write_text(json.dumps(self.DEFAULT_CONFIG, indent=2), encoding="utf-8")
         return SimpleNamespace(card=card, detail=detail, config=config)
 
+    def invalidate(self, *names: str) -> None:
+        """
+        Drop cached (async) properties so they are rebuilt on next access.
+        """
+        state = self.__dict__.get("__async_property__")
+        for name in names:
+            self.__dict__.pop(name, None)
+            if state is not None:
+                state.cache.pop(name, None)
+
+    def render_from_default(self, default_path: Path) -> bool:
+        """
+        Render one meta-template into this table's directory.
+        """
+        return self.pygosqlviews.template_manager.render_meta_template(
+            default_path, self.path, **TemplateManager.context(self.path)
+        )
+
     @async_cached_property
     async def columns(self) -> list[str]:
         """
@@ -224,11 +613,11 @@ class Table(AwaitLoader):
         except Exception as e:
             if self.verbose:
                 log.warning(f"[{self}]: Failed to fetch schema: {e}. Refreshing schema.")
-            schema = await self.pygosql.refresh_schema()
+            schema = await self.pygosqlviews.flights.do("schema", self.pygosql.refresh_schema)
         if self.name not in schema:
             if self.verbose:
                 log.warning(f"[{self}]: {self.name} not in schema cache. Refreshing schema.")
-            schema = await self.pygosql.refresh_schema()
+            schema = await self.pygosqlviews.flights.do("schema", self.pygosql.refresh_schema)
         cols = schema.get(self.name, [])
         if cols:
             if self.verbose:
@@ -244,7 +633,7 @@ class Table(AwaitLoader):
         """
         if self.verbose:
             log.info(f"[{self}]: Retrieving schema for {self.name}.")
-        self.__dict__.pop("columns", None)
+        self.invalidate("columns")
         if self.verbose:
             log.debug(f"[{self}]: Cleared cached columns.")
         return await self.columns
@@ -262,29 +651,469 @@ class Table(AwaitLoader):
         if empty:
             if self.verbose:
                 log.warning(f"[{self}]: Empty config fields {empty}, auto-populating.")
-            await self._auto_populate_config()
-            self.__dict__.pop("config", None)
-            return await self.config
+            ns = SimpleNamespace(**await self.pygosqlviews.flights.do(
+                ("config", self.name), self._auto_populate_config, label=f"config {self.name}"
+            ))
         return ns
 
-    async def _auto_populate_config(self) -> None:
+    async def _auto_populate_config(self) -> Dict[str, Any]:
         """
-        Auto-populate config file with defaults based on table columns.
+        Auto-populate empty config fields with defaults based on table columns.
         """
+        cfg_path = self.paths.config
+        cfg = json.loads(cfg_path.read_text(encoding="utf-8"))
         cols = await self.columns
         if not cols:
             if self.verbose:
                 log.error(f"[{self}]: No columns available for auto-population.")
-            return
-        cfg_path = self.paths.config
-        cfg = json.loads(cfg_path.read_text(encoding="utf-8"))
-        cfg.setdefault("id", cols[0])
-        cfg.setdefault("card_title", cols[1] if len(cols) > 1 else cols[0])
-        cfg.setdefault("card_subtitle", cols[2] if len(cols) > 2 else "")
-        cfg.setdefault("card_image", next((c for c in cols if "img" in c.lower()), ""))
-        cfg_path.write_text(json.dumps(cfg, indent=2), encoding="utf-8")
+            return cfg
+        defaults = {
+            "id": cols[0],
+            "card_title": cols[1] if len(cols) > 1 else cols[0],
+            "card_subtitle": cols[2] if len(cols) > 2 else "",
+            "card_image": next((c for c in cols if "img" in c.lower()), ""),
+        }
+        for k, v in defaults.items():
+            if not cfg.get(k):
+                cfg[k] = v
+        text = json.dumps(cfg, indent=2)
+        cfg_path.write_text(text, encoding="utf-8")
+        self.pygosqlviews.template_manager.record_config(cfg_path, text)
         if self.verbose:
             log.info(f"[{self}]: Auto-populated config → {cfg}.")
+        return cfg
+
+    async def _validate_columns(self, columns) -> None:
+        unknown = set(columns) - set(await self.columns)
+        if unknown:
+            raise ValueError(f"[{self}]: Unknown columns {sorted(unknown)} for {self.name}")
+
+    async def insert_many(self, rows: List[Dict[str, Any]]) -> int:
+        """
+        Insert rows in one transaction, one executemany per column set.
+        """
+        groups: Dict[frozenset, List[Dict[str, Any]]] = {}
+        for row in rows:
+            groups.setdefault(frozenset(row), []).append(row)
+        for cols in groups:
+            await self._validate_columns(cols)
+        batches = []
+        for cols, group in groups.items():
+            stmt = self.pygosqlviews.statements.get(self, "insert", cols)
+            batches.append((stmt.sql, [stmt.bind(r) for r in group]))
+        key = (await self.config).id if self.changes.subscribers or self.facets.ready else None
+        count, ids = await self.pygosqlviews.sqlite.run(self._write_batches, batches, key)
+        await self.facets.adding(ids)
+        self.changes.publish("insert", ids or ())
+        if self.verbose:
+            log.info(f"[{self}]: Inserted {count} rows in {len(batches)} batch(es).")
+        return count
+
+    async def update_many(self, rows: List[Dict[str, Any]]) -> int:
+        """
+        Update rows by the configured id column in one transaction.
+        """
+        key = (await self.config).id
+        groups: Dict[frozenset, List[Dict[str, Any]]] = {}
+        for row in rows:
+            if key not in row:
+                raise ValueError(f"[{self}]: Row is missing id column '{key}': {row}")
+            groups.setdefault(frozenset(row) - {key}, []).append(row)
+        for cols in groups:
+            await self._validate_columns(cols)
+        batches = []
+        for cols, group in groups.items():
+            stmt = self.pygosqlviews.statements.get(self, "update", cols, key=key)
+            batches.append((stmt.sql, [stmt.bind(r) for r in group]))
+        ids = [r[key] for r in rows]
+        await self.facets.removing(ids)
+        count, _ = await self.pygosqlviews.sqlite.run(self._write_batches, batches)
+        await self.facets.adding(ids)
+        self.changes.publish("update", ids)
+        if self.verbose:
+            log.info(f"[{self}]: Updated {count} rows in {len(batches)} batch(es).")
+        return count
+
+    async def export(self, format: str = "ndjson", chunk_size: int = 1000) -> AsyncIterator[bytes]:
+        """
+        Stream every row as NDJSON or CSV, reading in keyset chunks ordered by
+        the id column when it is the INTEGER PRIMARY KEY, else by rowid, since
+        any other column may hold NULLs or duplicates.
+        """
+        check_format(format)
+        key = (await self.config).id
+        info = await self.pygosqlviews.sqlite.fetchall(f"PRAGMA table_info({quote(self.name)})")
+        pks = [r for r in info if r["pk"]]
+        if len(pks) == 1 and pks[0]["name"] == key and pks[0]["type"].upper() == "INTEGER":
+            order, column, extra = quote(key), key, ""
+        else:
+            order, column, extra = "rowid", "_export_rowid", ', rowid AS "_export_rowid"'
+        encoder = Encoder(format)
+        stats = TransferStats()
+        first = f"SELECT *{extra} FROM {quote(self.name)} ORDER BY {order} LIMIT ?"
+        after = f"SELECT *{extra} FROM {quote(self.name)} WHERE {order} > ? ORDER BY {order} LIMIT ?"
+        rows = await self.pygosqlviews.sqlite.fetchall(first, (chunk_size,))
+        while rows:
+            last = rows[-1][column]
+            if extra:
+                for r in rows:
+                    del r[column]
+            stats.rows += len(rows)
+            stats.batches += 1
+            yield encoder.encode(rows)
+            if len(rows) < chunk_size:
+                break
+            rows = await self.pygosqlviews.sqlite.fetchall(after, (last, chunk_size))
+        stats.finish()
+        if self.verbose:
+            log.info(f"[{self}]: Exported {stats.rows} rows as {format} at {stats.rows_per_sec:.0f} rows/sec.")
+
+    async def import_stream(self, source, format: str = "ndjson", batch_size: int = 1000) -> TransferStats:
+        """
+        Parse NDJSON or CSV incrementally and insert it in batched transactions.
+        Values of columns declared BLOB are decoded from export's base64.
+        """
+        stats = TransferStats()
+        blobs = [c for c, t in (await self.column_types).items() if "BLOB" in t]
+        batch: List[Dict[str, Any]] = []
+        async for row in records(source, format):
+            batch.append(decode_blobs(row, blobs))
+            if len(batch) >= batch_size:
+                stats.rows += await self.insert_many(batch)
+                stats.batches += 1
+                batch = []
+        if batch:
+            stats.rows += await self.insert_many(batch)
+            stats.batches += 1
+        stats.finish()
+        if self.verbose:
+            log.info(f"[{self}]: Imported {stats.rows} rows as {format} at {stats.rows_per_sec:.0f} rows/sec.")
+        return stats
+
+    def _write_batches(self, batches, inserted_key: Optional[str] = None) -> tuple[int, Optional[list]]:
+        """
+        Run executemany batches in one transaction.
+        With inserted_key, also return that column for the rows this transaction added.
+        """
+        count, ids = 0, None
+        table = quote(self.name)
+        with self.pygosqlviews.sqlite.transaction() as conn:
+            if inserted_key:
+                before = conn.execute(f"SELECT COALESCE(MAX(rowid), 0) FROM {table}").fetchone()[0]
+            for sql, params in batches:
+                count += conn.executemany(sql, params).rowcount
+            if inserted_key:
+                ids = [r[0] for r in conn.execute(
+                    f"SELECT {quote(inserted_key)} FROM {table} WHERE rowid > ? ORDER BY rowid", (before,)
+                )]
+        return count, ids
+
+    @property
+    def api(self):
+        """
+        This table's PyGoSQL namespace (insert/select/update/delete over HTTP).
+        """
+        return getattr(self.pygosql, self.name)
+
+    @cached_property
+    def changes(self) -> ChangeFeed:
+        return ChangeFeed(self)
+
+    @cached_property
+    def facets(self) -> Facets:
+        return Facets(self)
+
+    async def insert(self, **row) -> Dict[str, Any]:
+        """
+        Insert one row through PyGoSQL and publish it to the change feed.
+        """
+        result = await self.api.insert(**row)
+        row_id = row.get((await self.config).id, _last_insert_id(result))
+        await self.facets.adding(None if row_id is None else [row_id])
+        if row_id is None:
+            self.changes.publish("refresh")
+        else:
+            self.changes.publish("insert", [row_id])
+        return result
+
+    async def update(self, **row) -> Dict[str, Any]:
+        """
+        Update one row through PyGoSQL and publish it to the change feed.
+        """
+        row_id = row.get((await self.config).id)
+        await self.facets.removing(None if row_id is None else [row_id])
+        result = await self.api.update(**row)
+        await self.facets.adding(None if row_id is None else [row_id])
+        if row_id is None:
+            self.changes.publish("refresh")
+        else:
+            self.changes.publish("update", [row_id])
+        return result
+
+    async def delete(self, **params) -> Dict[str, Any]:
+        """
+        Delete one row through PyGoSQL and publish it to the change feed.
+        """
+        row_id = params.get((await self.config).id)
+        await self.facets.removing(None if row_id is None else [row_id])
+        result = await self.api.delete(**params)
+        if row_id is None:
+            self.changes.publish("refresh")
+        else:
+            self.changes.publish("delete", [row_id])
+        return result
+
+    async def read(self, method: str, sql: str, params=()) -> Any:
+        """
+        Run a SQLite fetchall/fetchone, sharing one call among concurrent identical reads.
+        The change feed sequence is part of the key, so no read joins a call
+        that started before a write it should see. Shared rows must not be mutated.
+        Reads go to the least busy backend of the views' read pool.
+        """
+        params = tuple(params)
+        return await self.pygosqlviews.flights.do(
+            ("read", self.name, method, sql, params, self.changes.seq),
+            getattr(self.pygosqlviews.reads, method), sql, params, table=self,
+            label=f"read {self.name}"
+        )
+
+    async def card_columns(self) -> List[str]:
+        """
+        The only columns a card needs: the configured id, title, subtitle and image.
+        """
+        cfg = await self.config
+        cols = [cfg.id, cfg.card_title, cfg.card_subtitle, cfg.card_image]
+        return list(dict.fromkeys(c for c in cols if c))
+
+    async def card_expressions(self, columns: Optional[List[str]]) -> Optional[Dict[str, str]]:
+        """
+        For card rendering: read the card image, if projected, as its thumbnail
+        token instead of its BLOB.
+        """
+        image = (await self.config).card_image
+        if not image or columns is None or image not in columns:
+            return None
+        return card_expressions(image)
+
+    async def rows_by_id(self, ids, columns: Optional[List[str]] = None, cards: bool = False) -> List[Dict[str, Any]]:
+        """
+        Fetch rows for the given id column values, projected to columns if given.
+        With cards, image BLOBs are replaced by their tokens (see card_expressions).
+        """
+        key = (await self.config).id
+        expressions = await self.card_expressions(columns) if cards else None
+        rows = []
+        ids = list(ids)
+        for i in range(0, len(ids), 500):
+            chunk = ids[i:i + 500]
+            where = f"{quote(key)} IN ({', '.join('?' for _ in chunk)})"
+            stmt = self.pygosqlviews.statements.select(self, columns, where=where, paged=False,
+                                                       expressions=expressions)
+            rows += await self.read("fetchall", stmt.sql, chunk)
+        return rows
+
+    @async_cached_property
+    async def column_types(self) -> Dict[str, str]:
+        """
+        Declared SQLite type of each column, from PRAGMA table_info.
+        """
+        rows = await self.pygosqlviews.sqlite.fetchall(f"PRAGMA table_info({quote(self.name)})")
+        return {r["name"]: (r["type"] or "").upper() for r in rows}
+
+    async def row_preview(self, row_id: Any) -> Optional[tuple[Dict[str, Any], Dict[str, Dict[str, Any]]]]:
+        """
+        Fetch one row for the detail view with TEXT/BLOB values cut down in SQL.
+
+        Returns:
+            (data, more): data maps each column to its (possibly truncated) value;
+            more maps truncated or binary columns to their full length and the
+            URL that streams the whole value.
+        """
+        key = (await self.config).id
+        cols = list(await self.column_types)
+        n = self.PREVIEW_CHARS
+        parts = []
+        for i, c in enumerate(cols):
+            q = quote(c)
+            parts += [
+                f"CASE WHEN typeof({q}) = 'text' THEN substr({q}, 1, {n}) "
+                f"WHEN typeof({q}) = 'blob' THEN NULL ELSE {q} END AS v{i}",
+                f"typeof({q}) AS t{i}",
+                f"length(CAST({q} AS BLOB)) AS l{i}",
+                f"length({q}) AS c{i}",
+            ]
+        sql = f"SELECT {', '.join(parts)} FROM {quote(self.name)} WHERE {quote(key)} = ?"
+        raw = await self.read("fetchone", sql, (row_id,))
+        if raw is None:
+            return None
+        data, more = {}, {}
+        for i, c in enumerate(cols):
+            kind, size, chars = raw[f"t{i}"], raw[f"l{i}"], raw[f"c{i}"]
+            if kind == "blob":
+                data[c] = f"[binary, {size} bytes]"
+            elif kind == "text" and chars > n:
+                data[c] = raw[f"v{i}"] + "…"
+            else:
+                data[c] = raw[f"v{i}"]
+                continue
+            more[c] = {"kind": kind, "length": size, "url": f"{self.pygosqlviews.prefix}/{self.name}/{row_id}/field/{c}"}
+        return data, more
+
+    async def field_info(self, row_id: Any, field: str) -> Optional[Dict[str, Any]]:
+        """
+        Locate one cell for streaming: its rowid, storage type and byte length.
+        """
+        if field not in await self.column_types:
+            return None
+        key = (await self.config).id
+        q = quote(field)
+        return await self.read(
+            "fetchone",
+            f"SELECT rowid AS rowid, typeof({q}) AS kind, length(CAST({q} AS BLOB)) AS length "
+            f"FROM {quote(self.name)} WHERE {quote(key)} = ?",
+            (row_id,)
+        )
+
+    async def image_source(self, row_id: Any, field: str) -> Optional[tuple[Callable[[], bytes], bool]]:
+        """
+        A blocking loader for the bytes behind an image cell, the BLOB itself
+        or the local file its path points to, and whether it reads a BLOB.
+        None for remote or missing images.
+        """
+        key = (await self.config).id
+        sql = f"SELECT {quote(field)} AS v FROM {quote(self.name)} WHERE {quote(key)} = ?"
+        info = await self.field_info(row_id, field)
+        if info is None or info["kind"] not in ("text", "blob"):
+            return None
+        sqlite = self.pygosqlviews.sqlite
+        if info["kind"] == "blob":
+            return lambda: bytes(sqlite._fetchone(sql, (row_id,))["v"]), True
+        value = (await self.read("fetchone", sql, (row_id,)))["v"]
+        path = None if is_remote(value) else self.pygosqlviews.thumbnails.local(value)
+        if path is None or not path.is_file():
+            return None
+        return path.read_bytes, False
+
+    async def row(self, row_id: Any) -> Optional[Dict[str, Any]]:
+        """
+        Fetch one full row by its id column, for the detail view.
+        """
+        rows = await self.rows_by_id([row_id])
+        return rows[0] if rows else None
+
+    async def page(self, page: int = 1, size: int = 50, columns: Optional[List[str]] = None,
+                   query: Optional[QueryFilter] = None, cards: bool = False) -> tuple[List[Dict[str, Any]], bool]:
+        """
+        Fetch one page of rows, and whether another page follows.
+        Pass columns to read only those (card views use card_columns() and cards),
+        and a QueryFilter to filter and sort inside SQLite; rows are otherwise ordered by the id column.
+        """
+        key = (await self.config).id
+        query = query or QueryFilter()
+        where, binds = query.where()
+        expressions = await self.card_expressions(columns) if cards else None
+        stmt = self.pygosqlviews.statements.select(self, columns, where=where, order_by=query.order_by(key),
+                                                   expressions=expressions)
+        rows = await self.read("fetchall", stmt.sql, (*binds, size + 1, (page - 1) * size))
+        return rows[:size], len(rows) > size
+
+    async def query(self, params) -> QueryFilter:
+        """
+        Parse view query parameters into a QueryFilter checked against this table's columns.
+        """
+        return QueryFilter.parse(params, await self.columns)
+
+    @cached_property
+    def templates(self) -> "jinja2.Environment":
+        """
+        Jinja environment over this table's generated templates.
+        """
+        import jinja2
+        return jinja2.Environment(
+            loader=jinja2.FileSystemLoader(str(self.path)),
+            autoescape=True,
+            bytecode_cache=self.pygosqlviews.bytecode_cache
+        )
+
+    async def count(self) -> int:
+        row = await self.read("fetchone", f"SELECT COUNT(*) AS n FROM {quote(self.name)}")
+        return row["n"]
+
+    def dom_id(self, row_id: Any) -> str:
+        return f"card-{self.name}-{row_id}"
+
+    def _card(self, cfg: SimpleNamespace, row: Dict[str, Any]) -> str:
+        return self.templates.get_template(self.paths.card.name).render(
+            prefix=self.pygosqlviews.prefix,
+            id=row.get(cfg.id),
+            title=row.get(cfg.card_title),
+            subtitle=row.get(cfg.card_subtitle) if cfg.card_subtitle else None,
+            image=self.pygosqlviews.thumbnails.url(
+                self, row.get(cfg.id), cfg.card_image, row.get(cfg.card_image), row.get(TOKEN)
+            ) if cfg.card_image else None,
+        )
+
+    async def render_card(self, row: Dict[str, Any]) -> str:
+        """
+        Render card.j2 for one row using the configured title/subtitle/image columns.
+        """
+        return self._card(await self.config, row)
+
+    def card_html(self, cfg: SimpleNamespace, row: Dict[str, Any], oob: Optional[str] = None) -> str:
+        """
+        Render a card wrapped in its stable DOM id, optionally as an htmx out-of-band swap.
+        Synchronous, for callers that already hold the config.
+        """
+        swap = f' hx-swap-oob="{oob}"' if oob else ""
+        return f'<div id="{escape(self.dom_id(row.get(cfg.id)))}"{swap}>{self._card(cfg, row)}</div>'
+
+    def detail_html(self, row: Dict[str, Any], more: Optional[Dict[str, Dict[str, Any]]] = None) -> str:
+        """
+        Render detail.j2 for one row; more marks fields that load the rest on demand.
+        """
+        return self.templates.get_template(self.paths.detail.name).render(data=row, more=more or {})
+
+    async def render_detail(self, row: Dict[str, Any], more: Optional[Dict[str, Dict[str, Any]]] = None) -> str:
+        return self.detail_html(row, more)
+
+    async def card_fragment(self, row: Dict[str, Any], oob: Optional[str] = None) -> str:
+        return self.card_html(await self.config, row, oob)
+
+    async def _render_change(self, change: Change) -> str:
+        if change.op == "delete":
+            return "".join(f'<div id="{escape(self.dom_id(i))}" hx-swap-oob="delete"></div>' for i in change.ids)
+        rows = await self.rows_by_id(change.ids, await self.card_columns(), cards=True)
+        if change.op == "update":
+            return "".join([await self.card_fragment(r, oob="outerHTML") for r in rows])
+        cards = "".join([await self.card_fragment(r) for r in rows])
+        return f'<div hx-swap-oob="beforeend:#cards-{escape(self.name)}">{cards}</div>'
+
+    async def events(self, heartbeat: float = 15.0) -> AsyncIterator[str]:
+        """
+        Server-Sent Events stream of re-rendered card fragments for changed rows.
+        Idle connections only cost a heartbeat comment.
+        """
+        async with self.changes.subscribe() as queue:
+            yield ": connected\n\n"
+            while True:
+                try:
+                    change = await asyncio.wait_for(queue.get(), heartbeat)
+                except asyncio.TimeoutError:
+                    yield ": ping\n\n"
+                    continue
+                if change.op == "refresh":
+                    yield "event: refresh\ndata: \n\n"
+                    continue
+                fragment = await change.payload(self._render_change)
+                yield "event: card\n" + "".join(f"data: {line}\n" for line in fragment.splitlines()) + "\n"
+
+
+def _last_insert_id(result: Any) -> Any:
+    if isinstance(result, dict):
+        if "last_insert_id" in result:
+            return result["last_insert_id"]
+        return _last_insert_id(result.get("data"))
+    return None
 
 
 async def debug():
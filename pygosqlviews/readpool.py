@@ -0,0 +1,183 @@
+"""
+Read fan-out over several copies of the database.
+
+PyGoSQLViews can be given extra read backends: other PyGoSQL instances (their
+database files are used) or paths to replica files. Table reads then go to
+the healthy backend with the fewest reads in flight, the primary included.
+Writes always go through the primary.
+
+Read-your-writes: a backend over the primary's own file sees every commit at
+once, but a replica may lag. After a table changes, its reads stay on the
+primary and shared-file backends for STICKY seconds before replicas serve it
+again.
+
+Each replica gets its own pool of WORKERS threads, so adding readers adds
+threads that can run queries at once, rather than sharing the default
+executor with the primary. SQLite releases the GIL while it runs a query,
+so this scales reads within one process up to the cores available.
+
+A background task probes every backend each HEALTH_INTERVAL seconds. A
+backend is taken out after FAILURES failed probes or reads in a row (any
+successful read or probe resets the count), and put back after its next
+successful probe. A failed replica read is retried on the primary.
+"""
+import asyncio
+import itertools
+import sqlite3
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+from loguru import logger as log
+
+from .sqlite import SQLite
+
+
+@dataclass
+class ReadBackend:
+    """
+    One database file reads can be sent to, with its load and health.
+    """
+    name: str
+    sqlite: SQLite
+    shared: bool            # same file as the primary: always up to date
+    outstanding: int = 0
+    healthy: bool = True
+    failures: int = 0
+    reads: int = 0
+    errors: int = 0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "path": str(self.sqlite.path), "shared": self.shared, "healthy": self.healthy,
+            "outstanding": self.outstanding, "reads": self.reads, "errors": self.errors,
+        }
+
+
+class ReadPool:
+    """
+    Least-outstanding-requests routing of reads over the primary and its read backends.
+
+    Args:
+        backends: PyGoSQL instances or database paths to read from besides the primary.
+    """
+    STICKY = 5.0
+    HEALTH_INTERVAL = 5.0
+    PROBE_TIMEOUT = 2.0
+    FAILURES = 3
+    WORKERS = 4
+
+    def __init__(self, pygosqlviews, backends: Iterable[Union[Path, str, Any]] = ()):
+        self.pygosqlviews = pygosqlviews
+        self.verbose = pygosqlviews.verbose
+        self.primary = ReadBackend("primary", pygosqlviews.sqlite, shared=True)
+        self.backends: List[ReadBackend] = [self.primary]
+        own = self.primary.sqlite.path.resolve()
+        for i, backend in enumerate(backends, 1):
+            path = Path(getattr(backend, "_db_path", backend))
+            sqlite = SQLite(pygosqlviews, path, budget=self.primary.sqlite.budget, workers=self.WORKERS)
+            self.backends.append(ReadBackend(f"reader-{i}", sqlite, shared=path.resolve() == own))
+        self._written: Dict[str, float] = {}
+        self._seen: Dict[str, int] = {}
+        self._turn = itertools.count()
+        self._health: Optional[asyncio.Task] = None
+        if self.verbose and len(self.backends) > 1:
+            log.success(f"[{self}]: Reading from {[b.name for b in self.backends]}")
+
+    def __repr__(self):
+        return "PyGoSQL.Views.ReadPool"
+
+    def fresh(self, table) -> bool:
+        """
+        Whether replicas may serve this table: no write to it in the last STICKY seconds.
+        The table's change sequence is compared on each read, so every write
+        path that publishes a change counts without a hook of its own.
+        """
+        now = time.monotonic()
+        seq = table.changes.seq
+        if self._seen.get(table.name, 0) != seq:
+            self._seen[table.name] = seq
+            self._written[table.name] = now
+        written = self._written.get(table.name)
+        return written is None or now - written >= self.STICKY
+
+    def pick(self, table=None) -> ReadBackend:
+        if len(self.backends) == 1:
+            return self.primary
+        if self._health is None:
+            self._health = asyncio.get_running_loop().create_task(self._check_forever())
+        replicas_ok = table is None or self.fresh(table)
+        candidates = [b for b in self.backends if b.healthy and (replicas_ok or b.shared)] or [self.primary]
+        least = min(b.outstanding for b in candidates)
+        tied = [b for b in candidates if b.outstanding == least]
+        return tied[next(self._turn) % len(tied)]
+
+    async def run(self, table, fn, *args, **kwargs) -> Any:
+        """
+        Run a read callable taking a SQLite as first argument on the chosen backend.
+        """
+        backend = self.pick(table)
+        backend.outstanding += 1
+        backend.reads += 1
+        try:
+            result = await backend.sqlite.run(fn, backend.sqlite, *args, **kwargs)
+            backend.failures = 0
+            return result
+        except sqlite3.Error as e:
+            if backend is self.primary:
+                raise
+            self._failed(backend, e)
+        finally:
+            backend.outstanding -= 1
+        self.primary.reads += 1
+        return await self.primary.sqlite.run(fn, self.primary.sqlite, *args, **kwargs)
+
+    async def fetchall(self, sql: str, params: Iterable[Any] = (), table=None) -> list[dict]:
+        return await self.run(table, SQLite._fetchall, sql, params)
+
+    async def fetchone(self, sql: str, params: Iterable[Any] = (), table=None) -> Optional[dict]:
+        return await self.run(table, SQLite._fetchone, sql, params)
+
+    def _failed(self, backend: ReadBackend, error: Exception) -> None:
+        backend.errors += 1
+        backend.failures += 1
+        if backend.healthy and backend.failures >= self.FAILURES:
+            backend.healthy = False
+            log.warning(f"[{self}]: Removed {backend.name} ({backend.sqlite.path}) after {backend.failures} failures: {error}")
+
+    @staticmethod
+    def _probe(sqlite: SQLite) -> None:
+        sqlite.connect().execute("SELECT count(*) FROM sqlite_master").fetchone()
+
+    async def check(self) -> None:
+        """
+        Probe every backend once, removing failing ones and restoring recovered ones.
+        """
+        for backend in self.backends[1:]:
+            try:
+                await asyncio.wait_for(backend.sqlite.run(self._probe, backend.sqlite), self.PROBE_TIMEOUT)
+            except (sqlite3.Error, asyncio.TimeoutError, OSError) as e:
+                backend.sqlite.close()
+                self._failed(backend, e)
+                continue
+            backend.failures = 0
+            if not backend.healthy:
+                backend.healthy = True
+                log.info(f"[{self}]: Restored {backend.name} ({backend.sqlite.path})")
+
+    async def _check_forever(self) -> None:
+        while True:
+            await asyncio.sleep(self.HEALTH_INTERVAL)
+            await self.check()
+
+    def close(self) -> None:
+        if self._health is not None:
+            self._health.cancel()
+            self._health = None
+        for backend in self.backends[1:]:
+            backend.sqlite.shutdown()
+
+    def metrics(self) -> Dict[str, Any]:
+        return {"sticky_tables": sum(1 for t in self._written.values() if time.monotonic() - t < self.STICKY),
+                "backends": {b.name: b.as_dict() for b in self.backends}}
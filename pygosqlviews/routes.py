@@ -0,0 +1,241 @@
+"""
+HTTP routes of the views app.
+Kept apart from the core classes so FastAPI is only imported when the app is built.
+"""
+import codecs
+import sqlite3
+from typing import AsyncIterator, Optional
+
+from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi.responses import FileResponse, HTMLResponse, JSONResponse, Response, StreamingResponse
+from fastapi.staticfiles import StaticFiles
+from markupsafe import Markup, escape
+
+from . import api
+from .filters import FilterError
+from .pygosqlviews import PyGoSQLViews, Table
+from .thumbnails import IMMUTABLE
+from .transfer import FORMATS
+
+
+class Routes:
+    """
+    Route handlers bound to one PyGoSQLViews instance.
+    """
+
+    def __init__(self, pygosqlviews: PyGoSQLViews):
+        self.pygosqlviews = pygosqlviews
+        self.verbose = pygosqlviews.verbose
+
+    def __repr__(self):
+        return "PyGoSQL.Views.Routes"
+
+    def render_page(self, title: str, template: Optional[str] = None, content: str = "", **context) -> HTMLResponse:
+        return HTMLResponse(self.pygosqlviews.render_page(title, template, content, **context))
+
+    def setup(self, app: FastAPI) -> None:
+        app.mount("/css", StaticFiles(directory=str(self.pygosqlviews.dir.paths.css.parent)), name="css")
+        app.get("/", response_class=HTMLResponse)(self.overview_view)
+        app.get("/_metrics")(self.metrics_view)
+        app.get("/{table_name}", response_class=HTMLResponse)(self.table_view)
+        app.get("/{table_name}/events")(self.events_view)
+        app.get("/{table_name}/export")(self.export_view)
+        app.post("/{table_name}/import")(self.import_view)
+        app.get("/{table_name}/{row_id}/field/{field}")(self.field_view)
+        app.get("/{table_name}/{row_id}/thumb/{field}")(self.thumbnail_view)
+        app.get("/{table_name}/{row_id}", response_class=HTMLResponse)(self.detail_view)
+
+    def format(self, request: Request) -> str:
+        """
+        Negotiated response format of a table or detail request (see api.py), 406 if none fits.
+        """
+        fmt = api.negotiate(request.headers.get("accept"), request.query_params.get("format"))
+        if fmt is None:
+            raise HTTPException(status_code=406, detail=f"Acceptable formats: {api.available()}")
+        return fmt
+
+    def table(self, table_name: str) -> "Table":
+        """
+        Look up a Table by name, raising 404 for unknown tables.
+        """
+        table = vars(self.pygosqlviews.tables).get(table_name)
+        if not isinstance(table, Table):
+            raise HTTPException(status_code=404, detail=f"Unknown table '{table_name}'")
+        self.pygosqlviews.budget.touch(table)
+        return table
+
+    async def metrics_view(self) -> JSONResponse:
+        return JSONResponse({
+            "singleflight": self.pygosqlviews.flights.metrics(),
+            "statements": {"hits": self.pygosqlviews.statements.hits, "misses": self.pygosqlviews.statements.misses},
+            "thumbnails": self.pygosqlviews.thumbnails.metrics(),
+            "memory": self.pygosqlviews.budget.metrics(),
+            "admission": self.pygosqlviews.admission.metrics(),
+            "reads": self.pygosqlviews.reads.metrics(),
+            "maintenance": self.pygosqlviews.maintenance.metrics(),
+            "warmup": {**self.pygosqlviews.warmer.metrics(), "access": self.pygosqlviews.access.metrics()},
+            "facets": {t.name: t.facets.metrics() for t in vars(self.pygosqlviews.tables).values()
+                       if isinstance(t, Table) and "facets" in t.__dict__},
+        })
+
+    async def overview_view(self) -> HTMLResponse:
+        return self.render_page("Database", "overview.j2", tables=await self.pygosqlviews.overview())
+
+    async def table_view(self, request: Request, table_name: str, page: int = Query(1, ge=1),
+                         size: int = Query(50, ge=1, le=500)) -> Response:
+        table = self.table(table_name)
+        fmt = self.format(request)
+        try:
+            query = await table.query(request.query_params.multi_items())
+            columns = await api.projection(table, request.query_params.get("fields"), await table.card_columns())
+        except FilterError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        rows, has_more = await table.page(page, size, columns, query, cards=fmt == "html")
+        self.pygosqlviews.access.hit(table.name, page=None if query.query_string() else page)
+        if fmt != "html":
+            serializer = api.Serializer(fmt)
+            meta = {"table": table.name, "page": page, "size": size, "has_more": has_more}
+            if api.estimate(rows) > serializer.STREAM_BYTES:
+                return StreamingResponse(serializer.page(meta, rows), media_type=serializer.media_type,
+                                         headers={"Vary": "Accept"})
+            return Response(serializer.dumps({**meta, "rows": rows}), media_type=serializer.media_type,
+                            headers={"Vary": "Accept"})
+        cards = [Markup(await table.card_fragment(r)) for r in rows]
+        response = self.render_page(
+            table.name.replace("_", " ").title(), "cards.j2",
+            table_name=table.name, cards=cards, page=page, has_more=has_more,
+            query_string=query.query_string(), facets=await table.facets.sidebar(query)
+        )
+        response.headers["Vary"] = "Accept"
+        return response
+
+    async def detail_view(self, request: Request, table_name: str, row_id: str) -> Response:
+        table = self.table(table_name)
+        fmt = self.format(request)
+        if fmt != "html":
+            try:
+                columns = await api.projection(table, request.query_params.get("fields"), None)
+            except FilterError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+            rows = await table.rows_by_id([row_id], columns)
+            if not rows:
+                raise HTTPException(status_code=404, detail=f"No {table.name} row with id {row_id}")
+            self.pygosqlviews.access.hit(table.name, row=row_id)
+            serializer = api.Serializer(fmt)
+            return Response(serializer.dumps(rows[0]), media_type=serializer.media_type, headers={"Vary": "Accept"})
+        preview = await table.row_preview(row_id)
+        if preview is None:
+            raise HTTPException(status_code=404, detail=f"No {table.name} row with id {row_id}")
+        self.pygosqlviews.access.hit(table.name, row=row_id)
+        response = self.render_page(
+            f"{table.name.replace('_', ' ').title()} {row_id}", content=await table.render_detail(*preview)
+        )
+        response.headers["Vary"] = "Accept"
+        return response
+
+    async def field_view(self, request: Request, table_name: str, row_id: str, field: str,
+                         raw: bool = Query(False)) -> StreamingResponse:
+        """
+        Stream one full TEXT/BLOB value. Text is HTML-escaped for htmx swaps
+        unless raw is set; blobs honour single byte ranges.
+        """
+        table = self.table(table_name)
+        info = await table.field_info(row_id, field)
+        if info is None:
+            raise HTTPException(status_code=404, detail=f"No field {field} for {table.name} row {row_id}")
+        if info["kind"] not in ("text", "blob"):
+            raise HTTPException(status_code=400, detail=f"{field} is {info['kind']}, not text or blob")
+        length = info["length"]
+        chunks = self.pygosqlviews.sqlite.read_blob(table.name, field, info["rowid"])
+        if info["kind"] == "text" and not raw:
+            return StreamingResponse(_escaped(chunks), media_type="text/html; charset=utf-8")
+        media_type = "text/plain; charset=utf-8" if info["kind"] == "text" else "application/octet-stream"
+        headers = {"Accept-Ranges": "bytes"}
+        byte_range = _byte_range(request.headers.get("range"), length)
+        if byte_range is None:
+            headers["Content-Length"] = str(length)
+            return StreamingResponse(chunks, media_type=media_type, headers=headers)
+        start, end = byte_range
+        headers["Content-Range"] = f"bytes {start}-{end - 1}/{length}"
+        headers["Content-Length"] = str(end - start)
+        return StreamingResponse(
+            self.pygosqlviews.sqlite.read_blob(table.name, field, info["rowid"], start, end),
+            status_code=206, media_type=media_type, headers=headers
+        )
+
+    async def thumbnail_view(self, request: Request, table_name: str, row_id: str, field: str,
+                             v: str = Query("")) -> Response:
+        """
+        Serve a card-sized thumbnail of a row's card_image, from a local file or a BLOB.
+        Versioned file URLs (?v=) are immutable and cached by browsers for a year;
+        BLOB thumbnails are revalidated against their content ETag.
+        """
+        table = self.table(table_name)
+        if field != (await table.config).card_image:
+            raise HTTPException(status_code=404, detail=f"{field} is not the card image of {table.name}")
+        source = await table.image_source(row_id, field)
+        if source is None:
+            raise HTTPException(status_code=404, detail=f"No local image for {table.name} row {row_id}")
+        load, blob = source
+        path, mime = await self.pygosqlviews.thumbnails.fetch(
+            None if blob else (table.name, row_id, field, v), load, self.pygosqlviews.sqlite if blob else None
+        )
+        headers = {"Cache-Control": IMMUTABLE if v and not blob else "no-cache", "ETag": f'"{path.stem}"'}
+        if request.headers.get("if-none-match") == headers["ETag"]:
+            return Response(status_code=304, headers=headers)
+        return FileResponse(path, media_type=mime, headers=headers)
+
+    async def events_view(self, table_name: str) -> StreamingResponse:
+        table = self.table(table_name)
+        return StreamingResponse(
+            table.events(),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+        )
+
+    async def export_view(self, table_name: str, format: str = Query("ndjson")) -> StreamingResponse:
+        table = self.table(table_name)
+        if format not in FORMATS:
+            raise HTTPException(status_code=400, detail=f"Unsupported format '{format}'")
+        return StreamingResponse(
+            table.export(format=format),
+            media_type=FORMATS[format],
+            headers={"Content-Disposition": f'attachment; filename="{table.name}.{format}"'}
+        )
+
+    async def import_view(self, request: Request, table_name: str, format: str = Query("ndjson")) -> JSONResponse:
+        table = self.table(table_name)
+        if format not in FORMATS:
+            raise HTTPException(status_code=400, detail=f"Unsupported format '{format}'")
+        try:
+            stats = await table.import_stream(request.stream(), format=format)
+        except (ValueError, sqlite3.Error) as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return JSONResponse(stats.as_dict())
+
+
+def _byte_range(header: Optional[str], length: int) -> Optional[tuple[int, int]]:
+    """
+    Parse a single `bytes=start-end` Range header into a half-open [start, end).
+    """
+    if not header or not header.startswith("bytes=") or "," in header:
+        return None
+    start, _, end = header[len("bytes="):].partition("-")
+    try:
+        if start:
+            first, last = int(start), int(end) if end else length - 1
+        else:
+            first, last = max(length - int(end), 0), length - 1
+    except ValueError:
+        return None
+    if first > last or first >= length:
+        raise HTTPException(status_code=416, detail="Requested range not satisfiable",
+                            headers={"Content-Range": f"bytes */{length}"})
+    return first, min(last, length - 1) + 1
+
+
+async def _escaped(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    async for chunk in chunks:
+        yield escape(decoder.decode(chunk)).encode("utf-8")
+    yield escape(decoder.decode(b"", final=True)).encode("utf-8")
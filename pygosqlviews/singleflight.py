@@ -0,0 +1,123 @@
+"""
+Single-flight deduplication of concurrent identical async calls.
+The first caller for a key runs the call; callers arriving while it is in
+flight await the same future instead of issuing their own backend call.
+
+A shared call runs under a SharedDeadline (see admission.py): the latest of
+its current callers' deadlines. Each caller stops waiting once its own
+deadline passes, and when the last one has given up the call's queries are
+interrupted, freeing their worker thread and budget slot.
+"""
+import asyncio
+import contextvars
+import time
+from dataclasses import asdict, dataclass
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+from loguru import logger as log
+
+from .admission import DEADLINE, DeadlineExceeded, SharedDeadline
+
+
+@dataclass
+class FlightStats:
+    """
+    Counters for one metrics key.
+    """
+    calls: int = 0       # calls that actually ran
+    shared: int = 0      # callers served by a call already in flight
+    errors: int = 0
+    inflight: int = 0
+    max_waiters: int = 0
+    seconds: float = 0.0
+
+    @property
+    def saved(self) -> float:
+        total = self.calls + self.shared
+        return self.shared / total if total else 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {**asdict(self), "seconds": round(self.seconds, 4), "saved": round(self.saved, 4)}
+
+
+class SingleFlight:
+    """
+    In-flight call table keyed by any hashable key.
+
+    Waiters are shielded, so a cancelled caller never cancels the shared call.
+    Results are not cached: once a call finishes the next caller starts a new one.
+    """
+
+    def __init__(self, verbose: bool = False):
+        self.verbose = verbose
+        self._flights: Dict[Hashable, asyncio.Future] = {}
+        self._deadlines: Dict[Hashable, SharedDeadline] = {}
+        self.stats: Dict[str, FlightStats] = {}
+
+    def __repr__(self):
+        return "PyGoSQL.Views.SingleFlight"
+
+    async def do(self, key: Hashable, fn: Callable[..., Awaitable[Any]], *args,
+                 label: Optional[str] = None, **kwargs) -> Any:
+        """
+        Await fn(*args, **kwargs), sharing one call among concurrent callers with the same key.
+
+        Args:
+            key: Identity of the call.
+            fn: Coroutine function to run.
+            label: Metrics key; defaults to str(key). Use a coarser label for high-cardinality keys.
+        """
+        stats = self.stats.setdefault(label or str(key), FlightStats())
+        flight = self._flights.get(key)
+        # a call every caller has abandoned is being interrupted: start afresh
+        if flight is not None and not self._deadlines[key].expired():
+            stats.shared += 1
+            stats.max_waiters = max(stats.max_waiters, self._deadlines[key].waiters + 1)
+            if self.verbose: log.debug(f"[{self}]: Joined in-flight {label or key}")
+            return await self._wait(flight, self._deadlines[key])
+        stats.calls += 1
+        stats.inflight += 1
+        started = time.perf_counter()
+        deadline = SharedDeadline()
+        context = contextvars.copy_context()
+        context.run(DEADLINE.set, deadline)
+        flight = context.run(asyncio.ensure_future, fn(*args, **kwargs))
+        self._flights[key] = flight
+        self._deadlines[key] = deadline
+        stats.max_waiters = max(stats.max_waiters, 1)
+
+        def done(f: asyncio.Future) -> None:
+            if self._flights.get(key) is f:
+                del self._flights[key]
+                del self._deadlines[key]
+            stats.inflight -= 1
+            stats.seconds += time.perf_counter() - started
+            if f.cancelled() or f.exception() is not None:
+                stats.errors += 1
+
+        flight.add_done_callback(done)
+        return await self._wait(flight, deadline)
+
+    @staticmethod
+    async def _wait(flight: asyncio.Future, shared: SharedDeadline) -> Any:
+        """
+        Await a shared call until it finishes or this caller's deadline passes,
+        keeping the call's deadline at least as late as this caller's meanwhile.
+        """
+        deadline = DEADLINE.get()
+        token = shared.join(deadline)
+        try:
+            if deadline is None:
+                return await asyncio.shield(flight)
+            deadline.check()
+            try:
+                return await asyncio.wait_for(asyncio.shield(flight), deadline.remaining)
+            except asyncio.TimeoutError:
+                if flight.done():
+                    return flight.result()
+                raise DeadlineExceeded("Request deadline exceeded")
+        finally:
+            shared.leave(token)
+
+    def metrics(self) -> Dict[str, Dict[str, Any]]:
+        return {k: s.as_dict() for k, s in self.stats.items()}
@@ -0,0 +1,182 @@
+"""
+Direct SQLite access for PyGoSQLViews.
+The Go backend renders SQL text per request; this side opens the same WAL database
+so batch and read paths can bind parameters and reuse prepared statements.
+"""
+import asyncio
+import contextvars
+import functools
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, AsyncIterator, Iterable, Iterator, Optional
+
+from loguru import logger as log
+
+from .admission import DEADLINE, Deadline, DeadlineExceeded
+
+
+class SQLite:
+    """
+    Thread-local sqlite3 connections to the PyGoSQL database file.
+
+    Blocking calls run in worker threads so they never hold the event loop:
+    the default executor's, or with workers a pool of this database's own.
+    Each connection keeps sqlite3's own prepared statement cache, so identical
+    SQL strings are only compiled once per thread.
+    """
+    CACHED_STATEMENTS = 512
+    BUSY_TIMEOUT_MS = 5000
+    DEADLINE_CHECK_OPS = 10000
+
+    def __init__(self, pygosqlviews, path: Optional[Path] = None, budget: Optional[int] = None,
+                 workers: Optional[int] = None):
+        self.pygosqlviews = pygosqlviews
+        self.verbose = pygosqlviews.verbose
+        self.path = Path(path or pygosqlviews.pygosql._db_path)
+        self.budget = budget
+        self.workers = workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._local = threading.local()
+        self._connections: list[sqlite3.Connection] = []
+        self._slots: Optional[asyncio.Semaphore] = None
+        if self.verbose: log.success(f"{self}: Successfully initialized at {self.path}!")
+
+    def __repr__(self):
+        return "PyGoSQL.Views.SQLite"
+
+    def connect(self) -> sqlite3.Connection:
+        """
+        Return this thread's connection, opening it on first use.
+        """
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(
+                str(self.path),
+                cached_statements=self.CACHED_STATEMENTS,
+                check_same_thread=False,
+            )
+            conn.row_factory = sqlite3.Row
+            conn.execute(f"PRAGMA busy_timeout = {self.BUSY_TIMEOUT_MS}")
+            conn.execute("PRAGMA journal_mode = WAL")
+            self._local.conn = conn
+            self._connections.append(conn)
+            if self.verbose: log.debug(f"{self}: Opened connection for thread {threading.get_ident()}")
+        return conn
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """
+        Run a block inside a single write transaction, rolling back on error.
+        """
+        conn = self.connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.rollback()
+            raise
+        conn.commit()
+
+    async def run(self, fn, *args, **kwargs) -> Any:
+        """
+        Run a blocking callable in a worker thread.
+        With a budget, at most that many calls for this database run at once.
+        Within a request deadline (see admission.py) the call is not started
+        once it has passed, and queries still running then are interrupted.
+        """
+        deadline = DEADLINE.get()
+        if deadline is not None:
+            deadline.check()
+            fn = functools.partial(self._bounded, deadline, fn)
+        if self.budget is None:
+            return await self._thread(fn, *args, **kwargs)
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.budget)
+        async with self._slots:
+            return await self._thread(fn, *args, **kwargs)
+
+    async def _thread(self, fn, *args, **kwargs) -> Any:
+        if self.workers is None:
+            return await asyncio.to_thread(fn, *args, **kwargs)
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix=f"sqlite-{self.path.stem}")
+        call = functools.partial(contextvars.copy_context().run, fn, *args, **kwargs)
+        return await asyncio.get_running_loop().run_in_executor(self._executor, call)
+
+    def _bounded(self, deadline: Deadline, fn, *args, **kwargs) -> Any:
+        deadline.check()
+        conn = self.connect()
+        conn.set_progress_handler(deadline.expired, self.DEADLINE_CHECK_OPS)
+        try:
+            return fn(*args, **kwargs)
+        except sqlite3.OperationalError as e:
+            if deadline.expired() and "interrupted" in str(e):
+                raise DeadlineExceeded("Request deadline exceeded") from e
+            raise
+        finally:
+            conn.set_progress_handler(None, 0)
+
+    def close(self) -> None:
+        """
+        Close every thread's connection; threads reopen lazily on next use.
+        """
+        connections, self._connections = self._connections, []
+        self._local = threading.local()
+        for conn in connections:
+            conn.close()
+        if self.verbose: log.debug(f"{self}: Closed {len(connections)} connection(s)")
+
+    def shutdown(self) -> None:
+        """
+        Close the connections and stop this database's own worker threads, if any.
+        """
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        self.close()
+
+    def _fetchall(self, sql: str, params: Iterable[Any] = ()) -> list[dict]:
+        return [dict(row) for row in self.connect().execute(sql, tuple(params))]
+
+    def _fetchone(self, sql: str, params: Iterable[Any] = ()) -> Optional[dict]:
+        row = self.connect().execute(sql, tuple(params)).fetchone()
+        return dict(row) if row is not None else None
+
+    def _executemany(self, sql: str, seq: Iterable[Iterable[Any]]) -> int:
+        with self.transaction() as conn:
+            return conn.executemany(sql, seq).rowcount
+
+    async def fetchall(self, sql: str, params: Iterable[Any] = ()) -> list[dict]:
+        return await self.run(self._fetchall, sql, params)
+
+    async def fetchone(self, sql: str, params: Iterable[Any] = ()) -> Optional[dict]:
+        return await self.run(self._fetchone, sql, params)
+
+    async def executemany(self, sql: str, seq: Iterable[Iterable[Any]]) -> int:
+        return await self.run(self._executemany, sql, list(seq))
+
+    async def read_blob(self, table: str, column: str, rowid: int, start: int = 0,
+                        end: Optional[int] = None, chunk_size: int = 64 * 1024) -> AsyncIterator[bytes]:
+        """
+        Stream bytes [start, end) of one TEXT/BLOB cell with incremental blob I/O,
+        so the full value is never held in memory.
+        A dedicated read-only connection is used because reads hop between worker threads.
+        """
+        conn = await self.run(sqlite3.connect, f"file:{self.path}?mode=ro", uri=True, check_same_thread=False)
+        try:
+            blob = await self.run(conn.blobopen, table, column, rowid, readonly=True)
+            end = len(blob) if end is None else min(end, len(blob))
+            pos = start
+            while pos < end:
+                await self.run(blob.seek, pos)
+                data = await self.run(blob.read, min(chunk_size, end - pos))
+                if not data:
+                    break
+                pos += len(data)
+                yield data
+            blob.close()
+        finally:
+            await self.run(conn.close)
@@ -0,0 +1,165 @@
+"""
+Parameterized statements compiled from a table's PyGoSQL SQL files.
+`POST/insert.sql` and `PUT/update.sql` carry `{{columns}}`, `{{values}}` and
+`{{updates}}` placeholders; these are expanded once per column set into `?`
+bindings so every write with the same shape reuses one statement string.
+"""
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional
+
+from loguru import logger as log
+
+PLACEHOLDER = re.compile(r"{{\s*(\w+)\s*}}")
+
+OPERATIONS = {
+    "select": Path("GET") / "select.sql",
+    "insert": Path("POST") / "insert.sql",
+    "update": Path("PUT") / "update.sql",
+    "delete": Path("DELETE") / "delete.sql",
+}
+
+
+def quote(identifier: str) -> str:
+    """Quote an SQLite identifier."""
+    return '"' + identifier.replace('"', '""') + '"'
+
+
+@dataclass(frozen=True)
+class Statement:
+    """
+    A compiled statement and the column order its `?` bindings expect.
+    """
+    table: str
+    operation: str
+    sql: str
+    columns: tuple[str, ...]
+    key: Optional[str] = None
+
+    def bind(self, row: Dict[str, Any]) -> tuple:
+        """
+        Order a row's values to match this statement's bindings.
+        """
+        values = tuple(row[c] for c in self.columns)
+        if self.key is not None:
+            values += (row[self.key],)
+        return values
+
+
+class StatementCache:
+    """
+    Cache of compiled statements keyed by (table, operation, frozenset of columns).
+    """
+
+    def __init__(self, pygosqlviews):
+        self.pygosqlviews = pygosqlviews
+        self.verbose = pygosqlviews.verbose
+        self._sources: Dict[tuple[str, str], str] = {}
+        self._statements: Dict[tuple[str, str, frozenset], Statement] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def __repr__(self):
+        return "PyGoSQL.Views.StatementCache"
+
+    def source(self, table, operation: str) -> str:
+        """
+        Read the raw SQL file for an operation, cached per table.
+        """
+        key = (table.name, operation)
+        if key not in self._sources:
+            if operation not in OPERATIONS:
+                raise ValueError(f"Unknown operation '{operation}', expected one of {list(OPERATIONS)}")
+            path = table.path / OPERATIONS[operation]
+            self._sources[key] = path.read_text(encoding="utf-8").strip().rstrip(";")
+        return self._sources[key]
+
+    def get(self, table, operation: str, columns: Iterable[str], key: Optional[str] = None) -> Statement:
+        """
+        Return the statement for this column set, compiling it on first use.
+
+        Args:
+            table: Table whose SQL files are used.
+            operation: One of select/insert/update/delete.
+            columns: Columns bound by the statement (SET columns for updates).
+            key: Column bound to the trailing `WHERE ... = ?` for updates.
+        """
+        cols = frozenset(columns)
+        cache_key = (table.name, operation, cols)
+        stmt = self._statements.get(cache_key)
+        if stmt is not None and stmt.key == key:
+            self.hits += 1
+            return stmt
+        self.misses += 1
+        stmt = self._compile(table, operation, tuple(sorted(cols)), key)
+        self._statements[cache_key] = stmt
+        if self.verbose: log.debug(f"[{self}]: Compiled {operation} for {table.name} → {stmt.sql}")
+        return stmt
+
+    def select(self, table, columns: Optional[Iterable[str]] = None, where: str = "",
+               order_by: Iterable[str] = (), paged: bool = True,
+               expressions: Optional[Dict[str, str]] = None) -> Statement:
+        """
+        Return a projected SELECT over only the given columns (all columns when None).
+
+        Args:
+            table: Table to read from.
+            columns: Columns to project.
+            where: Parameterized WHERE clause body, bound by the caller.
+            order_by: ORDER BY terms, already quoted.
+            paged: Append `LIMIT ? OFFSET ?`.
+            expressions: SQL expressions selected AS their key, in place of
+                the column of that name or in addition to the columns.
+        """
+        cols = frozenset(columns) if columns is not None else None
+        order_by = tuple(order_by)
+        expressions = expressions or {}
+        cache_key = (table.name, "select", cols, where, order_by, paged, tuple(sorted(expressions.items())))
+        stmt = self._statements.get(cache_key)
+        if stmt is not None:
+            self.hits += 1
+            return stmt
+        self.misses += 1
+        names = tuple(sorted(cols)) if cols is not None else ()
+        terms = [quote(c) for c in names if c not in expressions] or (["*"] if cols is None else [])
+        terms += [f"{sql} AS {quote(alias)}" for alias, sql in sorted(expressions.items())]
+        sql = f"SELECT {', '.join(terms)} FROM {quote(table.name)}"
+        if where:
+            sql += f" WHERE {where}"
+        if order_by:
+            sql += f" ORDER BY {', '.join(order_by)}"
+        if paged:
+            sql += " LIMIT ? OFFSET ?"
+        stmt = Statement(table=table.name, operation="select", sql=sql, columns=names)
+        self._statements[cache_key] = stmt
+        if self.verbose: log.debug(f"[{self}]: Compiled projection for {table.name} → {sql}")
+        return stmt
+
+    def _compile(self, table, operation: str, columns: tuple[str, ...], key: Optional[str]) -> Statement:
+        expansions = {
+            "table": quote(table.name),
+            "columns": ", ".join(quote(c) for c in columns),
+            "values": ", ".join("?" for _ in columns),
+            "updates": ", ".join(f"{quote(c)} = ?" for c in columns),
+        }
+
+        def expand(match: re.Match) -> str:
+            name = match.group(1)
+            if name not in expansions:
+                raise ValueError(f"[{self}]: Unsupported placeholder '{{{{{name}}}}}' in {table.name} {operation}")
+            return expansions[name]
+
+        sql = PLACEHOLDER.sub(expand, self.source(table, operation))
+        return Statement(table=table.name, operation=operation, sql=sql, columns=columns, key=key)
+
+    def clear(self, table=None) -> None:
+        """
+        Drop compiled statements, for one table or all of them.
+        """
+        if table is None:
+            self._sources.clear()
+            self._statements.clear()
+            return
+        self._sources = {k: v for k, v in self._sources.items() if k[0] != table.name}
+        self._statements = {k: v for k, v in self._statements.items() if k[0] != table.name}
@@ -0,0 +1,271 @@
+"""
+Static snapshot of the views as plain files, for serving from nginx or a CDN.
+
+Files are laid out at the URLs the htmx routes use, so links work unchanged:
+
+    index.html                          /
+    {table}/index.html                  /{table}
+    {table}/page/{n}/index.html         /{table}?page={n}
+    {table}/{id}/index.html             /{table}/{id}
+    {table}/{id}/field/{field}          /{table}/{id}/field/{field}   (full long/binary values)
+    {table}/{id}/thumb/{field}          /{table}/{id}/thumb/{field}?v=…
+    css/default.css                     /css/default.css
+
+Only `?page=` needs a server rule, e.g. for nginx:
+
+    location / { try_files $uri/page/$arg_page/index.html $uri/index.html $uri =404; }
+
+A manifest in the output directory records a digest per row and per card
+page, so a re-export only rewrites rows and pages whose content changed and
+removes files for deleted rows. Changing a template rebuilds its table.
+"""
+import asyncio
+import json
+import os
+import shutil
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from loguru import logger as log
+from markupsafe import Markup, escape
+
+from .files import atomic_write, digest, file_digest
+from .pygosqlviews import Table
+from .statements import quote
+
+MANIFEST = ".export.json"
+
+
+@dataclass
+class ExportStats:
+    """
+    What one export wrote, skipped and removed.
+    """
+    tables: int = 0
+    rows: int = 0
+    rendered: int = 0
+    skipped: int = 0
+    pages: int = 0
+    removed: int = 0
+    started: float = field(default_factory=time.perf_counter, repr=False)
+    seconds: float = 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        d = asdict(self)
+        del d["started"]
+        d["seconds"] = round(self.seconds, 3)
+        return d
+
+
+def _safe(row_id: Any) -> bool:
+    name = str(row_id)
+    return bool(name) and name not in (".", "..", "page") and "/" not in name and "\\" not in name
+
+
+def _jsonable(value: Any) -> Any:
+    if isinstance(value, (bytes, memoryview)):
+        return digest(bytes(value))
+    return str(value)
+
+
+class StaticExport:
+    """
+    One export of a PyGoSQLViews instance into out_dir.
+
+    Tables are exported concurrently; each is read in keyset chunks of
+    page_size * pages_per_chunk rows, and each chunk's pages and rows are
+    rendered and written on a thread pool while the next chunk is read.
+
+    Args:
+        out_dir: Output directory (created if missing).
+        page_size: Cards per page, as the table view's default size.
+        pages_per_chunk: Card pages read from SQLite at a time.
+        workers: Render/write threads.
+        force: Rewrite everything, ignoring the previous manifest.
+    """
+    PAGE_SIZE = 50
+
+    def __init__(self, pygosqlviews, out_dir: Path, page_size: int = PAGE_SIZE, pages_per_chunk: int = 20,
+                 workers: Optional[int] = None, force: bool = False):
+        self.pygosqlviews = pygosqlviews
+        self.verbose = pygosqlviews.verbose
+        self.out = Path(out_dir)
+        self.page_size = page_size
+        self.chunk_size = page_size * pages_per_chunk
+        self.workers = workers or min(32, (os.cpu_count() or 1) + 4)
+        self.force = force
+        self.stats = ExportStats()
+        try:
+            previous = json.loads((self.out / MANIFEST).read_text(encoding="utf-8"))
+        except (FileNotFoundError, json.JSONDecodeError):
+            previous = {}
+        self.previous: Dict[str, Any] = {} if force else previous.get("tables", {})
+
+    def __repr__(self):
+        return "PyGoSQL.Views.StaticExport"
+
+    def template_hash(self, table: Table) -> str:
+        """
+        Digest of everything besides row data that shapes a table's pages.
+        """
+        src = Path(__file__).parent / "src"
+        sources = [(src / n).read_text(encoding="utf-8") for n in ("page.j2", "cards.j2")]
+        sources += [p.read_text(encoding="utf-8") for p in (table.paths.card, table.paths.detail)]
+        return digest(json.dumps([sources, self.pygosqlviews.prefix, self.page_size, Table.PREVIEW_CHARS]))
+
+    async def run(self) -> ExportStats:
+        self.out.mkdir(parents=True, exist_ok=True)
+        tables = [t for t in vars(self.pygosqlviews.tables).values() if isinstance(t, Table)]
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="static-export") as pool:
+            self.pool = pool
+            results = await asyncio.gather(*(self.table(t) for t in tables))
+        manifest = {"tables": dict(zip((t.name for t in tables), results))}
+        for name in set(self.previous) - set(manifest["tables"]):
+            shutil.rmtree(self.out / name, ignore_errors=True)
+            self.stats.removed += 1
+        overview = [{"name": t.name, "title": t.name.replace("_", " ").title(), "rows": r["count"]}
+                    for t, r in zip(tables, results)]
+        self._write(self.out / "index.html", self.pygosqlviews.render_page("Database", "overview.j2", tables=overview))
+        css = self.pygosqlviews.dir.paths.css.parent
+        for path in css.glob("*.css"):
+            self._write(self.out / "css" / path.name, path.read_bytes())
+        atomic_write(self.out / MANIFEST, json.dumps(manifest))
+        self.stats.tables = len(tables)
+        self.stats.seconds = time.perf_counter() - self.stats.started
+        if self.verbose: log.success(f"[{self}]: Exported {self.stats.as_dict()} to {self.out}")
+        return self.stats
+
+    def _tally(self, results: List[Optional[str]]) -> None:
+        for result in results:
+            if result is not None:
+                setattr(self.stats, result, getattr(self.stats, result) + 1)
+
+    def _write(self, path: Path, data) -> None:
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        if file_digest(path) != digest(data):
+            atomic_write(path, data)
+
+    async def table(self, table: Table) -> Dict[str, Any]:
+        """
+        Export one table, returning its manifest entry.
+        """
+        self.pygosqlviews.budget.touch(table)
+        cfg = await table.config
+        key = cfg.id
+        version = self.template_hash(table)
+        previous = self.previous.get(table.name, {})
+        fresh = previous.get("version") == version
+        old_rows, old_pages = previous.get("rows", {}), previous.get("pages", {})
+        unchanged_rows, unchanged_pages = (old_rows, old_pages) if fresh else ({}, {})
+        rows_out: Dict[str, str] = {}
+        pages_out: Dict[str, str] = {}
+        loop = asyncio.get_running_loop()
+        sqlite = self.pygosqlviews.sqlite
+        first = f"SELECT * FROM {quote(table.name)} ORDER BY {quote(key)} LIMIT ?"
+        after = f"SELECT * FROM {quote(table.name)} WHERE {quote(key)} > ? ORDER BY {quote(key)} LIMIT ?"
+        rows = await sqlite.fetchall(first, (self.chunk_size + 1,))
+        page, pending = 1, None
+        while rows:
+            chunk, has_more = rows[:self.chunk_size], len(rows) > self.chunk_size
+            following = asyncio.ensure_future(sqlite.fetchall(after, (chunk[-1][key], self.chunk_size + 1))) \
+                if has_more else None
+            jobs = []
+            for i in range(0, len(chunk), self.page_size):
+                jobs.append(loop.run_in_executor(
+                    self.pool, self._page, table, cfg, page, chunk[i:i + self.page_size],
+                    has_more or i + self.page_size < len(chunk), unchanged_pages, pages_out
+                ))
+                page += 1
+            for row in chunk:
+                jobs.append(loop.run_in_executor(self.pool, self._row, table, cfg, row, unchanged_rows, rows_out))
+            if pending is not None:
+                self._tally(await pending)
+            pending = asyncio.gather(*jobs)
+            self.stats.rows += len(chunk)
+            rows = await following if following is not None else []
+        if pending is not None:
+            self._tally(await pending)
+        if page == 1:
+            self._tally([self._page(table, cfg, 1, [], False, {}, pages_out)])
+        for stale in set(old_rows) - set(rows_out):
+            shutil.rmtree(self.out / table.name / stale, ignore_errors=True)
+            self.stats.removed += 1
+        for stale in set(old_pages) - set(pages_out):
+            shutil.rmtree(self.out / table.name / "page" / stale, ignore_errors=True)
+            self.stats.removed += 1
+        if self.verbose: log.info(f"[{self}]: {table.name}: {len(rows_out)} rows, {len(pages_out)} pages")
+        return {"version": version, "count": len(rows_out), "rows": rows_out, "pages": pages_out}
+
+    def _page(self, table: Table, cfg, page: int, rows: List[Dict[str, Any]], has_more: bool,
+              old: Dict[str, str], out: Dict[str, str]) -> Optional[str]:
+        cards = [{c: r.get(c) for c in (cfg.id, cfg.card_title, cfg.card_subtitle, cfg.card_image) if c} for r in rows]
+        tokens = [self.pygosqlviews.thumbnails.token(r.get(cfg.card_image)) if cfg.card_image else None for r in rows]
+        key = digest(json.dumps([cards, tokens, has_more], default=_jsonable))
+        out[str(page)] = key
+        path = self.out / table.name / ("index.html" if page == 1 else f"page/{page}/index.html")
+        if old.get(str(page)) == key and path.exists():
+            return None
+        html = self.pygosqlviews.render_page(
+            table.name.replace("_", " ").title(), "cards.j2",
+            table_name=table.name, cards=[Markup(table.card_html(cfg, r)) for r in cards],
+            page=page, has_more=has_more, query_string="", live=False
+        )
+        atomic_write(path, html)
+        return "pages"
+
+    def _row(self, table: Table, cfg, row: Dict[str, Any], old: Dict[str, str], out: Dict[str, str]) -> Optional[str]:
+        row_id = row.get(cfg.id)
+        if not _safe(row_id):
+            if self.verbose: log.warning(f"[{self}]: Skipping {table.name} row id {row_id!r}, not usable as a path")
+            return None
+        name = str(row_id)
+        image = row.get(cfg.card_image) if cfg.card_image else None
+        token = self.pygosqlviews.thumbnails.token(image)
+        key = digest(json.dumps([row, token], default=_jsonable))
+        out[name] = key
+        base = self.out / table.name / name
+        if old.get(name) == key and (base / "index.html").exists():
+            return "skipped"
+        data, more = self.preview(table, row_id, row)
+        for column, info in more.items():
+            value = row[column]
+            body = bytes(value) if info["kind"] == "blob" else str(escape(value)).encode("utf-8")
+            atomic_write(base / "field" / column, body)
+        if token is not None:
+            self._thumbnail(table, row_id, cfg.card_image, image, token, base)
+        atomic_write(base / "index.html", self.pygosqlviews.render_page(
+            f"{table.name.replace('_', ' ').title()} {row_id}", content=table.detail_html(data, more)
+        ))
+        return "rendered"
+
+    def _thumbnail(self, table: Table, row_id: Any, field: str, value: Any, token: str, base: Path) -> None:
+        thumbnails = self.pygosqlviews.thumbnails
+        if isinstance(value, (bytes, memoryview)):
+            load = lambda: bytes(value)
+        else:
+            load = thumbnails.local(value).read_bytes
+        path, _ = thumbnails.get((table.name, str(row_id), field, token), load)
+        atomic_write(base / "thumb" / field, path.read_bytes())
+
+    def preview(self, table: Table, row_id: Any, row: Dict[str, Any]) -> tuple[Dict[str, Any], Dict[str, Dict[str, Any]]]:
+        """
+        The (data, more) pair Table.row_preview builds in SQL, computed from a full row.
+        """
+        n = Table.PREVIEW_CHARS
+        data, more = {}, {}
+        for c, value in row.items():
+            if isinstance(value, (bytes, memoryview)):
+                size, kind = len(value), "blob"
+                data[c] = f"[binary, {size} bytes]"
+            elif isinstance(value, str) and len(value) > n:
+                size, kind = len(value.encode("utf-8")), "text"
+                data[c] = value[:n] + "…"
+            else:
+                data[c] = value
+                continue
+            more[c] = {"kind": kind, "length": size, "url": f"{self.pygosqlviews.prefix}/{table.name}/{row_id}/field/{c}"}
+        return data, more
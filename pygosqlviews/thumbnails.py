@@ -0,0 +1,275 @@
+"""
+Card-sized thumbnails for card_image columns, cached on disk by content hash.
+
+Card images are either paths under a local image root or BLOBs in the table.
+Cards link to `/{table}/{id}/thumb/{field}?v=<token>`. For local files the
+token is a digest of the file's path, mtime and size, which changes whenever
+the file does, so those responses are served as immutable. Card pages never
+read image BLOBs: their token is computed in SQL from the BLOB's length and
+the rowid, which SQLite answers without loading the value. Since a BLOB
+replaced by another of the same length keeps that token, BLOB thumbnails are
+served with no-cache and an ETag of the content digest, and rebuilt from the
+re-read BLOB on every request that is not answered 304.
+
+BLOBs are read through the views' SQLite (its read budget); file reads,
+decoding and resizing run on the cache's own small executor, so a burst of
+thumbnail misses does not hold SQLite workers.
+Pillow is optional: without it the source bytes are cached and served unchanged.
+"""
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from loguru import logger as log
+
+from .files import atomic_write, digest
+from .statements import quote
+
+SIGNATURES = {
+    b"\x89PNG\r\n\x1a\n": "image/png",
+    b"\xff\xd8\xff": "image/jpeg",
+    b"GIF87a": "image/gif",
+    b"GIF89a": "image/gif",
+    b"RIFF": "image/webp",
+}
+EXTENSIONS = {"image/png": "png", "image/jpeg": "jpg", "image/gif": "gif", "image/webp": "webp"}
+IMMUTABLE = "public, max-age=31536000, immutable"
+TOKEN = "_thumb_token"
+
+
+def sniff(data: bytes) -> str:
+    """Guess an image MIME type from its leading bytes."""
+    for sig, mime in SIGNATURES.items():
+        if data.startswith(sig):
+            return mime
+    return "application/octet-stream"
+
+
+def is_remote(value: Any) -> bool:
+    return isinstance(value, str) and value.split(":", 1)[0].lower() in ("http", "https", "data")
+
+
+def card_expressions(column: str) -> Dict[str, str]:
+    """
+    Card projection of an image column: the column itself with BLOBs read as
+    NULL, and their version token as TOKEN.
+    """
+    q = quote(column)
+    return {
+        column: f"CASE WHEN typeof({q}) = 'blob' THEN NULL ELSE {q} END",
+        TOKEN: f"CASE WHEN typeof({q}) = 'blob' THEN printf('b%x.%x', length({q}), rowid) END",
+    }
+
+
+class ThumbnailCache:
+    """
+    Size-bounded on-disk cache of resized images.
+
+    Entries are named by the digest of the source bytes and the target size,
+    so identical images across rows share one file. When the cache grows past
+    MAX_BYTES the least recently served files are removed.
+    """
+    SIZE = (320, 320)
+    QUALITY = 80
+    MAX_BYTES = 256 * 1024 * 1024
+    WORKERS = 2
+
+    def __init__(self, pygosqlviews, path: Optional[Path] = None, root: Optional[Path] = None,
+                 max_bytes: Optional[int] = None):
+        self.pygosqlviews = pygosqlviews
+        self.verbose = pygosqlviews.verbose
+        sql_root = Path(pygosqlviews.pygosql._sql_root)
+        self.path = Path(path or sql_root / ".cache" / "thumbnails")
+        self.root = Path(root or sql_root).resolve()
+        self.max_bytes = max_bytes or self.MAX_BYTES
+        self._lock = threading.Lock()
+        self._sources: Dict[Tuple[str, str, str, str], str] = {}
+        self._entries: Optional[Dict[Path, Tuple[int, float]]] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        if self.verbose: log.success(f"{self}: Successfully initialized at {self.path}!")
+
+    def __repr__(self):
+        return "PyGoSQL.Views.Thumbnails"
+
+    def local(self, value: str) -> Optional[Path]:
+        """
+        Resolve a stored image path inside the image root, or None if it escapes it.
+        """
+        path = (self.root / value.lstrip("/")).resolve()
+        return path if path.is_relative_to(self.root) else None
+
+    def token(self, value: Any) -> Optional[str]:
+        """
+        A short version token for an image value: a content digest for BLOBs,
+        a stat digest for local files. None when there is nothing to thumbnail.
+        """
+        if isinstance(value, (bytes, memoryview)):
+            return digest(bytes(value))[:16]
+        if not isinstance(value, str) or not value or is_remote(value):
+            return None
+        path = self.local(value)
+        try:
+            st = path.stat() if path else None
+        except OSError:
+            return None
+        return digest(f"{path}:{st.st_mtime_ns}:{st.st_size}")[:16] if st else None
+
+    def url(self, table, row_id: Any, field: str, value: Any, token: Optional[str] = None) -> Any:
+        """
+        The thumbnail URL for a card image, or the value unchanged for remote URLs.
+        Pass the token when the card projection computed it in SQL.
+        """
+        token = token or self.token(value)
+        if token is None:
+            return None if isinstance(value, (bytes, memoryview)) else value
+        return f"{self.pygosqlviews.prefix}/{table.name}/{row_id}/thumb/{field}?v={token}"
+
+    @property
+    def entries(self) -> Dict[Path, Tuple[int, float]]:
+        if self._entries is None:
+            self._entries = {}
+            for p in self.path.rglob("*"):
+                if p.is_file() and not p.name.startswith("."):
+                    st = p.stat()
+                    self._entries[p] = (st.st_size, st.st_atime)
+        return self._entries
+
+    @property
+    def size(self) -> int:
+        return sum(s for s, _ in self.entries.values())
+
+    def resize(self, data: bytes) -> Tuple[bytes, str]:
+        """
+        Shrink an image to fit SIZE as WebP, or return it unchanged without Pillow.
+        """
+        try:
+            from PIL import Image
+        except ImportError:
+            return data, sniff(data)
+        with Image.open(BytesIO(data)) as img:
+            img.thumbnail(self.SIZE)
+            if img.mode not in ("RGB", "RGBA"):
+                img = img.convert("RGBA")
+            out = BytesIO()
+            img.save(out, "WEBP", quality=self.QUALITY)
+        return out.getvalue(), "image/webp"
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.WORKERS, thread_name_prefix="thumbnails")
+        return self._executor
+
+    async def fetch(self, key: Optional[Tuple[str, str, str, str]], load: Callable[[], bytes],
+                    sqlite=None) -> Tuple[Path, str]:
+        """
+        Return (file, mime) for a thumbnail without blocking the event loop.
+        load runs through sqlite.run when given (BLOBs), else on this cache's
+        executor, as does the resize. A None key skips the source index, for
+        sources whose token does not identify their content.
+        """
+        hit = self.cached(key) if key is not None else None
+        if hit is not None:
+            return hit
+        loop = asyncio.get_running_loop()
+        data = await sqlite.run(load) if sqlite is not None else await loop.run_in_executor(self.executor, load)
+        return await loop.run_in_executor(self.executor, self.store, key, data)
+
+    def get(self, key: Tuple[str, str, str, str], load) -> Tuple[Path, str]:
+        """
+        Return (file, mime) for a thumbnail, building it from load() on a miss.
+        Blocking; run it in a worker thread.
+        """
+        return self.cached(key) or self.store(key, load())
+
+    def cached(self, key: Tuple[str, str, str, str]) -> Optional[Tuple[Path, str]]:
+        """
+        The thumbnail last built for this source key, if its file is still cached.
+        """
+        with self._lock:
+            name = self._sources.get(key)
+            if name is not None:
+                path = self.path / name[:2] / name
+                if path.exists():
+                    self.hits += 1
+                    self._touch(path)
+                    return path, self._mime(path)
+        return None
+
+    def store(self, key: Optional[Tuple[str, str, str, str]], data: bytes) -> Tuple[Path, str]:
+        """
+        Return the thumbnail of data, from disk when the same content was seen
+        before, else by resizing it. Indexes it under key when one is given.
+        """
+        w, h = self.SIZE
+        stem = f"{digest(data)}-{w}x{h}"
+        with self._lock:
+            for path in (self.path / stem[:2]).glob(f"{stem}.*"):
+                self.hits += 1
+                if key is not None:
+                    self._sources[key] = path.name
+                self._touch(path)
+                return path, self._mime(path)
+        self.misses += 1
+        started = time.perf_counter()
+        thumb, mime = self.resize(data)
+        path = self.path / stem[:2] / f"{stem}.{EXTENSIONS.get(mime, 'bin')}"
+        atomic_write(path, thumb)
+        with self._lock:
+            if key is not None:
+                self._sources[key] = path.name
+            self.entries[path] = (len(thumb), time.time())
+            self._evict()
+        if self.verbose:
+            log.debug(f"[{self}]: {len(data)} → {len(thumb)} bytes in {(time.perf_counter() - started) * 1000:.1f}ms")
+        return path, mime
+
+    def _touch(self, path: Path) -> None:
+        now = time.time()
+        os.utime(path, (now, path.stat().st_mtime))
+        size, _ = self.entries.get(path, (path.stat().st_size, now))
+        self.entries[path] = (size, now)
+
+    def _mime(self, path: Path) -> str:
+        ext = path.suffix.lstrip(".")
+        return next((m for m, e in EXTENSIONS.items() if e == ext), "application/octet-stream")
+
+    def _evict(self) -> None:
+        total = self.size
+        if total <= self.max_bytes:
+            return
+        for path, (size, _) in sorted(self.entries.items(), key=lambda e: e[1][1]):
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            del self.entries[path]
+            total -= size
+            self.evictions += 1
+        self._sources = {k: v for k, v in self._sources.items() if (self.path / v[:2] / v) in self.entries}
+        if self.verbose: log.debug(f"[{self}]: Evicted down to {total} bytes")
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def forget(self, table: str) -> None:
+        """
+        Drop the in-memory source index for one table; files on disk stay cached.
+        """
+        with self._lock:
+            self._sources = {k: v for k, v in self._sources.items() if k[0] != table}
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+            "bytes": self.size, "max_bytes": self.max_bytes,
+        }
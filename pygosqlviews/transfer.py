@@ -0,0 +1,196 @@
+"""
+Streaming NDJSON/CSV encoding and decoding for bulk table export and import.
+Everything here works one chunk at a time so memory stays bounded by the
+chunk/batch size rather than the table size.
+
+Exports round-trip through imports: BLOBs are written as base64 and decoded
+again for columns declared BLOB, and CSV tells NULL (an empty field) from the
+empty string (a quoted `""`).
+"""
+import base64
+import binascii
+import codecs
+import json
+import time
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterable, AsyncIterator, Dict, Iterable, List, Optional, Union
+
+FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+Source = Union[AsyncIterable[bytes], Iterable[bytes]]
+
+
+def check_format(format: str) -> str:
+    if format not in FORMATS:
+        raise ValueError(f"Unsupported format '{format}', expected one of {list(FORMATS)}")
+    return format
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return base64.b64encode(bytes(value)).decode("ascii")
+    return str(value)
+
+
+@dataclass
+class TransferStats:
+    """
+    Row count and throughput of one export or import run.
+    """
+    rows: int = 0
+    batches: int = 0
+    started: float = field(default_factory=time.perf_counter)
+    finished: Optional[float] = None
+
+    def finish(self) -> "TransferStats":
+        self.finished = time.perf_counter()
+        return self
+
+    @property
+    def seconds(self) -> float:
+        return (self.finished or time.perf_counter()) - self.started
+
+    @property
+    def rows_per_sec(self) -> float:
+        return self.rows / self.seconds if self.seconds > 0 else 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "rows": self.rows,
+            "batches": self.batches,
+            "seconds": round(self.seconds, 3),
+            "rows_per_sec": round(self.rows_per_sec, 1),
+        }
+
+
+class Encoder:
+    """
+    Turns chunks of row dicts into bytes for one output format.
+    CSV takes its header from the first row it sees.
+    """
+
+    def __init__(self, format: str):
+        self.format = check_format(format)
+        self.header: Optional[List[str]] = None
+
+    def encode(self, rows: List[Dict[str, Any]]) -> bytes:
+        if self.format == "ndjson":
+            return "".join(json.dumps(r, default=_default) + "\n" for r in rows).encode("utf-8")
+        lines = []
+        if self.header is None and rows:
+            self.header = list(rows[0])
+            lines.append(",".join(map(_csv_field, self.header)))
+        for r in rows:
+            lines.append(",".join(_csv_field(r.get(c)) for c in self.header))
+        return "".join(line + "\r\n" for line in lines).encode("utf-8")
+
+
+def _csv_field(value: Any) -> str:
+    """One CSV field: NULL as nothing, the empty string and anything needing it quoted."""
+    if value is None:
+        return ""
+    text = _default(value) if isinstance(value, (bytes, bytearray, memoryview)) else str(value)
+    if text == "" or any(c in text for c in ',"\r\n'):
+        return '"' + text.replace('"', '""') + '"'
+    return text
+
+
+def _csv_split(text: str) -> List[Optional[str]]:
+    """
+    Split one CSV record into fields: an empty unquoted field is None (NULL),
+    a quoted one a string, `""` included.
+    """
+    fields: List[Optional[str]] = []
+    i = 0
+    while True:
+        if text.startswith('"', i):
+            parts, j = [], i + 1
+            while True:
+                k = text.index('"', j)
+                parts.append(text[j:k])
+                if not text.startswith('"', k + 1):
+                    break
+                parts.append('"')
+                j = k + 2
+            end = text.find(",", k + 1)
+            parts.append(text[k + 1:] if end < 0 else text[k + 1:end])
+            fields.append("".join(parts))
+        else:
+            end = text.find(",", i)
+            fields.append((text[i:] if end < 0 else text[i:end]) or None)
+        if end < 0:
+            return fields
+        i = end + 1
+
+
+def decode_blobs(row: Dict[str, Any], blobs: Iterable[str]) -> Dict[str, Any]:
+    """
+    Turn the base64 text export writes for BLOB columns back into bytes.
+    Text that is not valid base64 is kept as it is.
+    """
+    for column in blobs:
+        value = row.get(column)
+        if isinstance(value, str):
+            try:
+                row[column] = base64.b64decode(value, validate=True)
+            except (binascii.Error, ValueError):
+                pass
+    return row
+
+
+async def _chunks(source: Source) -> AsyncIterator[bytes]:
+    if hasattr(source, "__aiter__"):
+        async for chunk in source:
+            yield chunk
+    else:
+        for chunk in source:
+            yield chunk
+
+
+async def _lines(source: Source) -> AsyncIterator[str]:
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    pending = ""
+    async for chunk in _chunks(source):
+        pending += decoder.decode(chunk) if isinstance(chunk, (bytes, bytearray)) else chunk
+        *complete, pending = pending.split("\n")
+        for line in complete:
+            yield line
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending
+
+
+async def records(source: Source, format: str) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Parse rows from a byte stream incrementally.
+
+    CSV lines are joined until their quotes balance, so quoted fields may
+    contain newlines. Empty CSV fields are read back as NULL, quoted empty
+    fields as the empty string.
+    """
+    check_format(format)
+    if format == "ndjson":
+        async for line in _lines(source):
+            if line.strip():
+                yield json.loads(line)
+        return
+
+    header: Optional[List[str]] = None
+    record = ""
+    async for line in _lines(source):
+        record = f"{record}\n{line}" if record else line
+        if record.count('"') % 2:
+            continue
+        text, record = record.rstrip("\r"), ""
+        if not text:
+            continue
+        values = _csv_split(text)
+        if header is None:
+            header = [v or "" for v in values]
+            continue
+        yield dict(zip(header, values))
+    if record:
+        raise ValueError("CSV stream ended inside a quoted field")
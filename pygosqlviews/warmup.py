@@ -0,0 +1,227 @@
+"""
+Cache warming from recorded access patterns.
+
+AccessLog keeps a small rolling histogram of which tables, card pages and
+row ids the views serve, decayed with a half-life so old traffic fades,
+and saves it to sql_root/.cache/access.json. After a restart, Warmer replays
+the hottest entries in order: it loads each table's columns, config and
+templates, then reads and renders its hot card pages (building their facet counts)
+and detail rows, which compiles the templates and pulls those rows into
+SQLite's and the OS's page cache before users ask for them.
+
+Warming runs on app startup, in the background by default, and stops at
+PYGOSQLVIEWS_WARMUP_SECONDS (0 disables it). Its CPU use is held near
+PYGOSQLVIEWS_WARMUP_CPU of one core by sleeping between steps, so requests
+served meanwhile are not crowded out. Set PYGOSQLVIEWS_WARMUP_BLOCKING=1 to
+finish warming before the app accepts traffic instead.
+"""
+import asyncio
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from loguru import logger as log
+
+from .files import atomic_write
+from .pygosqlviews import Table
+
+
+class AccessLog:
+    """
+    Decaying hit counts per table, per card page and per row id, persisted as JSON.
+    """
+    HALF_LIFE = 24 * 3600.0
+    SAVE_INTERVAL = 60.0
+    MAX_TABLES = 100
+    MAX_PAGES = 20
+    MAX_ROWS = 200
+
+    def __init__(self, pygosqlviews, path: Optional[Path] = None):
+        self.pygosqlviews = pygosqlviews
+        self.verbose = pygosqlviews.verbose
+        self.path = Path(path or Path(pygosqlviews.pygosql._sql_root) / ".cache" / "access.json")
+        self.tables: Dict[str, Dict[str, Any]] = {}
+        self.decayed_at = time.time()
+        self._saved = time.monotonic()
+        self.load()
+
+    def __repr__(self):
+        return "PyGoSQL.Views.AccessLog"
+
+    def load(self) -> None:
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (FileNotFoundError, json.JSONDecodeError):
+            return
+        self.tables = data.get("tables", {})
+        self.decayed_at = data.get("decayed_at", time.time())
+        self.decay()
+
+    def hit(self, table: str, page: Optional[int] = None, row: Optional[str] = None) -> None:
+        entry = self.tables.setdefault(table, {"hits": 0.0, "pages": {}, "rows": {}})
+        entry["hits"] += 1
+        if page is not None:
+            entry["pages"][str(page)] = entry["pages"].get(str(page), 0.0) + 1
+        if row is not None:
+            entry["rows"][row] = entry["rows"].get(row, 0.0) + 1
+        if time.monotonic() - self._saved >= self.SAVE_INTERVAL:
+            self._saved = time.monotonic()
+            asyncio.get_running_loop().run_in_executor(None, atomic_write, self.path, self.dump())
+
+    def decay(self) -> None:
+        """
+        Age every count by the time since the last decay and keep only the top entries.
+        """
+        now = time.time()
+        factor = 0.5 ** (max(now - self.decayed_at, 0.0) / self.HALF_LIFE)
+        self.decayed_at = now
+        kept = {}
+        for name, entry in sorted(self.tables.items(), key=lambda e: -e[1]["hits"])[:self.MAX_TABLES]:
+            hits = entry["hits"] * factor
+            if hits < 0.5:
+                continue
+            kept[name] = {
+                "hits": hits,
+                "pages": _top(entry["pages"], factor, self.MAX_PAGES),
+                "rows": _top(entry["rows"], factor, self.MAX_ROWS),
+            }
+        self.tables = kept
+
+    def dump(self) -> str:
+        self.decay()
+        return json.dumps({"decayed_at": self.decayed_at, "tables": self.tables})
+
+    def save(self) -> None:
+        atomic_write(self.path, self.dump())
+        self._saved = time.monotonic()
+
+    def hottest(self) -> List[Tuple[float, str, str, Any]]:
+        """
+        (count, kind, table, key) for every table, page and row, hottest first.
+        A table always comes before its own pages and rows.
+        """
+        entries = []
+        for name, entry in self.tables.items():
+            entries.append((entry["hits"], 0, "table", name, None))
+            entries += [(min(n, entry["hits"]), 1, "page", name, int(p)) for p, n in entry["pages"].items()]
+            entries += [(min(n, entry["hits"]), 2, "row", name, r) for r, n in entry["rows"].items()]
+        entries.sort(key=lambda e: (-e[0], e[1]))
+        return [(n, kind, name, key) for n, _, kind, name, key in entries]
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "tables": len(self.tables),
+            "pages": sum(len(e["pages"]) for e in self.tables.values()),
+            "rows": sum(len(e["rows"]) for e in self.tables.values()),
+        }
+
+
+def _top(counts: Dict[str, float], factor: float, limit: int) -> Dict[str, float]:
+    ranked = sorted(((k, n * factor) for k, n in counts.items()), key=lambda e: -e[1])[:limit]
+    return {k: n for k, n in ranked if n >= 0.5}
+
+
+class Warmer:
+    """
+    Replays an AccessLog's hottest entries within a time and CPU budget.
+
+    Args:
+        seconds: Wall-clock budget; defaults to PYGOSQLVIEWS_WARMUP_SECONDS or 10.
+        cpu: Share of one core to use while warming; defaults to PYGOSQLVIEWS_WARMUP_CPU or 0.5.
+        page_size: Cards per page, as the table view's default size.
+    """
+    SECONDS = 10.0
+    CPU = 0.5
+    PAGE_SIZE = 50
+
+    def __init__(self, pygosqlviews, seconds: Optional[float] = None, cpu: Optional[float] = None,
+                 page_size: int = PAGE_SIZE):
+        self.pygosqlviews = pygosqlviews
+        self.verbose = pygosqlviews.verbose
+        self.seconds = seconds if seconds is not None else float(os.environ.get("PYGOSQLVIEWS_WARMUP_SECONDS", self.SECONDS))
+        self.cpu = cpu if cpu is not None else float(os.environ.get("PYGOSQLVIEWS_WARMUP_CPU", self.CPU))
+        self.blocking = os.environ.get("PYGOSQLVIEWS_WARMUP_BLOCKING", "") not in ("", "0")
+        self.page_size = page_size
+        self.warmed = {"table": 0, "page": 0, "row": 0}
+        self.failed = 0
+        self.elapsed = 0.0
+        self.done = False
+        self._task: Optional[asyncio.Task] = None
+
+    def __repr__(self):
+        return "PyGoSQL.Views.Warmer"
+
+    async def start(self) -> None:
+        """
+        Startup hook: warm now if blocking, otherwise in a background task.
+        """
+        if self.seconds <= 0:
+            return
+        if self.blocking:
+            await self.warm()
+        elif self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self.warm())
+
+    def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def warm(self) -> Dict[str, Any]:
+        started, cpu_started = time.monotonic(), time.process_time()
+        tables = vars(self.pygosqlviews.tables)
+        entries = self.pygosqlviews.access.hottest()
+        for _, kind, name, key in entries:
+            if time.monotonic() - started >= self.seconds:
+                break
+            table = tables.get(name)
+            if not isinstance(table, Table):
+                continue
+            try:
+                await getattr(self, f"_{kind}")(table, key)
+                self.warmed[kind] += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.failed += 1
+                if self.verbose: log.debug(f"[{self}]: Skipped {kind} {name} {key}: {e}")
+            await self._throttle(started, cpu_started)
+        self.elapsed = time.monotonic() - started
+        self.done = True
+        if self.verbose or entries:
+            log.info(f"[{self}]: Warmed {self.warmed} of {len(entries)} hot entries in {self.elapsed:.2f}s")
+        return self.metrics()
+
+    async def _throttle(self, started: float, cpu_started: float) -> None:
+        """
+        Sleep long enough that process CPU time since start stays within cpu * wall time.
+        """
+        used = time.process_time() - cpu_started
+        ahead = used / self.cpu - (time.monotonic() - started) if self.cpu > 0 else 0.0
+        await asyncio.sleep(max(ahead, 0.0))
+
+    async def _table(self, table, _) -> None:
+        self.pygosqlviews.budget.touch(table)
+        await table.config
+        await table.columns
+        await table.card_columns()
+        for path in (table.paths.card, table.paths.detail):
+            table.templates.get_template(path.name)
+
+    async def _page(self, table, page: int) -> None:
+        rows, _ = await table.page(page, self.page_size, await table.card_columns(), await table.query([]),
+                                      cards=True)
+        for row in rows:
+            await table.card_fragment(row)
+        await table.facets.build()
+
+    async def _row(self, table, row_id: str) -> None:
+        preview = await table.row_preview(row_id)
+        if preview is not None:
+            await table.render_detail(*preview)
+
+    def metrics(self) -> Dict[str, Any]:
+        return {"done": self.done, "warmed": dict(self.warmed), "failed": self.failed,
+                "seconds": round(self.elapsed, 3), "budget_seconds": self.seconds, "cpu": self.cpu}
@@ -1,7 +1,6 @@
 import asyncio
 import inspect
 from pathlib import Path
-from tabnanny import verbose
 from types import FrameType, SimpleNamespace
 from typing import Any, Type, Callable, List
 
@@ -127,10 +126,14 @@ class Dummy2:
     def __init__(self, item):
         self.item = item
 
-Proxy(Dummy, Dummy2)
-bar = "foo"
-Dummy.bar
-# log.debug(Dummy.bar)
+def debug():
+    Proxy(Dummy, Dummy2)
+    bar = "foo"
+    Dummy.bar
+    # log.debug(Dummy.bar)
+
+if __name__ == "__main__":
+    debug()
 
 #ten = ["ten"]
 #log.debug(ProxyManager.ten)
@@ -61,6 +61,9 @@ class Env:
         self.name = path.name
 
 
-Proxy(TemplateManager, Env)
+def debug():
+    Proxy(TemplateManager, Env)
+    log.debug(TemplateManager.__dict__)
 
-log.debug(TemplateManager.__dict__)
+if __name__ == "__main__":
+    debug()